@@ -0,0 +1,161 @@
+"""Minified, content-hashed static assets for ``app.py``.
+
+The blob script and the page CSS live in ``assets/``. :func:`build_assets`
+minifies them into ``static/`` under names that include a hash of their
+content, for example ``blob.3f2a9c1b7e4d.min.js``, and records the names in
+``static/manifest.json``. A build only happens when a source has changed, so
+after the first start of a deployment this is a single small file read.
+
+Streamlit serves ``static/`` at ``/app/static/`` when
+``server.enableStaticServing`` is on. Asset URLs carry the hash as a ``v``
+query argument, which makes the server send a far-future
+``Cache-Control: max-age`` header. Browsers then load the script from cache
+for every new session and only fetch it again after it changes.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(APP_DIR, "assets")
+STATIC_DIR = os.path.join(APP_DIR, "static")
+MANIFEST_PATH = os.path.join(STATIC_DIR, "manifest.json")
+
+ASSET_SOURCES = ("blob.js", "app.css")
+
+
+def minify_js(source):
+    """Remove comments, indentation and blank lines from JavaScript.
+
+    Line breaks are kept, so automatic semicolon insertion behaves as in the
+    source. Quotes and template literals are tracked so ``//`` inside a
+    string (e.g. a URL) is left alone. Regular expression literals are not
+    recognized, so sources must not contain ``//`` or quotes inside one.
+    """
+    output = []
+    quote = None
+    in_block_comment = False
+    index = 0
+    length = len(source)
+    while index < length:
+        char = source[index]
+        pair = source[index:index + 2]
+        if in_block_comment:
+            if pair == "*/":
+                in_block_comment = False
+                index += 2
+            else:
+                index += 1
+            continue
+        if quote:
+            output.append(char)
+            if char == "\\":
+                output.append(source[index + 1:index + 2])
+                index += 2
+                continue
+            if char == quote or (char == "\n" and quote != "`"):
+                quote = None
+            index += 1
+            continue
+        if pair == "//":
+            while index < length and source[index] != "\n":
+                index += 1
+            continue
+        if pair == "/*":
+            in_block_comment = True
+            index += 2
+            continue
+        if char in "'\"`":
+            quote = char
+        output.append(char)
+        index += 1
+
+    lines = (line.strip() for line in "".join(output).split("\n"))
+    return "\n".join(line for line in lines if line) + "\n"
+
+
+def minify_css(source):
+    """Remove comments and insignificant whitespace from CSS."""
+    source = re.sub(r"/\*.*?\*/", "", source, flags=re.S)
+    source = re.sub(r"\s+", " ", source)
+    source = re.sub(r"\s*([{};:,>])\s*", r"\1", source)
+    return source.replace(";}", "}").strip()
+
+
+_MINIFIERS = {".js": minify_js, ".css": minify_css}
+
+
+def _read_manifest():
+    try:
+        with open(MANIFEST_PATH) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path, text):
+    handle, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8") as tmp:
+            tmp.write(text)
+        # mkstemp creates files readable by the owner only
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def build_assets():
+    """Minify changed sources into ``static/`` and return the manifest.
+
+    Returns
+    -------
+    dict
+        Maps each source name to ``{"file", "hash", "source_hash"}``.
+    """
+    manifest = _read_manifest()
+    changed = False
+    for name in ASSET_SOURCES:
+        with open(os.path.join(SOURCE_DIR, name), "rb") as handle:
+            source = handle.read()
+        source_hash = hashlib.sha256(source).hexdigest()[:12]
+        entry = manifest.get(name)
+        if (entry and entry["source_hash"] == source_hash
+                and os.path.exists(os.path.join(STATIC_DIR, entry["file"]))):
+            continue
+
+        stem, extension = os.path.splitext(name)
+        minified = _MINIFIERS[extension](source.decode("utf-8"))
+        digest = hashlib.sha256(minified.encode("utf-8")).hexdigest()[:12]
+        filename = "%s.%s.min%s" % (stem, digest, extension)
+        os.makedirs(STATIC_DIR, exist_ok=True)
+        _write_atomic(os.path.join(STATIC_DIR, filename), minified)
+        # Remove older builds of this asset
+        pattern = re.compile(r"^%s\.[0-9a-f]{12}\.min%s$" % (re.escape(stem), re.escape(extension)))
+        for existing in os.listdir(STATIC_DIR):
+            if pattern.match(existing) and existing != filename:
+                os.remove(os.path.join(STATIC_DIR, existing))
+        manifest[name] = {"file": filename, "hash": digest, "source_hash": source_hash}
+        changed = True
+
+    if changed:
+        _write_atomic(MANIFEST_PATH, json.dumps(manifest, indent=2, sort_keys=True))
+    return manifest
+
+
+def read_asset(manifest, name):
+    """Return the minified text of an asset."""
+    with open(os.path.join(STATIC_DIR, manifest[name]["file"]), encoding="utf-8") as handle:
+        return handle.read()
+
+
+def asset_url(manifest, name, base_url_path=""):
+    """Return the cacheable URL Streamlit serves an asset at."""
+    base = "/" + base_url_path.strip("/") if base_url_path.strip("/") else ""
+    entry = manifest[name]
+    return "%s/app/static/%s?v=%s" % (base, entry["file"], entry["hash"])
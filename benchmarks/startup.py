@@ -0,0 +1,145 @@
+"""Startup benchmark for app.py.
+
+Measures, over several fresh server processes:
+
+server_ready_s
+    Process start until ``/_stcore/health`` answers.
+first_run_s
+    Script run for the first session of a fresh process, up to the blob
+    (Streamlit AppTest in a fresh interpreter, so imports are cold).
+next_run_s
+    Script run for a further new session in the same process.
+asset_bytes, asset_cache_control
+    Size and caching header of the blob script served from ``static/``.
+first_blob_s
+    Page load until the blob canvas exists in a real browser, if Playwright
+    and its Chromium are installed.
+
+Run from the repository root::
+
+    python benchmarks/startup.py --repeat 5
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+
+# Runs in a fresh interpreter; prints the timings as JSON
+_SCRIPT_RUN = """
+import json, sys, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+AppTest.from_file(sys.argv[1], default_timeout=60).run()
+first = time.perf_counter()
+AppTest.from_file(sys.argv[1], default_timeout=60).run()
+second = time.perf_counter()
+print(json.dumps({"first_run_s": first - imported, "next_run_s": second - first}))
+"""
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(url, timeout_s):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.02)
+    raise RuntimeError("%s did not answer within %.0f s" % (url, timeout_s))
+
+
+def measure_server(port):
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP, "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_for("http://127.0.0.1:%d/_stcore/health" % port, 60)
+        result = {"server_ready_s": time.perf_counter() - started}
+
+        sys.path.insert(0, ROOT)
+        from app_assets import asset_url, build_assets
+        url = "http://127.0.0.1:%d%s" % (port, asset_url(build_assets(), "blob.js"))
+        with urllib.request.urlopen(url) as response:
+            result["asset_bytes"] = len(response.read())
+            result["asset_cache_control"] = response.headers.get("Cache-Control")
+
+        first_blob = measure_browser(port)
+        if first_blob is not None:
+            result["first_blob_s"] = first_blob
+        return result
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def measure_browser(port):
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        return None
+    with sync_playwright() as playwright:
+        try:
+            browser = playwright.chromium.launch()
+        except Exception:
+            return None
+        try:
+            page = browser.new_page()
+            started = time.perf_counter()
+            page.goto("http://127.0.0.1:%d/" % port)
+            page.wait_for_selector(".blob-container canvas", state="attached", timeout=60000)
+            return time.perf_counter() - started
+        finally:
+            browser.close()
+
+
+def measure_script():
+    output = subprocess.run([sys.executable, "-c", _SCRIPT_RUN, APP], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print raw samples as JSON")
+    args = parser.parse_args()
+
+    samples = []
+    for _ in range(args.repeat):
+        sample = measure_server(_free_port())
+        sample.update(measure_script())
+        samples.append(sample)
+
+    if args.json:
+        print(json.dumps(samples, indent=2))
+        return
+    for name in ("server_ready_s", "first_run_s", "next_run_s", "first_blob_s"):
+        values = [sample[name] for sample in samples if name in sample]
+        if values:
+            print("%-16s median %7.3f s  min %7.3f s  max %7.3f s"
+                  % (name, statistics.median(values), min(values), max(values)))
+    print("%-16s %d bytes, Cache-Control: %s"
+          % ("blob script", samples[0]["asset_bytes"], samples[0]["asset_cache_control"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Server-side analysis of recorded screening sessions.
+
+Submodules are imported on first use of one of their names, so importing a
+light module (e.g. ``screening.quality``) does not pull in NumPy-based ones.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "DEFAULT_PARAMS": "screening.features",
+    "FEATURE_NAMES": "screening.features",
+    "analyze_file": "screening.features",
+    "FeatureCache": "screening.feature_cache",
+    "SessionStore": "screening.session_store",
+    "MemoryStore": "screening.session_store",
+    "SQLiteStore": "screening.session_store",
+    "RedisStore": "screening.session_store",
+    "open_store": "screening.session_store",
+    "CohortIndex": "screening.cohort_index",
+    "SessionRecorder": "screening.cohort_index",
+    "SUMMARY_COLUMNS": "screening.cohort_index",
+    "summarize_session": "screening.cohort_index",
+    "SimilarityIndex": "screening.similarity",
+    "QualityMonitor": "screening.quality",
+    "LatencyTracer": "screening.latency",
+    "SessionArchive": "screening.archive",
+    "InferenceScheduler": "screening.inference",
+    "feature_window": "screening.inference",
+    "load_model": "screening.inference",
+    "render_session": "screening.render",
+    "render_still": "screening.render",
+    "write_png": "screening.render",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError("module 'screening' has no attribute %r" % name)
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,509 @@
+"""On-disk session archive with tiered retention.
+
+Each session lives in its own directory with a ``manifest.json`` and one
+segment file per stored tier:
+
+``raw``
+    Every feature frame as received (about 20 per second).
+``pcm``
+    Optional 16-bit audio of the session.
+``1s`` and ``10s``
+    Per-bin ``min``, ``max`` and ``mean`` of every stream, plus the number
+    of frames in the bin.
+
+:meth:`SessionArchive.compact` moves sessions down the tiers as they age.
+PCM is dropped, raw frames are rolled into 1 s bins and 1 s bins into 10 s
+bins, and segments older than ``compress_age_s`` are rewritten compressed.
+If ``max_bytes`` is set, the oldest sessions are moved further down until
+the archive fits, so recent sessions keep full resolution.
+
+Only one process compacts an archive at a time: :meth:`SessionArchive.compact`
+takes an exclusive lock on ``compaction.lock`` and skips the pass if another
+process holds it. Within a process, one archive-wide lock guards manifest
+changes. A pass takes it separately for each session rather than for the
+whole pass, so saving a session waits for at most one session's compaction.
+
+Segments are never modified in place. A rewrite creates a file with a new
+name, then atomically replaces the manifest, then unlinks the old file. A
+reader that already holds a memory map of the old file keeps a valid view,
+and a reader that opens a file the manifest no longer lists retries with
+the new manifest.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import urllib.parse
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from screening.cohort_index import STREAM_NAMES
+
+DAY_S = 24 * 3600.0
+
+DEFAULT_RETENTION = {
+    "pcm_age_s": 7 * DAY_S,
+    "raw_age_s": 14 * DAY_S,
+    "fine_age_s": 180 * DAY_S,
+    "compress_age_s": 30 * DAY_S,
+    "max_bytes": None,
+}
+
+# Tiers from finest to coarsest, with their bin width in seconds
+TIERS = (("raw", None), ("1s", 1.0), ("10s", 10.0))
+
+RAW_DTYPE = np.dtype([("time", "<f8")] + [(stream, "<f4") for stream in STREAM_NAMES])
+ROLLUP_DTYPE = np.dtype(
+    [("time", "<f8"), ("count", "<i4")]
+    + [(stream + suffix, "<f4") for stream in STREAM_NAMES for suffix in ("_min", "_max", "_mean")]
+)
+
+# Times a reader re-reads the manifest after a segment vanished under it
+_READ_RETRIES = 3
+
+logger = logging.getLogger(__name__)
+
+
+def _try_lock_file(path):
+    """Lock ``path`` exclusively without blocking.
+
+    Returns the open handle, or None if another process (or another handle
+    in this process) holds the lock.
+    """
+    handle = open(path, "a+")
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+def _unlock_file(handle):
+    if fcntl is not None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    else:
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+    handle.close()
+
+
+def _rollup(segment, width):
+    """Aggregate raw frames or finer rollup bins into bins of ``width`` seconds."""
+    if len(segment) == 0:
+        return np.zeros(0, dtype=ROLLUP_DTYPE)
+    times = segment["time"]
+    bins = np.floor(times / width).astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    fine = "count" in segment.dtype.names
+    counts = segment["count"].astype(np.int64) if fine else np.ones(len(segment), dtype=np.int64)
+
+    result = np.zeros(len(starts), dtype=ROLLUP_DTYPE)
+    result["time"] = bins[starts] * width
+    result["count"] = np.add.reduceat(counts, starts)
+    for stream in STREAM_NAMES:
+        low = segment[stream + "_min"] if fine else segment[stream]
+        high = segment[stream + "_max"] if fine else segment[stream]
+        mean = segment[stream + "_mean"] if fine else segment[stream]
+        result[stream + "_min"] = np.minimum.reduceat(low, starts)
+        result[stream + "_max"] = np.maximum.reduceat(high, starts)
+        weighted = np.add.reduceat(mean.astype(np.float64) * counts, starts)
+        result[stream + "_mean"] = weighted / result["count"]
+    return result
+
+
+def _as_features(segment):
+    """Return a segment as a features dict; rollups expose their means as the streams."""
+    features = {name: segment[name] for name in segment.dtype.names}
+    if "count" in segment.dtype.names:
+        for stream in STREAM_NAMES:
+            features[stream] = segment[stream + "_mean"]
+    return features
+
+
+class SessionArchive:
+    """Per-session feature and audio segments under ``directory``.
+
+    Parameters
+    ----------
+    directory: str
+        Root of the archive. Created if missing.
+    **retention
+        Overrides for ``DEFAULT_RETENTION``. Ages are in seconds since the
+        session was recorded; ``max_bytes`` is a cap on the total segment
+        size, or None for no cap.
+    """
+
+    def __init__(self, directory, **retention):
+        unknown = set(retention) - set(DEFAULT_RETENTION)
+        if unknown:
+            raise ValueError("Unknown retention settings: %s" % ", ".join(sorted(unknown)))
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.retention = dict(DEFAULT_RETENTION, **retention)
+        os.makedirs(os.path.join(self.directory, "sessions"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_compaction = None
+        self.last_error = None
+
+    def close(self):
+        """Stop background compaction if it is running."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Layout
+
+    def _session_dir(self, session_id):
+        return os.path.join(self.directory, "sessions", urllib.parse.quote(session_id, safe=""))
+
+    def _read_manifest(self, session_id):
+        try:
+            with open(os.path.join(self._session_dir(session_id), "manifest.json")) as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return None
+
+    def _write_manifest(self, session_id, manifest):
+        self._atomic_write(self._session_dir(session_id),
+                           lambda handle: handle.write(json.dumps(manifest).encode()),
+                           "manifest.json")
+
+    @staticmethod
+    def _atomic_write(directory, write, name):
+        handle, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as tmp:
+                write(tmp)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            os.replace(tmp_path, os.path.join(directory, name))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _write_segment(self, session_id, manifest, tier, array, compressed):
+        """Write ``array`` as a new generation of ``tier`` and return its file name."""
+        manifest["generation"] += 1
+        name = "%s-%d.%s" % (tier, manifest["generation"], "npz" if compressed else "npy")
+        if compressed:
+            write = lambda handle: np.savez_compressed(handle, data=array)
+        else:
+            write = lambda handle: np.save(handle, array)
+        self._atomic_write(self._session_dir(session_id), write, name)
+        return name
+
+    def _commit(self, session_id, manifest, obsolete):
+        """Publish ``manifest``, then unlink segments it no longer lists."""
+        manifest["garbage"] = sorted(set(manifest.get("garbage", [])) | set(obsolete))
+        self._write_manifest(session_id, manifest)
+        directory = self._session_dir(session_id)
+        remaining = []
+        for name in manifest["garbage"]:
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+            except PermissionError:
+                # Platforms that refuse to unlink mapped files; retried on
+                # the next compaction
+                remaining.append(name)
+        if remaining != manifest["garbage"]:
+            manifest["garbage"] = remaining
+            self._write_manifest(session_id, manifest)
+
+    def _load_segment(self, session_id, name):
+        path = os.path.join(self._session_dir(session_id), name)
+        if name.endswith(".npz"):
+            with np.load(path, allow_pickle=False) as data:
+                return data["data"]
+        return np.load(path, mmap_mode="r", allow_pickle=False)
+
+    # Writing and reading
+
+    def write_session(self, session_id, features, recorded_at=None, pcm=None, sample_rate=None):
+        """Store a session's raw feature frames and optional audio.
+
+        Parameters
+        ----------
+        features: dict
+            ``time`` in seconds from the start of the session and one array
+            per stream, as from :meth:`SessionRecorder.features`.
+        recorded_at: float
+            Unix time of the start of the session; defaults to now.
+        pcm: numpy.ndarray
+            Mono float samples in [-1, 1], stored as 16-bit integers.
+        """
+        raw = np.zeros(len(features["time"]), dtype=RAW_DTYPE)
+        raw["time"] = features["time"]
+        for stream in STREAM_NAMES:
+            raw[stream] = features[stream]
+
+        with self._lock:
+            directory = self._session_dir(session_id)
+            os.makedirs(directory, exist_ok=True)
+            previous = self._read_manifest(session_id)
+            manifest = {
+                "session_id": session_id,
+                "recorded_at": time.time() if recorded_at is None else float(recorded_at),
+                "generation": previous["generation"] if previous else 0,
+                "segments": {},
+                "compressed": False,
+                "garbage": previous.get("garbage", []) if previous else [],
+            }
+            manifest["segments"]["raw"] = self._write_segment(session_id, manifest, "raw", raw, False)
+            if pcm is not None:
+                samples = np.round(np.clip(pcm, -1.0, 1.0) * 32767).astype("<i2")
+                manifest["segments"]["pcm"] = self._write_segment(session_id, manifest, "pcm", samples, False)
+                manifest["sample_rate"] = int(sample_rate)
+            obsolete = list(previous["segments"].values()) if previous else []
+            self._commit(session_id, manifest, obsolete)
+
+    def read(self, session_id, tier=None):
+        """Return a session's features at the finest tier still stored.
+
+        Uncompressed segments are memory-mapped. Rollup tiers return each
+        stream's bin means under the stream name, plus ``<stream>_min``,
+        ``<stream>_max`` and ``count``.
+
+        Parameters
+        ----------
+        tier: str
+            ``"raw"``, ``"1s"`` or ``"10s"`` to require a specific tier.
+
+        Returns
+        -------
+        dict or None
+            The features, with ``tier`` naming the tier they came from, or
+            None if the session (or the requested tier) is not stored.
+        """
+        for _ in range(_READ_RETRIES):
+            manifest = self._read_manifest(session_id)
+            if manifest is None:
+                return None
+            names = [name for name, _ in TIERS if name in manifest["segments"]]
+            if tier is not None:
+                names = [name for name in names if name == tier]
+            if not names:
+                return None
+            try:
+                segment = self._load_segment(session_id, manifest["segments"][names[0]])
+            except FileNotFoundError:
+                continue
+            features = _as_features(segment)
+            features["tier"] = names[0]
+            return features
+        raise RuntimeError("Session %s kept changing while being read" % session_id)
+
+    def read_pcm(self, session_id):
+        """Return ``(samples, sample_rate)`` with int16 samples, or None once dropped."""
+        for _ in range(_READ_RETRIES):
+            manifest = self._read_manifest(session_id)
+            if manifest is None or "pcm" not in manifest["segments"]:
+                return None
+            try:
+                return self._load_segment(session_id, manifest["segments"]["pcm"]), manifest["sample_rate"]
+            except FileNotFoundError:
+                continue
+        raise RuntimeError("Session %s kept changing while being read" % session_id)
+
+    def remove_session(self, session_id):
+        with self._lock:
+            directory = self._session_dir(session_id)
+            if not os.path.isdir(directory):
+                return
+            for name in os.listdir(directory):
+                os.remove(os.path.join(directory, name))
+            os.rmdir(directory)
+
+    def session_ids(self):
+        root = os.path.join(self.directory, "sessions")
+        return sorted(urllib.parse.unquote(name) for name in os.listdir(root))
+
+    def session_bytes(self, session_id):
+        directory = self._session_dir(session_id)
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return 0
+        total = 0
+        for name in names:
+            # Files can be replaced or removed by a concurrent write
+            try:
+                total += os.path.getsize(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+        return total
+
+    def stats(self):
+        """Return the number of sessions per finest tier and the total size in bytes."""
+        tiers = {name: 0 for name, _ in TIERS}
+        total = 0
+        for session_id in self.session_ids():
+            manifest = self._read_manifest(session_id)
+            if manifest is None:
+                continue
+            finest = next(name for name, _ in TIERS if name in manifest["segments"])
+            tiers[finest] += 1
+            total += self.session_bytes(session_id)
+        return {"sessions": sum(tiers.values()), "tiers": tiers, "bytes": total}
+
+    # Compaction
+
+    def _advance(self, session_id, manifest, age, force=False):
+        """Apply the retention policy to one session.
+
+        With ``force``, do the next pending step regardless of age. Returns
+        the name of the step taken, or None.
+        """
+        limits = self.retention
+        segments = manifest["segments"]
+        obsolete = []
+        step = None
+
+        if "pcm" in segments and (force or age >= limits["pcm_age_s"]):
+            obsolete.append(segments.pop("pcm"))
+            manifest.pop("sample_rate", None)
+            step = "pcm_dropped"
+        elif "raw" in segments and (force or age >= limits["raw_age_s"]):
+            step = self._roll(session_id, manifest, "raw", "1s", 1.0, obsolete)
+        elif "1s" in segments and (force or age >= limits["fine_age_s"]):
+            step = self._roll(session_id, manifest, "1s", "10s", 10.0, obsolete)
+        elif not manifest["compressed"] and (force or age >= limits["compress_age_s"]):
+            for tier, name in sorted(segments.items()):
+                array = np.array(self._load_segment(session_id, name))
+                segments[tier] = self._write_segment(session_id, manifest, tier, array, True)
+                obsolete.append(name)
+            manifest["compressed"] = True
+            step = "compressed"
+
+        if step is not None:
+            self._commit(session_id, manifest, obsolete)
+        return step
+
+    def _roll(self, session_id, manifest, source, target, width, obsolete):
+        segments = manifest["segments"]
+        rolled = _rollup(self._load_segment(session_id, segments[source]), width)
+        segments[target] = self._write_segment(session_id, manifest, target, rolled, manifest["compressed"])
+        obsolete.append(segments.pop(source))
+        return "rolled_" + target
+
+    def _compact_session(self, session_id, now, counts):
+        """Apply the age-based steps to one session.
+
+        Returns its manifest and its size before compaction, or None if the
+        session is gone.
+        """
+        with self._lock:
+            manifest = self._read_manifest(session_id)
+            if manifest is None:
+                return None
+            size = self.session_bytes(session_id)
+            # Age-based steps can cascade, e.g. a year-old session goes
+            # straight to compressed 10 s bins
+            while True:
+                step = self._advance(session_id, manifest, now - manifest["recorded_at"])
+                if step is None:
+                    break
+                counts[step] += 1
+            if manifest["garbage"]:
+                self._commit(session_id, manifest, [])
+            return manifest, size
+
+    def compact(self, now=None):
+        """Apply the retention policy to every session.
+
+        Returns
+        -------
+        dict or None
+            Counts of each step taken, the total size before and after, and
+            the elapsed time; None if another process is compacting.
+        """
+        lock = _try_lock_file(os.path.join(self.directory, "compaction.lock"))
+        if lock is None:
+            return None
+        try:
+            return self._compact(now)
+        finally:
+            _unlock_file(lock)
+
+    def _compact(self, now):
+        started = time.perf_counter()
+        now = time.time() if now is None else now
+        counts = {"pcm_dropped": 0, "rolled_1s": 0, "rolled_10s": 0, "compressed": 0}
+        bytes_before = 0
+        sessions = []
+        for session_id in self.session_ids():
+            compacted = self._compact_session(session_id, now, counts)
+            if compacted is not None:
+                manifest, size = compacted
+                bytes_before += size
+                sessions.append((manifest["recorded_at"], session_id))
+
+        total = sum(self.session_bytes(session_id) for _, session_id in sessions)
+        if self.retention["max_bytes"] is not None:
+            # Oldest first; each session goes as far down as needed before a
+            # newer one is touched
+            for _, session_id in sorted(sessions):
+                while total > self.retention["max_bytes"]:
+                    with self._lock:
+                        manifest = self._read_manifest(session_id)
+                        if manifest is None:
+                            break
+                        before = self.session_bytes(session_id)
+                        step = self._advance(session_id, manifest, 0.0, force=True)
+                        if step is None:
+                            break
+                        counts[step] += 1
+                        total += self.session_bytes(session_id) - before
+                if total <= self.retention["max_bytes"]:
+                    break
+
+        self.last_compaction = dict(
+            counts,
+            bytes_before=bytes_before,
+            bytes_after=total,
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+        )
+        return self.last_compaction
+
+    def start_background_compaction(self, interval_s=3600.0):
+        """Run :meth:`compact` every ``interval_s`` seconds on a daemon thread."""
+        if self._thread is not None:
+            return
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.compact()
+                except Exception as exc:
+                    # Keep compacting on later passes, e.g. after a full disk
+                    self.last_error = "%s: %s" % (type(exc).__name__, exc)
+                    logger.exception("Archive compaction failed")
+                self._stop.wait(interval_s)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name="archive-compaction", daemon=True)
+        self._thread.start()
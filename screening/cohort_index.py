@@ -0,0 +1,444 @@
+"""Embedded index of per-session summary features.
+
+Each closed session is reduced to a row of summary statistics derived from
+its ``overallLevel``, ``pitchProxy`` and ``frequencySpread`` streams and
+written to a local SQLite database. Indexed columns make range filters over
+thousands of sessions cheap, and fixed-bin histogram sketches (one per
+summary column for the whole cohort, and one per stream for each session)
+answer percentile questions without opening any recording.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from screening.session_store import MemoryStore
+
+# Frames with overallLevel above this count as voiced (audioThreshold in the
+# browser script)
+DEFAULT_VOICE_THRESHOLD = 0.09
+# Unvoiced runs shorter than this are treated as part of the utterance
+DEFAULT_MIN_PAUSE_S = 0.25
+
+SUMMARY_COLUMNS = (
+    "duration_s",
+    "phonation_ratio",
+    "pause_count",
+    "pause_rate_per_min",
+    "median_pause_s",
+    "mean_pause_s",
+    "mean_level",
+    "level_p90",
+    "mean_pitch",
+    "pitch_std",
+    "mean_spread",
+)
+
+# Bin edges of the cohort sketch for each summary column. Values outside the
+# range land in the first or last bin.
+SKETCH_EDGES = {
+    "duration_s": np.linspace(0.0, 3600.0, 361),
+    "pause_count": np.linspace(0.0, 1000.0, 501),
+    "pause_rate_per_min": np.linspace(0.0, 60.0, 241),
+    "median_pause_s": np.linspace(0.0, 10.0, 401),
+    "mean_pause_s": np.linspace(0.0, 10.0, 401),
+}
+_UNIT_EDGES = np.linspace(0.0, 1.0, 201)
+
+STREAM_NAMES = ("overallLevel", "pitchProxy", "frequencySpread")
+STREAM_EDGES = np.linspace(0.0, 1.0, 65)
+# Payload fields that describe the message rather than the audio
+_TRANSPORT_FIELDS = ("seq", "micActive")
+
+
+def sketch_edges(column):
+    """Return the histogram bin edges used for ``column``."""
+    return SKETCH_EDGES.get(column, _UNIT_EDGES)
+
+
+def _bin_counts(values, edges):
+    indices = np.searchsorted(edges, values, side="right") - 1
+    indices = np.clip(indices, 0, len(edges) - 2)
+    return np.bincount(indices, minlength=len(edges) - 1).astype(np.int64)
+
+
+def histogram_percentile(counts, edges, q):
+    """Approximate the ``q``-th percentile (0-100) from histogram counts.
+
+    Interpolates linearly inside the bin holding the target rank. Returns
+    None for an empty histogram.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    total = counts.sum()
+    if total <= 0:
+        return None
+    target = total * min(100.0, max(0.0, q)) / 100.0
+    cumulative = np.cumsum(counts)
+    index = int(np.searchsorted(cumulative, target, side="left"))
+    index = min(index, len(counts) - 1)
+    before = cumulative[index - 1] if index > 0 else 0.0
+    inside = counts[index]
+    fraction = (target - before) / inside if inside > 0 else 0.0
+    return float(edges[index] + fraction * (edges[index + 1] - edges[index]))
+
+
+def _runs(mask):
+    """Return (starts, lengths) of the True runs in a boolean array."""
+    padded = np.concatenate([[False], mask, [False]])
+    changes = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    starts, ends = changes[::2], changes[1::2]
+    return starts, ends - starts
+
+
+def summarize_session(features, voice_threshold=DEFAULT_VOICE_THRESHOLD,
+                      min_pause_s=DEFAULT_MIN_PAUSE_S):
+    """Reduce a session's feature streams to summary statistics.
+
+    Parameters
+    ----------
+    features: dict of array-like
+        ``overallLevel``, ``pitchProxy`` and ``frequencySpread`` streams plus
+        ``time`` in seconds, as returned by
+        :func:`screening.features.analyze_file`.
+    voice_threshold: float
+        Level above which a frame is voiced.
+    min_pause_s: float
+        Shortest silence between voiced frames that counts as a pause.
+
+    Returns
+    -------
+    dict
+        One value per name in ``SUMMARY_COLUMNS``.
+    """
+    level = np.asarray(features["overallLevel"], dtype=np.float64)
+    pitch = np.asarray(features["pitchProxy"], dtype=np.float64)
+    spread = np.asarray(features["frequencySpread"], dtype=np.float64)
+    times = np.asarray(features["time"], dtype=np.float64)
+
+    frames = len(level)
+    if frames == 0:
+        return {column: 0.0 for column in SUMMARY_COLUMNS}
+
+    # Live sessions only send frames that changed, so weight each frame by
+    # the time until the next one instead of assuming a fixed rate
+    frame_s = float(np.median(np.diff(times))) if frames > 1 else 0.05
+    weights = np.diff(times, append=times[-1] + frame_s)
+    duration = float(weights.sum())
+    voiced = level > voice_threshold
+
+    # Pauses are silent runs between voiced frames; leading and trailing
+    # silence is not a pause
+    starts, lengths = _runs(~voiced)
+    inner = (starts > 0) & (starts + lengths < frames)
+    pauses = times[starts[inner] + lengths[inner]] - times[starts[inner]]
+    pauses = pauses[pauses >= min_pause_s]
+
+    voiced_pitch = pitch[voiced]
+    return {
+        "duration_s": duration,
+        "phonation_ratio": float(weights[voiced].sum() / duration) if duration > 0 else 0.0,
+        "pause_count": float(len(pauses)),
+        "pause_rate_per_min": float(len(pauses) / (duration / 60.0)) if duration > 0 else 0.0,
+        "median_pause_s": float(np.median(pauses)) if len(pauses) else 0.0,
+        "mean_pause_s": float(pauses.mean()) if len(pauses) else 0.0,
+        "mean_level": float(level.mean()),
+        "level_p90": float(np.percentile(level, 90)),
+        "mean_pitch": float(voiced_pitch.mean()) if len(voiced_pitch) else 0.5,
+        "pitch_std": float(voiced_pitch.std()) if len(voiced_pitch) else 0.0,
+        "mean_spread": float(spread.mean()),
+    }
+
+
+class CohortIndex:
+    """SQLite-backed index of session summaries with histogram sketches.
+
+    Parameters
+    ----------
+    path: str
+        Database file, created if missing.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.abspath(os.path.expanduser(path))
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        columns = ",\n".join("%s REAL NOT NULL" % column for column in SUMMARY_COLUMNS)
+        indexes = "\n".join(
+            "CREATE INDEX IF NOT EXISTS sessions_%s ON sessions (%s);" % (column, column)
+            for column in SUMMARY_COLUMNS)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                patient_id TEXT,
+                started_at REAL NOT NULL,
+                source TEXT,
+                %s
+            );
+            %s
+            CREATE TABLE IF NOT EXISTS sketches (
+                column_name TEXT PRIMARY KEY,
+                counts BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS stream_histograms (
+                session_id TEXT NOT NULL,
+                stream TEXT NOT NULL,
+                counts BLOB NOT NULL,
+                PRIMARY KEY (session_id, stream)
+            );
+        """ % (columns, indexes))
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _sketch(self, column):
+        row = self._db.execute("SELECT counts FROM sketches WHERE column_name = ?",
+                               (column,)).fetchone()
+        if row is None:
+            return np.zeros(len(sketch_edges(column)) - 1, dtype=np.int64)
+        return np.frombuffer(row[0], dtype=np.int64).copy()
+
+    def _update_sketches(self, summary, sign):
+        for column in SUMMARY_COLUMNS:
+            edges = sketch_edges(column)
+            counts = self._sketch(column) + sign * _bin_counts([summary[column]], edges)
+            self._db.execute(
+                "INSERT OR REPLACE INTO sketches (column_name, counts) VALUES (?, ?)",
+                (column, np.maximum(counts, 0).tobytes()))
+
+    def add_session(self, session_id, features, patient_id=None, started_at=None,
+                    source=None, **summary_options):
+        """Index a closed session, replacing any earlier row with the same id.
+
+        Parameters
+        ----------
+        session_id: str
+            Unique id of the session.
+        features: dict of array-like
+            Feature streams with ``time``, see :func:`summarize_session`.
+        patient_id, source: str or None
+            Optional metadata stored with the row.
+        started_at: float or None
+            Unix time the session started; defaults to now.
+        **summary_options
+            Passed to :func:`summarize_session`.
+
+        Returns
+        -------
+        dict
+            The stored summary.
+        """
+        summary = summarize_session(features, **summary_options)
+        histograms = {
+            stream: _bin_counts(np.asarray(features[stream], dtype=np.float64), STREAM_EDGES)
+            for stream in STREAM_NAMES
+        }
+        started_at = time.time() if started_at is None else float(started_at)
+
+        with self._lock, self._db:
+            # Take the write lock before reading the sketches, so another
+            # process cannot update them between the read and the write
+            self._db.execute("BEGIN IMMEDIATE")
+            previous = self._db.execute(
+                "SELECT %s FROM sessions WHERE session_id = ?" % ", ".join(SUMMARY_COLUMNS),
+                (session_id,)).fetchone()
+            if previous is not None:
+                self._update_sketches(dict(zip(SUMMARY_COLUMNS, previous)), -1)
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, patient_id, started_at, source, %s) "
+                "VALUES (?, ?, ?, ?, %s)" % (", ".join(SUMMARY_COLUMNS),
+                                             ", ".join("?" * len(SUMMARY_COLUMNS))),
+                [session_id, patient_id, started_at, source]
+                + [summary[column] for column in SUMMARY_COLUMNS])
+            self._db.executemany(
+                "INSERT OR REPLACE INTO stream_histograms (session_id, stream, counts) "
+                "VALUES (?, ?, ?)",
+                [(session_id, stream, counts.tobytes()) for stream, counts in histograms.items()])
+            self._update_sketches(summary, 1)
+        return summary
+
+    def remove_session(self, session_id):
+        """Drop a session from the index and the cohort sketches."""
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            previous = self._db.execute(
+                "SELECT %s FROM sessions WHERE session_id = ?" % ", ".join(SUMMARY_COLUMNS),
+                (session_id,)).fetchone()
+            if previous is None:
+                return
+            self._update_sketches(dict(zip(SUMMARY_COLUMNS, previous)), -1)
+            self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._db.execute("DELETE FROM stream_histograms WHERE session_id = ?", (session_id,))
+
+    def query(self, ranges=None, patient_id=None, order_by="started_at", descending=True,
+              limit=None):
+        """Return sessions whose summary columns fall inside ``ranges``.
+
+        Parameters
+        ----------
+        ranges: dict or None
+            Maps a summary column to ``(low, high)``; either bound may be None.
+            Bounds are inclusive.
+        patient_id: str or None
+            Restrict to one patient.
+        order_by: str
+            ``started_at`` or a summary column.
+        descending: bool
+            Sort order.
+        limit: int or None
+            Maximum number of rows.
+
+        Returns
+        -------
+        list of dict
+        """
+        clauses, values = [], []
+        for column, (low, high) in (ranges or {}).items():
+            if column not in SUMMARY_COLUMNS:
+                raise ValueError("Unknown summary column: %s" % column)
+            if low is not None:
+                clauses.append("%s >= ?" % column)
+                values.append(float(low))
+            if high is not None:
+                clauses.append("%s <= ?" % column)
+                values.append(float(high))
+        if patient_id is not None:
+            clauses.append("patient_id = ?")
+            values.append(patient_id)
+        if order_by != "started_at" and order_by not in SUMMARY_COLUMNS:
+            raise ValueError("Cannot order by %s" % order_by)
+
+        sql = "SELECT * FROM sessions"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY %s %s" % (order_by, "DESC" if descending else "ASC")
+        if limit is not None:
+            sql += " LIMIT %d" % int(limit)
+
+        with self._lock:
+            cursor = self._db.execute(sql, values)
+            names = [description[0] for description in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def approx_percentile(self, column, q):
+        """Approximate percentile of a summary column across the cohort.
+
+        Reads only the column's sketch, so the cost does not grow with the
+        number of sessions.
+        """
+        if column not in SUMMARY_COLUMNS:
+            raise ValueError("Unknown summary column: %s" % column)
+        with self._lock:
+            counts = self._sketch(column)
+        return histogram_percentile(counts, sketch_edges(column), q)
+
+    def stream_percentile(self, stream, q, session_ids=None):
+        """Approximate percentile of a raw stream over some or all sessions.
+
+        Parameters
+        ----------
+        stream: str
+            One of ``STREAM_NAMES``.
+        q: float
+            Percentile in 0-100.
+        session_ids: list of str or None
+            Sessions to pool; None pools the whole cohort.
+        """
+        if stream not in STREAM_NAMES:
+            raise ValueError("Unknown stream: %s" % stream)
+        sql = "SELECT counts FROM stream_histograms WHERE stream = ?"
+        values = [stream]
+        if session_ids is not None:
+            session_ids = list(session_ids)
+            if not session_ids:
+                return None
+            sql += " AND session_id IN (%s)" % ", ".join("?" * len(session_ids))
+            values.extend(session_ids)
+        total = np.zeros(len(STREAM_EDGES) - 1, dtype=np.int64)
+        with self._lock:
+            for (blob,) in self._db.execute(sql, values):
+                total += np.frombuffer(blob, dtype=np.int64)
+        return histogram_percentile(total, STREAM_EDGES, q)
+
+
+class SessionRecorder:
+    """Collects the feature frames a live session sends to Streamlit.
+
+    The blob script sends ``audioData`` as a JSON string whenever it changes.
+    Each payload is stamped with its receipt time, and :meth:`features`
+    returns the streams in the shape :meth:`CohortIndex.add_session` expects.
+
+    Frames and metadata live in ``store`` (see :mod:`screening.session_store`).
+    Creating a recorder for a ``session_id`` the store already holds resumes
+    that session, possibly in another process.
+    """
+
+    def __init__(self, session_id=None, store=None):
+        self.session_id = session_id or "live-%d" % int(time.time() * 1000)
+        self.store = store if store is not None else MemoryStore()
+        meta = self.store.get_meta(self.session_id)
+        if meta and "started_at" in meta:
+            self.started_at = meta["started_at"]
+            self._last_payload = meta.get("last_payload")
+        else:
+            self.started_at = time.time()
+            self._last_payload = None
+            self.store.update_meta(self.session_id, {"started_at": self.started_at})
+
+    def __len__(self):
+        return self.store.frame_count(self.session_id)
+
+    def add_payload(self, payload, received_at=None):
+        """Record one payload; repeats of the previous payload are ignored.
+
+        Payloads are compared without their ``seq`` and ``micActive``
+        fields, so heartbeats that only renumber the last frame are not
+        recorded again.
+        """
+        if not payload:
+            return False
+        if isinstance(payload, str):
+            try:
+                data = json.loads(payload)
+            except ValueError:
+                return False
+        elif isinstance(payload, dict):
+            data = payload
+        else:
+            return False
+        if not isinstance(data, dict):
+            return False
+        data = {key: value for key, value in data.items() if key not in _TRANSPORT_FIELDS}
+        if data == self._last_payload:
+            return False
+        self._last_payload = data
+        received_at = time.time() if received_at is None else received_at
+        self.store.append(self.session_id, [received_at],
+                          [[float(data.get(stream, 0.0)) for stream in STREAM_NAMES]],
+                          meta={"last_payload": data})
+        return True
+
+    def features(self):
+        times, values = self.store.read_frames(self.session_id)
+        features = {stream: (values[:, column] if len(times) else np.zeros(0)).astype(np.float32)
+                    for column, stream in enumerate(STREAM_NAMES)}
+        features["time"] = times - self.started_at
+        return features
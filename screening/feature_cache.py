@@ -0,0 +1,205 @@
+"""Content-addressed on-disk cache for intermediate analysis results.
+
+Entries are keyed by the SHA-256 of the source recording plus the parameters
+of every stage that produced them (see :mod:`screening.features`). Each entry
+is one ``.npz`` file; a small SQLite index tracks sizes and last access so
+the cache can evict least recently used entries under a byte cap.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_MAX_BYTES = 50 * 1024 ** 3
+
+_HASH_CHUNK = 1024 * 1024
+
+
+class FeatureCache:
+    """LRU cache of named NumPy arrays stored under ``directory``.
+
+    Parameters
+    ----------
+    directory: str
+        Where entries and the index live. Created if missing.
+    max_bytes: int
+        Total size of stored entries above which the least recently used
+        ones are evicted.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_bytes = int(max_bytes)
+        os.makedirs(os.path.join(self.directory, "objects"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(self.directory, "index.sqlite"),
+                                   timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access);
+            CREATE TABLE IF NOT EXISTS file_hashes (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                digest TEXT NOT NULL
+            );
+        """)
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Keys
+
+    def content_hash(self, path):
+        """Return the SHA-256 of a file's contents.
+
+        The digest is remembered per path, size and modification time, so an
+        unchanged file is only read once.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest FROM file_hashes WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, stat.st_size, stat.st_mtime_ns)).fetchone()
+        if row:
+            return row[0]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(_HASH_CHUNK), b""):
+                digest.update(chunk)
+        digest = digest.hexdigest()
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, digest))
+            self._db.commit()
+        return digest
+
+    @staticmethod
+    def stage_key(parent_key, stage, params):
+        """Derive the key of a stage from its input's key and its parameters."""
+        payload = json.dumps([parent_key, stage, params], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # Entries
+
+    def _path(self, key):
+        return os.path.join(self.directory, "objects", key[:2], key + ".npz")
+
+    def get(self, key):
+        """Return the arrays stored under ``key``, or None on a miss."""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError):
+            # Missing, evicted by another process or truncated
+            with self._lock:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._db.commit()
+            return None
+
+        with self._lock:
+            self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?",
+                             (time.time(), key))
+            self._db.commit()
+        return arrays
+
+    def put(self, key, arrays):
+        """Store a dict of arrays under ``key`` and evict down to the size cap.
+
+        Entries larger than the whole cap are not stored.
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as tmp:
+                np.savez(tmp, **arrays)
+            size = os.path.getsize(tmp_path)
+            if size > self.max_bytes:
+                os.remove(tmp_path)
+                return
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, size, last_access) VALUES (?, ?, ?)",
+                (key, size, time.time()))
+            self._db.commit()
+        self.evict(keep=key)
+
+    def get_or_compute(self, key, compute):
+        """Return the entry for ``key``, calling ``compute()`` and storing it on a miss."""
+        arrays = self.get(key)
+        if arrays is None:
+            arrays = compute()
+            self.put(key, arrays)
+        return arrays
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the total fits ``max_bytes``."""
+        with self._lock:
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            victims = []
+            for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY last_access"):
+                if total <= self.max_bytes:
+                    break
+                if key == keep:
+                    continue
+                victims.append(key)
+                total -= size
+            self._db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in victims])
+            self._db.commit()
+
+        for key in victims:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            keys = [row[0] for row in self._db.execute("SELECT key FROM entries")]
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        """Return the number of entries and their total size in bytes."""
+        with self._lock:
+            count, total = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"entries": count, "bytes": total, "max_bytes": self.max_bytes}
@@ -0,0 +1,326 @@
+"""Offline port of the browser feature pipeline.
+
+The blob script (``assets/blob.js``) polls an ``AnalyserNode`` every 50 ms
+and turns the byte spectrum into ``overallLevel``, ``midLevel``,
+``trebleLevel``, ``frequencySpread`` and ``pitchProxy`` in ``updateAudio()``. This module
+reproduces that pipeline for recorded audio so archived sessions can be
+re-analysed with different constants.
+
+The pipeline is split into stages, each depending only on the output of the
+previous one and its own parameters:
+
+``pcm``
+    Decoded mono float32 samples at the analysis sample rate.
+``spectra``
+    Byte spectra as returned by ``getByteFrequencyData()``, one row per poll.
+``bands``
+    Unsmoothed per-poll targets (normalized levels, spread, pitch).
+``features``
+    The smoothed streams the browser sends to Streamlit.
+
+Passing a :class:`~screening.feature_cache.FeatureCache` to
+:func:`analyze_file` stores every stage, so changing a downstream parameter
+only recomputes the stages after it.
+"""
+
+import wave
+
+import numpy as np
+
+DEFAULT_PARAMS = {
+    # pcm
+    "sample_rate": 48000,
+    # spectra (AnalyserNode settings and the audioUpdateMs poll)
+    "fft_size": 512,
+    "frame_ms": 50,
+    "smoothing_time_constant": 0.75,
+    "min_decibels": -100.0,
+    "max_decibels": -30.0,
+    # bands
+    "mid_end_freq": 4000.0,
+    "treble_start_freq": 4000.0,
+    "pitch_min_freq": 80.0,
+    "pitch_max_freq": 500.0,
+    "pitch_min_amplitude": 15,
+    "active_bin_threshold": 10,
+    "level_scale": 160.0,
+    # features
+    "level_lerp": 0.1,
+    "pitch_lerp": 0.06,
+    "spread_lerp": 0.03,
+}
+
+# Parameters consumed by each stage, in pipeline order
+STAGE_PARAMS = (
+    ("pcm", ("sample_rate",)),
+    ("spectra", ("fft_size", "frame_ms", "smoothing_time_constant",
+                 "min_decibels", "max_decibels")),
+    ("bands", ("mid_end_freq", "treble_start_freq", "pitch_min_freq",
+               "pitch_max_freq", "pitch_min_amplitude", "active_bin_threshold",
+               "level_scale")),
+    ("features", ("level_lerp", "pitch_lerp", "spread_lerp")),
+)
+
+FEATURE_NAMES = ("overallLevel", "midLevel", "trebleLevel", "frequencySpread", "pitchProxy")
+
+# Frames transformed per FFT block, bounds peak memory on long recordings
+_FFT_BLOCK = 4096
+
+
+def resolve_params(params=None):
+    """Return a full parameter dict, filling gaps from ``DEFAULT_PARAMS``.
+
+    Raises
+    ------
+    ValueError
+        If ``params`` contains a name no stage uses.
+    """
+    resolved = dict(DEFAULT_PARAMS)
+    if params:
+        unknown = set(params) - set(DEFAULT_PARAMS)
+        if unknown:
+            raise ValueError("Unknown analysis parameters: %s" % ", ".join(sorted(unknown)))
+        resolved.update(params)
+    return resolved
+
+
+def stage_params(stage, params):
+    """Return the subset of ``params`` that ``stage`` depends on."""
+    for name, keys in STAGE_PARAMS:
+        if name == stage:
+            return {key: params[key] for key in keys}
+    raise ValueError("Unknown stage: %s" % stage)
+
+
+def decode_pcm(path, sample_rate=None):
+    """Decode a PCM WAV file to mono float32 samples in [-1, 1].
+
+    Parameters
+    ----------
+    path: str
+        Path to a 8, 16, 24 or 32-bit integer PCM WAV file.
+    sample_rate: int or None
+        Resample to this rate with linear interpolation. None keeps the
+        file's own rate.
+
+    Returns
+    -------
+    tuple of (numpy.ndarray, int)
+        The samples and their sample rate.
+    """
+    with wave.open(path, "rb") as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        packed = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        ints = (packed[:, 0].astype(np.int32)
+                | (packed[:, 1].astype(np.int32) << 8)
+                | (packed[:, 2].astype(np.int32) << 16))
+        ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+        samples = ints.astype(np.float32) / 8388608.0
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError("Unsupported sample width %d in %s" % (width, path))
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+
+    if sample_rate and sample_rate != rate and len(samples):
+        duration = len(samples) / float(rate)
+        target_len = int(round(duration * sample_rate))
+        source_t = np.arange(len(samples), dtype=np.float64) / rate
+        target_t = np.arange(target_len, dtype=np.float64) / sample_rate
+        samples = np.interp(target_t, source_t, samples).astype(np.float32)
+        rate = sample_rate
+
+    return np.ascontiguousarray(samples, dtype=np.float32), int(rate)
+
+
+def compute_spectra(pcm, sample_rate, fft_size=512, frame_ms=50,
+                    smoothing_time_constant=0.75, min_decibels=-100.0,
+                    max_decibels=-30.0):
+    """Emulate ``AnalyserNode.getByteFrequencyData()`` polled every ``frame_ms``.
+
+    Each poll windows the most recent ``fft_size`` samples with a Blackman
+    window, smooths the magnitudes over time with ``smoothing_time_constant``
+    and maps decibels in ``[min_decibels, max_decibels]`` to 0-255.
+
+    Returns
+    -------
+    numpy.ndarray
+        uint8 array of shape ``(frames, fft_size // 2)``.
+    """
+    hop = max(1, int(round(sample_rate * frame_ms / 1000.0)))
+    bins = fft_size // 2
+    frames = len(pcm) // hop
+    if frames == 0:
+        return np.zeros((0, bins), dtype=np.uint8)
+
+    # Poll n sees the fft_size samples ending at (n + 1) * hop
+    padded = np.concatenate([np.zeros(fft_size, dtype=np.float32), pcm[:frames * hop]])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, fft_size)
+    starts = np.arange(1, frames + 1) * hop
+    window = np.blackman(fft_size).astype(np.float32)
+
+    magnitudes = np.empty((frames, bins), dtype=np.float32)
+    for begin in range(0, frames, _FFT_BLOCK):
+        block = windows[starts[begin:begin + _FFT_BLOCK]] * window
+        spectrum = np.fft.rfft(block, axis=1)[:, :bins]
+        magnitudes[begin:begin + _FFT_BLOCK] = np.abs(spectrum) / fft_size
+
+    # Recursive smoothing has to run in poll order
+    tau = float(smoothing_time_constant)
+    if tau > 0:
+        previous = np.zeros(bins, dtype=np.float32)
+        for index in range(frames):
+            previous = tau * previous + (1.0 - tau) * magnitudes[index]
+            magnitudes[index] = previous
+
+    with np.errstate(divide="ignore"):
+        decibels = 20.0 * np.log10(magnitudes)
+    scaled = (decibels - min_decibels) * (255.0 / (max_decibels - min_decibels))
+    return np.clip(np.floor(scaled), 0, 255).astype(np.uint8)
+
+
+def compute_bands(spectra, sample_rate, fft_size=512, mid_end_freq=4000.0,
+                  treble_start_freq=4000.0, pitch_min_freq=80.0,
+                  pitch_max_freq=500.0, pitch_min_amplitude=15,
+                  active_bin_threshold=10, level_scale=160.0):
+    """Compute the unsmoothed per-poll targets from byte spectra.
+
+    Mirrors the band sums, ``/level_scale`` normalization, active-bin spread
+    and peak-bin pitch proxy of ``updateAudio()``, for all polls at once.
+
+    Returns
+    -------
+    dict of numpy.ndarray
+        float32 arrays keyed by feature name.
+    """
+    fbc = spectra.shape[1]
+    nyquist = sample_rate / 2.0
+    bin_width = nyquist / fbc
+    mid_end = min(fbc - 1, int(np.ceil(mid_end_freq / bin_width)))
+    treble_start = min(fbc - 1, int(np.floor(treble_start_freq / bin_width)))
+    pitch_min = max(1, int(np.floor(pitch_min_freq / bin_width)))
+    pitch_max = min(fft_size // 2 - 1, int(np.ceil(pitch_max_freq / bin_width)))
+
+    levels = spectra.astype(np.float32)
+    overall = levels.sum(axis=1) / fbc if fbc else np.zeros(len(levels), dtype=np.float32)
+    mid = levels[:, :mid_end + 1].sum(axis=1) / (mid_end + 1)
+    # Treble bins are the ones not already counted as mid, but the browser
+    # divides by every bin from treble_start up
+    treble_from = max(treble_start, mid_end + 1)
+    treble_bins = fbc - treble_start
+    if treble_bins > 0:
+        treble = levels[:, treble_from:].sum(axis=1) / treble_bins
+    else:
+        treble = np.zeros(len(levels), dtype=np.float32)
+
+    spread = (spectra > active_bin_threshold).sum(axis=1).astype(np.float32) / fbc
+
+    pitch_band = spectra[:, pitch_min:pitch_max + 1]
+    peak = pitch_band.argmax(axis=1)
+    peak_amp = pitch_band.max(axis=1)
+    pitch = np.where(peak_amp > pitch_min_amplitude,
+                     np.clip(peak / float(max(1, pitch_max - pitch_min)), 0, 1),
+                     0.5)
+
+    return {
+        "overallLevel": np.clip(overall / level_scale, 0, 1).astype(np.float32),
+        "midLevel": np.clip(mid / level_scale, 0, 1).astype(np.float32),
+        "trebleLevel": np.clip(treble / level_scale, 0, 1).astype(np.float32),
+        "frequencySpread": spread,
+        "pitchProxy": pitch.astype(np.float32),
+    }
+
+
+def smooth_features(bands, level_lerp=0.1, pitch_lerp=0.06, spread_lerp=0.03):
+    """Apply the exponential smoothing ``updateAudio()`` uses between polls.
+
+    Returns
+    -------
+    dict of numpy.ndarray
+        The smoothed streams, keyed like the browser's ``audioData``.
+    """
+    targets = np.stack([bands[name] for name in FEATURE_NAMES], axis=1).astype(np.float64)
+    factors = np.array([level_lerp, level_lerp, level_lerp, spread_lerp, pitch_lerp])
+    state = np.array([0.0, 0.0, 0.0, 0.0, 0.5])
+    smoothed = np.empty_like(targets)
+    for index in range(len(targets)):
+        state = state + (targets[index] - state) * factors
+        smoothed[index] = state
+    return {name: smoothed[:, column].astype(np.float32)
+            for column, name in enumerate(FEATURE_NAMES)}
+
+
+def analyze_file(path, params=None, cache=None):
+    """Run the full feature pipeline over a recording.
+
+    Parameters
+    ----------
+    path: str
+        Path to a PCM WAV recording.
+    params: dict or None
+        Overrides for ``DEFAULT_PARAMS``.
+    cache: FeatureCache or None
+        If given, each stage is looked up by the file's content hash and the
+        parameters of that stage and every stage before it, and stored on a
+        miss.
+
+    Returns
+    -------
+    dict of numpy.ndarray
+        The smoothed feature streams plus ``time`` (seconds of each poll).
+    """
+    params = resolve_params(params)
+    sample_rate = params["sample_rate"]
+
+    def run_pcm():
+        pcm, rate = decode_pcm(path, sample_rate)
+        return {"pcm": pcm, "sample_rate": np.array(rate)}
+
+    def run_spectra(pcm_result):
+        rate = int(pcm_result["sample_rate"])
+        spectra = compute_spectra(pcm_result["pcm"], rate, **stage_params("spectra", params))
+        return {"spectra": spectra, "sample_rate": np.array(rate)}
+
+    def run_bands(spectra_result):
+        return compute_bands(spectra_result["spectra"], int(spectra_result["sample_rate"]),
+                             fft_size=params["fft_size"], **stage_params("bands", params))
+
+    def run_features(bands):
+        return smooth_features(bands, **stage_params("features", params))
+
+    if cache is None:
+        features = run_features(run_bands(run_spectra(run_pcm())))
+    else:
+        key = cache.content_hash(path)
+        # Stages load lazily, so a hit on a late stage never touches the
+        # earlier ones
+        pcm_key = cache.stage_key(key, "pcm", stage_params("pcm", params))
+        spectra_key = cache.stage_key(pcm_key, "spectra", stage_params("spectra", params))
+        bands_key = cache.stage_key(spectra_key, "bands", stage_params("bands", params))
+        features_key = cache.stage_key(bands_key, "features", stage_params("features", params))
+
+        def load_spectra():
+            return cache.get_or_compute(
+                spectra_key, lambda: run_spectra(cache.get_or_compute(pcm_key, run_pcm)))
+
+        def load_bands():
+            return cache.get_or_compute(bands_key, lambda: run_bands(load_spectra()))
+
+        features = cache.get_or_compute(features_key, lambda: run_features(load_bands()))
+
+    frames = len(features["overallLevel"])
+    features = dict(features)
+    features["time"] = (np.arange(1, frames + 1) * (params["frame_ms"] / 1000.0)).astype(np.float32)
+    return features
+
@@ -0,0 +1,250 @@
+"""Micro-batched local inference over live feature windows.
+
+Every active session periodically submits its latest feature window. A
+single background thread gathers the pending windows of all sessions into
+one batch and runs one forward pass. The batch closes when it is full or
+when the oldest request has waited ``max_latency_ms``. Results are kept per
+session, so each session's page shows its newest prediction on the next
+rerun.
+
+Models are loaded from disk and run in-process:
+
+``.npz``
+    A NumPy multilayer perceptron with arrays ``W0, b0, W1, b1, ...``. ReLU
+    is applied between layers and softmax on the output, or a sigmoid if
+    there is a single output. Optional ``labels`` names the outputs.
+``.onnx``
+    Run with ``onnxruntime`` if it is installed.
+"""
+
+import collections
+import concurrent.futures
+import os
+import threading
+import time
+
+import numpy as np
+
+from screening.similarity import DEFAULT_RATE_HZ, DEFAULT_WINDOW_S, resample_trajectory, z_normalize
+
+
+class NumpyModel:
+    """Multilayer perceptron stored as an ``.npz`` file."""
+
+    def __init__(self, path):
+        with np.load(path, allow_pickle=False) as data:
+            count = len([name for name in data.files if name.startswith("W")])
+            if count == 0:
+                raise ValueError("%s has no W0/b0 weight arrays" % path)
+            self.weights = [(data["W%d" % i].astype(np.float32), data["b%d" % i].astype(np.float32))
+                            for i in range(count)]
+            self.labels = [str(label) for label in data["labels"]] if "labels" in data.files else None
+        self.input_size = self.weights[0][0].shape[0]
+
+    def __call__(self, batch):
+        values = batch.reshape(len(batch), -1)
+        for index, (weight, bias) in enumerate(self.weights):
+            values = values @ weight + bias
+            if index < len(self.weights) - 1:
+                np.maximum(values, 0, out=values)
+        if values.shape[1] == 1:
+            return 1.0 / (1.0 + np.exp(-values))
+        values = np.exp(values - values.max(axis=1, keepdims=True))
+        return values / values.sum(axis=1, keepdims=True)
+
+
+class OnnxModel:
+    """ONNX model run with ``onnxruntime`` on the CPU."""
+
+    def __init__(self, path):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise ImportError("Running .onnx models requires onnxruntime: pip install onnxruntime")
+        self.session = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_rank = len(model_input.shape)
+        self.labels = None
+
+    def __call__(self, batch):
+        if self.input_rank == 2:
+            batch = batch.reshape(len(batch), -1)
+        return self.session.run(None, {self.input_name: batch.astype(np.float32)})[0]
+
+
+def load_model(path):
+    """Load a ``.npz`` or ``.onnx`` model for :class:`InferenceScheduler`."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".npz":
+        return NumpyModel(path)
+    if extension == ".onnx":
+        return OnnxModel(path)
+    raise ValueError("Unsupported model format: %s" % path)
+
+
+def feature_window(features, window_s=DEFAULT_WINDOW_S, rate_hz=DEFAULT_RATE_HZ):
+    """Return the most recent window of a session as model input.
+
+    The streams are resampled to ``rate_hz`` and z-normalized per stream, as
+    for similarity search.
+
+    Returns
+    -------
+    numpy.ndarray or None
+        float32 array of shape ``(frames, streams)``, or None if
+        the session is shorter than one window.
+    """
+    frames = int(round(window_s * rate_hz))
+    trajectory = resample_trajectory(features, rate_hz)
+    if len(trajectory) < frames:
+        return None
+    return z_normalize(trajectory[-frames:])
+
+
+class InferenceScheduler:
+    """Collects windows from all sessions into micro-batches for one model.
+
+    Parameters
+    ----------
+    model: callable
+        Maps a ``(batch, ...)`` float32 array to a ``(batch, outputs)`` array.
+    max_batch: int
+        Largest batch run in one forward pass.
+    max_latency_ms: float
+        Longest time the oldest pending window waits before its batch runs,
+        full or not.
+    """
+
+    def __init__(self, model, max_batch=32, max_latency_ms=50.0):
+        self.model = model
+        self.max_batch = int(max_batch)
+        self.max_latency = max_latency_ms / 1000.0
+        self._condition = threading.Condition()
+        # session id -> (window, future, submitted_at); insertion order is age
+        self._pending = collections.OrderedDict()
+        self._results = {}
+        # Sessions of the batch being run; forget() removes its session so
+        # the batch does not store a result for it afterwards
+        self._in_flight = set()
+        self._closed = False
+        self._batches = 0
+        self._windows = 0
+        self._batch_sizes = collections.deque(maxlen=1000)
+        self._latencies = collections.deque(maxlen=1000)
+        self._last_error = None
+        self._thread = threading.Thread(target=self._run, name="inference-scheduler", daemon=True)
+        self._thread.start()
+
+    def submit(self, session_id, window):
+        """Queue a window for ``session_id`` and return a Future for its output.
+
+        A session has at most one pending window. A newer window replaces the
+        queued one, whose Future then resolves with the newer result.
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("InferenceScheduler is closed")
+            previous = self._pending.pop(session_id, None)
+            if previous and previous[1].cancelled():
+                previous = None
+            future = previous[1] if previous else concurrent.futures.Future()
+            submitted_at = previous[2] if previous else time.monotonic()
+            self._pending[session_id] = (np.asarray(window, dtype=np.float32), future, submitted_at)
+            self._condition.notify()
+        return future
+
+    def latest(self, session_id):
+        """Return the newest ``{"output", "labels", "completed_at"}`` for a session, or None."""
+        with self._condition:
+            return self._results.get(session_id)
+
+    def forget(self, session_id):
+        """Drop a finished session's pending window and stored result."""
+        with self._condition:
+            pending = self._pending.pop(session_id, None)
+            self._results.pop(session_id, None)
+            self._in_flight.discard(session_id)
+        if pending:
+            pending[1].cancel()
+
+    def _next_batch(self):
+        with self._condition:
+            while not self._closed:
+                if self._pending:
+                    oldest = next(iter(self._pending.values()))[2]
+                    wait = oldest + self.max_latency - time.monotonic()
+                    if len(self._pending) >= self.max_batch or wait <= 0:
+                        break
+                    self._condition.wait(wait)
+                else:
+                    self._condition.wait()
+            if self._closed:
+                return []
+            batch = []
+            while self._pending and len(batch) < self.max_batch:
+                session_id, (window, future, submitted_at) = self._pending.popitem(last=False)
+                # Callers may cancel their Future; a running one can no longer be
+                if future.set_running_or_notify_cancel():
+                    batch.append((session_id, window, future, submitted_at))
+            self._in_flight = {item[0] for item in batch}
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                if self._closed:
+                    return
+                continue
+            try:
+                outputs = np.asarray(self.model(np.stack([item[1] for item in batch])))
+            except Exception as error:
+                self._last_error = repr(error)
+                for _, _, future, _ in batch:
+                    future.set_exception(error)
+                continue
+
+            finished = time.monotonic()
+            labels = getattr(self.model, "labels", None)
+            with self._condition:
+                self._batches += 1
+                self._windows += len(batch)
+                self._batch_sizes.append(len(batch))
+                for (session_id, _, future, submitted_at), output in zip(batch, outputs):
+                    self._latencies.append(finished - submitted_at)
+                    if session_id in self._in_flight:
+                        self._results[session_id] = {
+                            "output": output,
+                            "labels": labels,
+                            "completed_at": time.time(),
+                        }
+                    future.set_result(output)
+                self._in_flight = set()
+
+    def metrics(self):
+        """Return queue depth, batch size and latency statistics."""
+        with self._condition:
+            sizes = np.asarray(self._batch_sizes, dtype=np.float64)
+            latencies = np.asarray(self._latencies, dtype=np.float64) * 1000
+            return {
+                "queue_depth": len(self._pending),
+                "batches": self._batches,
+                "windows": self._windows,
+                "mean_batch_size": float(sizes.mean()) if len(sizes) else 0.0,
+                "max_batch_size": int(sizes.max()) if len(sizes) else 0,
+                "latency_p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+                "latency_p95_ms": float(np.percentile(latencies, 95)) if len(latencies) else 0.0,
+                "last_error": self._last_error,
+            }
+
+    def close(self):
+        """Stop the worker thread; pending windows are cancelled."""
+        with self._condition:
+            self._closed = True
+            pending = list(self._pending.values())
+            self._pending.clear()
+            self._condition.notify_all()
+        for _, future, _ in pending:
+            future.cancel()
+        self._thread.join()
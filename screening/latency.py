@@ -0,0 +1,177 @@
+"""End-to-end latency tracing of live feature frames.
+
+With tracing on, the blob script adds a ``trace`` object to each payload.
+Its stamps are milliseconds on the browser's monotonic clock
+(``performance.timeOrigin + performance.now()``):
+
+``id``
+    Frame number, increasing for the lifetime of the page.
+``capture``
+    Estimated time the analysed audio reached the microphone: the feature
+    poll minus half the FFT window and the device input latency.
+``features``
+    Feature computation in ``updateAudio()``.
+``send``
+    ``Streamlit.setComponentValue``.
+``rendered``
+    ``{"id", "at"}``: end of the first canvas frame drawn with the features
+    of an earlier frame, usually the previous one, or null.
+``poll``, ``analyserLag``, ``levelLag``, ``drawLag``
+    Measured poll interval and the delays of the exponential smoothers it
+    implies (AnalyserNode smoothing, level lerp, peak easing in the sketch).
+
+:class:`LatencyTracer` adds the Python receipt time and keeps a bounded
+window of each stage. Receipt is compared with ``time.time()``, so the
+``send_to_receipt`` stage is only exact when browser and server share a
+clock; across machines it also contains their clock offset.
+"""
+
+import collections
+import json
+import time
+
+# Stage name, description
+STAGES = (
+    ("capture_to_features", "Microphone to feature computation (window + input latency)"),
+    ("poll_wait", "Wait for the next feature poll (half the poll interval)"),
+    ("analyser_smoothing", "AnalyserNode smoothing delay"),
+    ("level_smoothing", "Level lerp delay in updateAudio()"),
+    ("features_to_send", "Feature computation to component send"),
+    ("features_to_render", "Feature computation to drawn frame"),
+    ("draw_smoothing", "Peak easing delay in the sketch"),
+    ("send_to_receipt", "Component send to Python receipt"),
+    ("capture_to_pixels", "Microphone to pixels, including smoothing"),
+    ("capture_to_server", "Microphone to Python, including smoothing"),
+)
+
+# Render stamps arrive with a later payload; features stamps are kept this long
+_PENDING_FRAMES = 64
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q / 100.0 * len(ordered)))]
+
+
+class LatencyTracer:
+    """Per-stage latency distributions for one live session.
+
+    Parameters
+    ----------
+    window: int
+        Number of recent samples kept per stage.
+    """
+
+    def __init__(self, window=600):
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self._samples = {name: collections.deque(maxlen=self.window) for name, _ in STAGES}
+        self._pending = collections.OrderedDict()
+        self._last_id = None
+        self.frames = 0
+
+    def _add(self, stage, value):
+        self._samples[stage].append(float(value))
+
+    def receive(self, payload, received_at=None):
+        """Record the trace of a payload and return the payload without it.
+
+        Payloads without a trace are returned unchanged. A payload seen again
+        (Streamlit reruns for other reasons keep the last component value) is
+        not recorded twice.
+
+        Parameters
+        ----------
+        payload: str or None
+            JSON payload from the blob script.
+        received_at: float, optional
+            Receipt time in seconds since the epoch; defaults to now.
+
+        Returns
+        -------
+        str or None
+        """
+        if received_at is None:
+            received_at = time.time()
+        if not payload:
+            return payload
+        try:
+            data = json.loads(payload)
+        except (TypeError, ValueError):
+            return payload
+        if not isinstance(data, dict) or "trace" not in data:
+            return payload
+        trace = data.pop("trace")
+        stripped = json.dumps(data)
+        if not isinstance(trace, dict) or trace.get("id") == self._last_id:
+            return stripped
+        self._last_id = trace.get("id")
+
+        try:
+            self._record(trace, received_at * 1000.0)
+        except (KeyError, TypeError, ValueError):
+            pass
+        return stripped
+
+    def _record(self, trace, received_ms):
+        # Read every field before recording anything, so a malformed trace
+        # leaves no partial record behind
+        trace_id = trace["id"]
+        capture = float(trace["capture"])
+        features = float(trace["features"])
+        send = float(trace["send"])
+        analyser_lag = float(trace["analyserLag"])
+        level_lag = float(trace["levelLag"])
+        draw_lag = float(trace["drawLag"])
+        poll_wait = float(trace["poll"]) / 2.0
+        smoothing = analyser_lag + level_lag
+        rendered = trace.get("rendered")
+        render = None
+        if isinstance(rendered, dict) and rendered.get("id") in self._pending:
+            render = (rendered["id"], float(rendered["at"]))
+
+        self.frames += 1
+        self._add("capture_to_features", features - capture)
+        self._add("poll_wait", poll_wait)
+        self._add("analyser_smoothing", analyser_lag)
+        self._add("level_smoothing", level_lag)
+        self._add("draw_smoothing", draw_lag)
+        self._add("features_to_send", send - features)
+        self._add("send_to_receipt", received_ms - send)
+        self._add("capture_to_server", received_ms - capture + poll_wait + smoothing)
+
+        if render is not None:
+            rendered_id, at = render
+            rendered_capture, rendered_features, delay = self._pending.pop(rendered_id)
+            self._add("features_to_render", at - rendered_features)
+            self._add("capture_to_pixels", at - rendered_capture + delay + draw_lag)
+
+        self._pending[trace_id] = (capture, features, poll_wait + smoothing)
+        while len(self._pending) > _PENDING_FRAMES:
+            self._pending.popitem(last=False)
+
+    def summary(self):
+        """Return one row per stage with samples.
+
+        Returns
+        -------
+        list of dict
+            ``stage``, ``description``, ``count``, ``p50_ms``, ``p95_ms``
+            and ``max_ms``.
+        """
+        rows = []
+        for name, description in STAGES:
+            samples = self._samples[name]
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            rows.append({
+                "stage": name,
+                "description": description,
+                "count": len(ordered),
+                "p50_ms": round(_percentile(ordered, 50), 1),
+                "p95_ms": round(_percentile(ordered, 95), 1),
+                "max_ms": round(ordered[-1], 1),
+            })
+        return rows
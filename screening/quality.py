@@ -0,0 +1,249 @@
+"""Online signal-quality checks for live sessions.
+
+:class:`QualityMonitor` looks at each feature frame once and keeps a fixed
+amount of state, so the cost per frame does not depend on session length.
+It raises warnings for:
+
+``clipping``
+    ``overallLevel`` pinned at the top of its range for a noticeable share
+    of recent frames.
+``flatline``
+    No movement at all in the level or spread streams, as from a dead or
+    muted microphone that still reports values.
+``noise_floor``
+    A background level that stays high even between utterances.
+``spread_saturated``
+    ``frequencySpread`` staying high between utterances, typical of broadband
+    background noise.
+``level_shift``
+    An abrupt, sustained change of the noise floor (CUSUM alarm), e.g. a fan
+    turned on or the microphone moved.
+``gain_pumping``
+    Repeated noise floor shifts within a short time, typical of automatic
+    gain control fighting the input.
+
+Smoothing uses time constants rather than per-frame factors because live
+frames arrive at an irregular rate.
+
+Streamlit returns the last component value on every rerun, so a frame whose
+``seq`` equals the previous one is ignored. Frames with ``micActive`` false
+are not analysed, and no warnings are raised until the mic is on again.
+"""
+
+import collections
+import json
+import math
+
+DEFAULT_THRESHOLDS = {
+    "clip_level": 0.98,
+    "clip_fraction": 0.02,
+    "flatline_s": 10.0,
+    "flatline_epsilon": 1e-3,
+    "noise_floor_level": 0.25,
+    "spread_floor_level": 0.8,
+    "floor_hold_s": 3.0,
+    "cusum_drift": 0.5,
+    "cusum_limit": 8.0,
+    "pumping_alarms": 4,
+    "pumping_window_s": 60.0,
+    "shift_display_s": 5.0,
+}
+
+# Time constants in seconds
+_CLIP_TAU = 10.0
+_FLOOR_RISE_TAU = 10.0
+_BASELINE_TAU = 30.0
+# After the first frame and after each alarm the baseline just follows the
+# floor for this long, so one shift (and the floor's slow rise after it) is
+# one alarm
+_SETTLE_S = 5.0
+# Lower limit on the floor's standard deviation in the CUSUM, so a silent
+# room does not turn tiny changes into alarms
+_MIN_FLOOR_SD = 0.03
+
+WARNING_MESSAGES = {
+    "clipping": "The input is clipping. Move the microphone further away or lower its gain.",
+    "flatline": "No signal from the microphone for {flat_s:.0f} s. Check that it is connected and unmuted.",
+    "noise_floor": "Background noise is high ({noise_floor:.2f}). Find a quieter room if possible.",
+    "spread_saturated": "Broadband background noise is masking the voice.",
+    "level_shift": "The background level changed abruptly.",
+    "gain_pumping": "The input gain keeps changing. Automatic gain control may be active.",
+}
+
+
+def _smoothing(dt, tau):
+    return 1.0 - math.exp(-dt / tau) if dt > 0 else 0.0
+
+
+class QualityMonitor:
+    """Constant-time-per-frame quality detectors for one session.
+
+    Parameters
+    ----------
+    **thresholds
+        Overrides for ``DEFAULT_THRESHOLDS``.
+    """
+
+    def __init__(self, **thresholds):
+        unknown = set(thresholds) - set(DEFAULT_THRESHOLDS)
+        if unknown:
+            raise ValueError("Unknown quality thresholds: %s" % ", ".join(sorted(unknown)))
+        self.thresholds = dict(DEFAULT_THRESHOLDS, **thresholds)
+        # Payload state outlives reset(), which only clears the detectors
+        self.mic_active = True
+        self._last_seq = None
+        self.reset()
+
+    def reset(self):
+        self.frames = 0
+        self.clipped_frames = 0
+        self.floor_alarms = 0
+        self._last_time = None
+        self._previous = None
+        self._clip_share = 0.0
+        self._last_movement = None
+        self._noise_floor = None
+        self._spread_floor = None
+        self._floor_high_since = None
+        self._spread_high_since = None
+        self._baseline = 0.0
+        self._baseline_var = 0.0
+        self._cusum_high = 0.0
+        self._cusum_low = 0.0
+        self._last_shift = None
+        self._settle_until = None
+        # Alarm times within the pumping window; bounded by the alarm rate
+        self._recent_alarms = collections.deque()
+
+    def update(self, frame, now):
+        """Feed one feature frame received at ``now`` (seconds).
+
+        ``frame`` is the ``audioData`` dict or its JSON string. Frames that
+        cannot be parsed, repeats of the previous ``seq`` and frames sent
+        while the mic is off are ignored.
+        """
+        if isinstance(frame, str):
+            try:
+                frame = json.loads(frame)
+            except ValueError:
+                return
+        if not isinstance(frame, dict):
+            return
+        seq = frame.get("seq")
+        if seq is not None and seq == self._last_seq:
+            return
+        self._last_seq = seq
+        if not frame.get("micActive", True):
+            self.mic_active = False
+            return
+        if not self.mic_active:
+            # Mic switched back on: time and movement restart here, and the
+            # floor baseline settles again
+            self.mic_active = True
+            self._last_time = None
+            self._previous = None
+            self._settle_until = None
+
+        limits = self.thresholds
+        level = float(frame.get("overallLevel", 0.0))
+        spread = float(frame.get("frequencySpread", 0.0))
+        dt = 0.0 if self._last_time is None else max(0.0, now - self._last_time)
+        self._last_time = now
+        self.frames += 1
+
+        # Clipping: time-weighted share of frames at the top of the range
+        clipped = level >= limits["clip_level"]
+        self.clipped_frames += clipped
+        self._clip_share += (float(clipped) - self._clip_share) * _smoothing(dt, _CLIP_TAU)
+
+        # Flatline: time since either stream last moved
+        if (self._previous is None
+                or abs(level - self._previous[0]) > limits["flatline_epsilon"]
+                or abs(spread - self._previous[1]) > limits["flatline_epsilon"]):
+            self._last_movement = now
+        self._previous = (level, spread)
+
+        # Noise floors follow drops at once and rises slowly, so they track
+        # the quietest recent level rather than speech
+        if self._noise_floor is None:
+            self._noise_floor, self._spread_floor = level, spread
+        else:
+            rise = _smoothing(dt, _FLOOR_RISE_TAU)
+            self._noise_floor = level if level < self._noise_floor else (
+                self._noise_floor + (level - self._noise_floor) * rise)
+            self._spread_floor = spread if spread < self._spread_floor else (
+                self._spread_floor + (spread - self._spread_floor) * rise)
+        self._floor_high_since = self._hold(
+            self._floor_high_since, self._noise_floor > limits["noise_floor_level"], now)
+        self._spread_high_since = self._hold(
+            self._spread_high_since, self._spread_floor > limits["spread_floor_level"], now)
+
+        # Two-sided CUSUM of the noise floor against its slow EWMA baseline
+        if self._settle_until is None:
+            self._settle_until = now + _SETTLE_S
+        if now < self._settle_until:
+            self._baseline = self._noise_floor
+            self._baseline_var = 0.0
+        else:
+            deviation = self._noise_floor - self._baseline
+            weight = _smoothing(dt, _BASELINE_TAU)
+            self._baseline += deviation * weight
+            self._baseline_var = (1.0 - weight) * (self._baseline_var + weight * deviation * deviation)
+            z = deviation / max(math.sqrt(self._baseline_var), _MIN_FLOOR_SD)
+            self._cusum_high = max(0.0, self._cusum_high + z - limits["cusum_drift"])
+            self._cusum_low = max(0.0, self._cusum_low - z - limits["cusum_drift"])
+            if max(self._cusum_high, self._cusum_low) > limits["cusum_limit"]:
+                self.floor_alarms += 1
+                self._last_shift = now
+                self._recent_alarms.append(now)
+                self._cusum_high = self._cusum_low = 0.0
+                self._settle_until = now + _SETTLE_S
+
+        while self._recent_alarms and now - self._recent_alarms[0] > limits["pumping_window_s"]:
+            self._recent_alarms.popleft()
+
+    @staticmethod
+    def _hold(since, condition, now):
+        if not condition:
+            return None
+        return now if since is None else since
+
+    def warnings(self, now=None):
+        """Return the active warnings as a list of ``{"code", "message"}`` dicts.
+
+        ``now`` defaults to the time of the last frame.
+        """
+        if self._last_time is None or not self.mic_active:
+            return []
+        now = self._last_time if now is None else now
+        limits = self.thresholds
+        flat_s = now - self._last_movement
+        active = []
+        if self._clip_share > limits["clip_fraction"]:
+            active.append("clipping")
+        if flat_s >= limits["flatline_s"]:
+            active.append("flatline")
+        if self._floor_high_since is not None and now - self._floor_high_since >= limits["floor_hold_s"]:
+            active.append("noise_floor")
+        if self._spread_high_since is not None and now - self._spread_high_since >= limits["floor_hold_s"]:
+            active.append("spread_saturated")
+        if len(self._recent_alarms) >= limits["pumping_alarms"]:
+            active.append("gain_pumping")
+        elif self._last_shift is not None and now - self._last_shift <= limits["shift_display_s"]:
+            active.append("level_shift")
+
+        values = {"flat_s": flat_s, "noise_floor": self._noise_floor or 0.0}
+        return [{"code": code, "message": WARNING_MESSAGES[code].format(**values)}
+                for code in active]
+
+    def metrics(self):
+        """Return the detector state for display."""
+        return {
+            "frames": self.frames,
+            "mic_active": self.mic_active,
+            "clipped_frames": self.clipped_frames,
+            "clip_share": self._clip_share,
+            "noise_floor": self._noise_floor,
+            "spread_floor": self._spread_floor,
+            "floor_alarms": self.floor_alarms,
+        }
@@ -0,0 +1,868 @@
+"""Server-side rendering of the audio-reactive blob.
+
+Reproduces ``calculateBlobShape()``, ``drawInternalTexture()``, ``drawBlob()``
+and the mic icon from the browser sketch in ``assets/blob.js`` so reports can
+show how the blob looked during a recorded session.
+
+The work is split in three:
+
+* :func:`replay_sketch` replays the sketch's per-frame state (easing
+  recurrences on a small state vector, hue, noise clocks) in chunks of
+  frames, carrying the state from one chunk to the next.
+* :func:`chunk_geometry` computes everything per vertex (all 140 vertices of
+  all frames of a chunk) as whole-array NumPy operations, including a
+  vectorized port of p5's ``noise()``.
+* :func:`render_frames` rasterizes frames to RGB arrays. The blob outline is
+  star-shaped around the centre, so coverage is a comparison of every
+  pixel's radius with the outline's radius at the pixel's angle, with one
+  pixel of anti-aliasing. The nested fill layers are composited in a few
+  passes over the blob's bounding box instead of one pass per layer.
+
+:func:`render_session` runs the last two steps in a process pool and writes
+PNG frames or, when ``ffmpeg`` is installed, a video. :func:`blob_geometry`
+returns the geometry of a whole range at once.
+"""
+
+import collections
+import concurrent.futures
+import os
+import shutil
+import struct
+import subprocess
+import zlib
+
+import numpy as np
+
+TWO_PI = 2.0 * np.pi
+NUM_VERTICES = 140
+AUDIO_THRESHOLD = 0.09
+
+DEFAULT_STYLE = {"baseHue": 210, "sizeRatio": 0.2, "showMicIcon": True}
+
+# The sketch creates its background with p.color(248, 248, 248) after
+# switching to HSB mode, so the browser paints it as HSB
+BACKGROUND_HSB = (248.0, 248.0, 248.0)
+
+# Catmull-Rom segments are flattened to this many points each
+_CURVE_SAMPLES = 6
+_TEXTURE_STEPS = 10
+_STREAM_DEFAULTS = {"overallLevel": 0.0, "midLevel": 0.0, "trebleLevel": 0.0,
+                    "frequencySpread": 0.0, "pitchProxy": 0.5}
+
+# p5.js noise() constants
+_PERLIN_YWRAPB = 4
+_PERLIN_YWRAP = 1 << _PERLIN_YWRAPB
+_PERLIN_ZWRAPB = 8
+_PERLIN_ZWRAP = 1 << _PERLIN_ZWRAPB
+_PERLIN_SIZE = 4095
+
+
+def _scaled_cosine(values):
+    return 0.5 * (1.0 - np.cos(values * np.pi))
+
+
+class PerlinNoise:
+    """Vectorized port of p5.js ``noise()``.
+
+    Same lattice, cosine interpolation and octave falloff as p5; the random
+    table comes from ``seed`` instead of ``Math.random()``.
+    """
+
+    def __init__(self, seed=None, octaves=4, falloff=0.5):
+        self.table = np.random.default_rng(seed).random(_PERLIN_SIZE + 1)
+        self.octaves = octaves
+        self.falloff = falloff
+
+    def __call__(self, x, y=0.0, z=0.0):
+        x, y, z = np.broadcast_arrays(np.abs(np.asarray(x, dtype=np.float64)),
+                                      np.abs(np.asarray(y, dtype=np.float64)),
+                                      np.abs(np.asarray(z, dtype=np.float64)))
+        xi, yi, zi = (np.floor(v).astype(np.int64) for v in (x, y, z))
+        xf, yf, zf = x - xi, y - yi, z - zi
+        table = self.table
+        result = np.zeros(x.shape)
+        amplitude = 0.5
+
+        for _ in range(self.octaves):
+            offset = xi + (yi << _PERLIN_YWRAPB) + (zi << _PERLIN_ZWRAPB)
+            rxf, ryf = _scaled_cosine(xf), _scaled_cosine(yf)
+
+            n1 = table[offset & _PERLIN_SIZE]
+            n1 = n1 + rxf * (table[(offset + 1) & _PERLIN_SIZE] - n1)
+            n2 = table[(offset + _PERLIN_YWRAP) & _PERLIN_SIZE]
+            n2 = n2 + rxf * (table[(offset + _PERLIN_YWRAP + 1) & _PERLIN_SIZE] - n2)
+            n1 = n1 + ryf * (n2 - n1)
+
+            offset = offset + _PERLIN_ZWRAP
+            n2 = table[offset & _PERLIN_SIZE]
+            n2 = n2 + rxf * (table[(offset + 1) & _PERLIN_SIZE] - n2)
+            n3 = table[(offset + _PERLIN_YWRAP) & _PERLIN_SIZE]
+            n3 = n3 + rxf * (table[(offset + _PERLIN_YWRAP + 1) & _PERLIN_SIZE] - n3)
+            n2 = n2 + ryf * (n3 - n2)
+
+            n1 = n1 + _scaled_cosine(zf) * (n2 - n1)
+            result += n1 * amplitude
+            amplitude *= self.falloff
+
+            xi, yi, zi = xi << 1, yi << 1, zi << 1
+            xf, yf, zf = xf * 2, yf * 2, zf * 2
+            for whole, frac in ((xi, xf), (yi, yf), (zi, zf)):
+                carry = frac >= 1.0
+                whole += carry
+                frac -= carry
+        return result
+
+
+def _map(values, low, high, out_low, out_high, clamp=False):
+    """p5 ``map()``, optionally constrained to the output range."""
+    mapped = out_low + (np.asarray(values, dtype=np.float64) - low) * (out_high - out_low) / (high - low)
+    if clamp:
+        mapped = np.clip(mapped, min(out_low, out_high), max(out_low, out_high))
+    return mapped
+
+
+def _lerp(start, stop, amount):
+    return start + (stop - start) * amount
+
+
+def hsb_to_rgb(hue, saturation, brightness):
+    """Convert p5 HSB values (360, 100, 100) to RGB floats in 0-1.
+
+    Out-of-range inputs are clamped the way p5 clamps color components.
+    """
+    h = np.clip(np.asarray(hue, dtype=np.float64) / 360.0, 0.0, 1.0) * 6.0
+    s = np.clip(np.asarray(saturation, dtype=np.float64) / 100.0, 0.0, 1.0)
+    v = np.clip(np.asarray(brightness, dtype=np.float64) / 100.0, 0.0, 1.0)
+    sector = np.floor(h) % 6
+    f = h - np.floor(h)
+    p = v * (1 - s)
+    q = v * (1 - s * f)
+    t = v * (1 - s * (1 - f))
+    choices = [
+        (v, t, p), (q, v, p), (p, v, t), (p, q, v), (t, p, v), (v, p, q),
+    ]
+    r = np.select([sector == i for i in range(6)], [c[0] for c in choices])
+    g = np.select([sector == i for i in range(6)], [c[1] for c in choices])
+    b = np.select([sector == i for i in range(6)], [c[2] for c in choices])
+    return np.stack([r, g, b], axis=-1)
+
+
+def _streams_at(features, frame_times):
+    """Sample-and-hold the feature streams at each render frame time.
+
+    The browser updates ``audioData`` every 50 ms and every frame drawn in
+    between sees the latest value.
+    """
+    times = np.asarray(features["time"], dtype=np.float64)
+    index = np.searchsorted(times, frame_times, side="right") - 1
+    streams = {}
+    for name, default in _STREAM_DEFAULTS.items():
+        values = np.asarray(features.get(name, np.full(len(times), default)), dtype=np.float64)
+        if len(values) == 0:
+            streams[name] = np.full(len(frame_times), default)
+        else:
+            streams[name] = np.where(index >= 0, values[np.clip(index, 0, None)], default)
+    return streams
+
+
+def _frame_lerp(factor, time_delta):
+    return 1.0 - np.power(1.0 - np.asarray(factor, dtype=np.float64), time_delta)
+
+
+# Eased sketch parameters: name, start value, per-frame factor at 60 fps
+_EASED = (
+    ("peak_multiplier", 1.0, 0.08),
+    ("waviness_influence", 0.0, 0.012),
+    ("waviness_scale", 3.5, 0.01),
+    ("texture_intensity", 0.04, 0.012),
+    ("shape_scale", 0.9, 0.008),
+    ("passive_deformation", 0.04, 0.008),
+    ("edge_sharpness", 1.0, 0.015),
+    ("texture_alpha", 0.0, 0.015),
+)
+
+# Frames replayed per chunk; bounds memory for sessions of any length
+DEFAULT_CHUNK_FRAMES = 256
+
+
+def replay_sketch(features, fps=30, width=480, height=480, style=None, seed=0,
+                  start_s=0.0, duration_s=None, chunk_frames=DEFAULT_CHUNK_FRAMES):
+    """Replay the sketch's per-frame state over a session, chunk by chunk.
+
+    Only the per-frame scalars are computed here (eased parameters, hue,
+    noise clocks). The eased state, the hue and the running noise clocks
+    carry over from one chunk to the next. The per-vertex work is left to
+    :func:`chunk_geometry`, so chunks are small and can be handed to worker
+    processes.
+
+    Frames before ``start_s`` are replayed but not yielded, so the easing
+    has warmed up from the start of the session as in the browser.
+
+    Parameters
+    ----------
+    features, fps, width, height, style, seed, start_s, duration_s
+        See :func:`blob_geometry`.
+    chunk_frames: int
+        Frames per yielded chunk.
+
+    Yields
+    ------
+    dict
+        Scalars describing the canvas, ``first_frame`` (index of the chunk's
+        first frame from ``start_s``) and per-frame arrays. A range shorter
+        than one frame yields a single empty chunk.
+    """
+    style = dict(DEFAULT_STYLE, **(style or {}))
+    times = np.asarray(features["time"], dtype=np.float64)
+    end_s = float(times[-1]) if len(times) else 0.0
+    if duration_s is not None:
+        end_s = min(end_s, start_s + duration_s)
+    frames = max(0, int(np.floor((end_s - start_s) * fps)))
+    # Warm-up frames on the same grid, back to the start of the session
+    warmup = max(0, int(np.floor(start_s * fps + 1e-9)))
+
+    rng = np.random.default_rng(seed)
+    noise_seed = int(rng.integers(1 << 31))
+    clocks = {name: rng.random() * scale for name, scale in (
+        ("breathing_time", 500), ("passive_time", 1000), ("shape_time", 2000),
+        ("texture_time", 3000), ("waviness_time", 4000), ("angular_offset", TWO_PI))}
+    internal_start = rng.random() * 6000
+
+    base_radius = min(width, height) * float(style["sizeRatio"])
+    base_hue = float(style["baseHue"])
+    # Frames of the 60 fps the easing constants were tuned for
+    time_delta = 60.0 / fps
+    factors = _frame_lerp([factor for _, _, factor in _EASED], time_delta)
+    state = np.array([value for _, value, _ in _EASED])
+    hue_factor = float(_frame_lerp(0.01, time_delta))
+    current_hue = base_hue
+
+    spans = [(begin, min(0, begin + chunk_frames)) for begin in range(-warmup, 0, chunk_frames)]
+    spans += [(begin, min(frames, begin + chunk_frames)) for begin in range(0, frames, chunk_frames)] or [(0, 0)]
+    for begin, stop in spans:
+        index = np.arange(begin, stop)
+        # Counted from the first replayed frame, so a start on the frame grid
+        # gives the same times as a replay from zero
+        frame_times = (index + warmup) / float(fps) + (start_s - warmup / float(fps))
+        count = len(index)
+        audio = _streams_at(features, frame_times)
+        level, mid = audio["overallLevel"], audio["midLevel"]
+        spread, pitch = audio["frequencySpread"], audio["pitchProxy"]
+        active = level > AUDIO_THRESHOLD
+
+        # Noise clocks advance by a per-frame amount, so they are running sums
+        speed = 1.0 + level * 1.5
+        breathing = level < 0.03
+        chunk = {}
+        for name, step in (("breathing_time", np.where(breathing, 0.0008 * time_delta, 0.0)),
+                           ("passive_time", 0.0004 * speed * time_delta),
+                           ("shape_time", 0.0006 * speed * time_delta),
+                           ("texture_time", 0.0010 * speed * time_delta),
+                           ("waviness_time", 0.0006 * speed * time_delta),
+                           ("angular_offset", 0.0003 * speed * time_delta)):
+            chunk[name] = clocks[name] + np.cumsum(step)
+            if count:
+                clocks[name] = chunk[name][-1]
+        chunk["angular_offset"] = chunk["angular_offset"] % TWO_PI
+        clocks["angular_offset"] %= TWO_PI
+        chunk["internal_time"] = internal_start + (index + warmup + 1) * 0.0003 * time_delta
+
+        # Eased parameters: targets for every frame of the chunk at once,
+        # then one pass of the recurrence over a stacked state vector
+        targets = np.stack([
+            np.where(active, 1.0 + level * 0.2, 1.0),
+            np.where(active, level * 0.15, 0.0),
+            np.where(active, np.maximum(1.0, 3.5 * (1 + (pitch - 0.5) * 0.5)), 3.5),
+            np.where(active, 0.02 + spread * 0.06, 0.02),
+            np.where(active, np.maximum(0.5, 0.9 * (1 + (spread - 0.5) * 0.16)), 0.9),
+            np.where(mid > AUDIO_THRESHOLD * 1.2, 0.04 + mid * 0.02, 0.04),
+            np.where(active, 1.0 - spread * 0.7, 1.0),
+            np.where(level > AUDIO_THRESHOLD + 0.05, level * 18, 0.0),
+        ], axis=1)
+        eased = np.empty_like(targets)
+
+        spread_shift = (spread - 0.5) * 10
+        pitch_shift = (pitch - 0.5) * 15
+        target_hue = np.where(active, (base_hue + spread_shift + pitch_shift + 360) % 360, base_hue)
+        hue = np.empty(count)
+
+        for row in range(count):
+            state = state + (targets[row] - state) * factors
+            eased[row] = state
+            difference = target_hue[row] - current_hue
+            if abs(difference) > 180:
+                current_hue += 360 if difference > 0 else -360
+            current_hue = (_lerp(current_hue, target_hue[row], hue_factor) + 360) % 360
+            hue[row] = current_hue
+
+        if begin < 0:
+            continue
+
+        saturation = np.clip(60 + np.where(active, level * 10, 0.0), 60, 95)
+        brightness = np.clip(95 + np.where(active, level * 2, 0.0), 92, 100)
+        chunk.update({name: eased[:, column] for column, (name, _, _) in enumerate(_EASED)})
+        chunk.update(audio)
+        chunk.update({
+            "width": int(width),
+            "height": int(height),
+            "fps": float(fps),
+            "base_radius": base_radius,
+            "show_mic_icon": bool(style["showMicIcon"]),
+            "noise_seed": noise_seed,
+            "first_frame": begin,
+            "millis": frame_times * 1000.0,
+            "level": level,
+            "center_hsba": np.stack([hue, saturation * 0.9, brightness * 0.98, np.full(count, 100.0)], axis=1),
+            "edge_hsba": np.stack([hue, saturation, brightness, np.full(count, 95.0)], axis=1),
+        })
+        yield chunk
+
+
+def chunk_geometry(sketch):
+    """Compute the per-vertex geometry of a chunk from :func:`replay_sketch`.
+
+    Returns
+    -------
+    dict
+        Scalars describing the canvas and per-frame arrays (``radii`` of
+        shape ``(frames, 140)``, colors, texture rings and layer inputs).
+        Texture rings are only computed for frames where the texture is
+        drawn; the other rows are zero.
+    """
+    noise = PerlinNoise(sketch["noise_seed"])
+    base_radius = sketch["base_radius"]
+    level, treble = sketch["level"], sketch["trebleLevel"]
+    spread, millis = sketch["frequencySpread"], sketch["millis"]
+    breathing = level < 0.03
+    frames = len(level)
+
+    # --- calculateBlobShape(), all frames x all vertices ---
+    angle = np.arange(NUM_VERTICES) * (TWO_PI / NUM_VERTICES)
+    col = lambda values: np.asarray(values)[:, None]
+    radius = base_radius * (1 + np.where(breathing, np.sin(sketch["breathing_time"] * TWO_PI) * 0.025, 0.0))
+
+    passive_deformation = sketch["passive_deformation"]
+    passive = noise(_map(np.cos(angle), -1, 1, 0, 0.7)[None, :],
+                    _map(np.sin(angle), -1, 1, 0, 0.7)[None, :],
+                    col(sketch["passive_time"]))
+    modulated = np.where(level > 0.3,
+                         _lerp(passive_deformation, passive_deformation * (1 + level * 1.2),
+                               _map(level, 0.3, 0.9, 0, 1, True)),
+                         passive_deformation)
+    core = col(radius) + (passive * 2 - 1) * col(modulated) * col(radius)
+
+    ripple_count = np.floor(2 + treble * 6)
+    ripple_amplitude = radius * 0.004 * treble * (1 + treble * 0.6)
+    ripple_phase = millis * 0.0005 * (0.4 + level * 1.2) * 1.2
+    ripple = np.sin(angle[None, :] * col(ripple_count) + col(ripple_phase)) * col(ripple_amplitude)
+    core = core + np.where(col(treble > 0.25), ripple, 0.0)
+
+    angle_shift = np.where(
+        level > 0.3,
+        np.sin(millis * 0.0005 * (0.4 + level * 1.2) * 0.6) * TWO_PI * 0.02 * _map(level, 0.3, 0.9, 0, 1, True),
+        0.0)
+    active_angle = (angle[None, :] + col(sketch["angular_offset"] + angle_shift)) % TWO_PI
+    cos_active, sin_active = np.cos(active_angle), np.sin(active_angle)
+    unit_x, unit_y = (cos_active + 1) / 2, (sin_active + 1) / 2
+
+    shape_scale = sketch["shape_scale"]
+    shape_noise = noise(unit_x * col(shape_scale), unit_y * col(shape_scale), col(sketch["shape_time"]))
+    texture_noise = noise(unit_x * 8.0, unit_y * 8.0, col(sketch["texture_time"]))
+    texture_offset = (texture_noise * 2 - 1) * col(sketch["texture_intensity"])
+
+    waviness_time = sketch["waviness_time"]
+    waviness_influence = sketch["waviness_influence"]
+    enhanced_scale = sketch["waviness_scale"] * (1 + spread * 0.4)
+    frequency_time = _map(spread, 0, 1, 0, 0.5, True) * waviness_time
+    waviness_noise = noise(unit_x * col(enhanced_scale), unit_y * col(enhanced_scale),
+                           col(waviness_time + frequency_time))
+    amplified = np.where(level > 0.2,
+                         _lerp(waviness_influence, waviness_influence * (1 + level * 1.5),
+                               _map(level, 0.2, 0.8, 0, 1, True)),
+                         waviness_influence)
+    waviness_offset = (waviness_noise * 2 - 1) * col(amplified)
+    wave_phase = col(millis * 0.0005 * (0.4 + level * 1.2) * 0.6) + angle[None, :] * 1.5
+    volume_wave = np.sin(wave_phase) * 0.005 * 0.6 * col(radius * _map(level, 0.3, 0.8, 0, 1, True))
+    waviness_offset = waviness_offset + np.where(col(level > 0.3), volume_wave, 0.0)
+
+    combined = shape_noise + texture_offset + waviness_offset
+    peak = base_radius * np.maximum(0, combined) * col(np.maximum(0, sketch["peak_multiplier"] - 1.0))
+    peak = np.where(col(level > 0.01), peak, 0.0)
+
+    max_core = base_radius * (1 + 0.04 + 0.02 + 0.025)
+    max_radius = (max_core + base_radius * 1.1 * 1.2) * (1.0 + level * 0.3)
+    radii = np.clip(core + peak, base_radius * 0.2, col(max_radius))
+
+    # --- drawInternalTexture() rings, only where render_frames draws them ---
+    texture_radii = np.zeros((frames, _TEXTURE_STEPS, NUM_VERTICES))
+    drawn = np.flatnonzero(sketch["texture_alpha"] / 100 > 0.01)
+    if len(drawn):
+        steps = np.arange(_TEXTURE_STEPS)
+        ratio = _map(steps, 0, _TEXTURE_STEPS, 0.2, 0.8)
+        cos_a, sin_a = np.cos(angle), np.sin(angle)
+        ring_time = sketch["internal_time"][drawn, None, None]
+        noise1 = noise(cos_a * 0.5 + 10, sin_a * 0.5 + 20, ring_time + steps[None, :, None] * 0.1)
+        noise2 = noise(cos_a * 2.5 + 30, sin_a * 2.5 + 40, ring_time * 0.5 + steps[None, :, None] * 0.05)
+        max_offset = base_radius * 0.15
+        texture_radii[drawn] = np.maximum(base_radius * 0.1,
+                                          base_radius * ratio[None, :, None]
+                                          + _map(noise1 + noise2, 0, 2, -max_offset, max_offset))
+
+    return {
+        "width": sketch["width"],
+        "height": sketch["height"],
+        "fps": sketch["fps"],
+        "base_radius": base_radius,
+        "show_mic_icon": sketch["show_mic_icon"],
+        "level": level,
+        "radii": radii,
+        "texture_radii": texture_radii,
+        "texture_alpha": sketch["texture_alpha"],
+        "edge_sharpness": sketch["edge_sharpness"],
+        "peak_multiplier": sketch["peak_multiplier"],
+        "center_hsba": sketch["center_hsba"],
+        "edge_hsba": sketch["edge_hsba"],
+    }
+
+
+def blob_geometry(features, fps=30, width=480, height=480, style=None, seed=0,
+                  start_s=0.0, duration_s=None):
+    """Replay the sketch over a session and return everything needed to draw it.
+
+    Holds the geometry of every frame in memory at once, which suits stills
+    and short clips; :func:`render_session` works chunk by chunk instead.
+
+    Parameters
+    ----------
+    features: dict of array-like
+        Feature streams and ``time`` in seconds, as recorded live or returned
+        by :func:`screening.features.analyze_file`.
+    fps: float
+        Frame rate to render at.
+    width, height: int
+        Canvas size in pixels.
+    style: dict or None
+        ``baseHue``, ``sizeRatio`` and ``showMicIcon``, as for the component
+        views.
+    seed: int
+        Seeds the noise table and the sketch's random start times.
+    start_s, duration_s: float
+        Time range to render; defaults to the whole session. The easing is
+        replayed from the start of the session either way.
+
+    Returns
+    -------
+    dict
+        See :func:`chunk_geometry`.
+    """
+    chunks = [chunk_geometry(sketch) for sketch in replay_sketch(
+        features, fps=fps, width=width, height=height, style=style, seed=seed,
+        start_s=start_s, duration_s=duration_s)]
+    return {key: np.concatenate([chunk[key] for chunk in chunks]) if isinstance(value, np.ndarray) else value
+            for key, value in chunks[0].items()}
+
+
+def slice_geometry(geometry, start, stop):
+    """Return the geometry of frames ``start:stop``."""
+    return {key: value[start:stop] if isinstance(value, np.ndarray) else value
+            for key, value in geometry.items()}
+
+
+def frame_count(geometry):
+    return len(geometry["level"])
+
+
+# --- Rasterization ---
+
+# Angular resolution of the outline lookup table
+_OUTLINE_TABLE = 1024
+
+_PIXEL_GRIDS = {}
+
+
+def _angular_lookup(theta, size):
+    """Neighbouring table indices and blend weights for a table of ``size`` uniform angles."""
+    position = theta * (size / TWO_PI)
+    whole = np.floor(position)
+    lower = whole.astype(np.intp) % size
+    return lower, (lower + 1) % size, (position - whole).astype(np.float32)
+
+
+def _pixel_grid(width, height):
+    """Per-pixel polar coordinates around the canvas centre and angular lookups.
+
+    Built once per canvas size and process.
+    """
+    key = (width, height)
+    if key not in _PIXEL_GRIDS:
+        ys, xs = np.mgrid[0:height, 0:width]
+        x = (xs + 0.5 - width // 2).astype(np.float32)
+        y = (ys + 0.5 - height // 2).astype(np.float32)
+        theta = np.arctan2(y, x) % TWO_PI
+        _PIXEL_GRIDS[key] = {
+            "x": x,
+            "y": y,
+            "rho": np.hypot(x, y),
+            "outline": _angular_lookup(theta, _OUTLINE_TABLE),
+            "ring": _angular_lookup(theta, NUM_VERTICES),
+        }
+    return _PIXEL_GRIDS[key]
+
+
+def _crop(grid, rows, cols):
+    cropped = {}
+    for key, value in grid.items():
+        if isinstance(value, tuple):
+            cropped[key] = tuple(part[rows, cols] for part in value)
+        else:
+            cropped[key] = value[rows, cols]
+    return cropped
+
+
+def _sample(table, lookup):
+    """Linearly interpolate a uniform angular table at every pixel."""
+    lower, upper, weight = lookup
+    return table[lower] * (1 - weight) + table[upper] * weight
+
+
+def _outline_table(radii):
+    """Resample the closed Catmull-Rom outline of each frame on uniform angles.
+
+    Uses the same control points as ``buildBlobOutline()``.
+
+    Returns
+    -------
+    numpy.ndarray
+        float32 array of shape ``(frames, _OUTLINE_TABLE)`` holding the
+        outline's distance from the centre.
+    """
+    angle = np.arange(NUM_VERTICES) * (TWO_PI / NUM_VERTICES)
+    points = np.stack([radii * np.cos(angle), radii * np.sin(angle)], axis=-1)
+    v0 = np.roll(points, 1, axis=1)
+    v1 = points
+    v2 = np.roll(points, -1, axis=1)
+    v3 = np.roll(points, -2, axis=1)
+    c1 = v1 + (v2 - v0) / 6
+    c2 = v2 - (v3 - v1) / 6
+
+    t = (np.arange(_CURVE_SAMPLES) / _CURVE_SAMPLES)[None, None, :, None]
+    u = 1 - t
+    curve = (u ** 3 * v1[:, :, None] + 3 * u * u * t * c1[:, :, None]
+             + 3 * u * t * t * c2[:, :, None] + t ** 3 * v2[:, :, None])
+    curve = curve.reshape(len(radii), -1, 2)
+
+    theta = np.arctan2(curve[..., 1], curve[..., 0]) % TWO_PI
+    rho = np.hypot(curve[..., 0], curve[..., 1])
+    order = np.argsort(theta, axis=1)
+    theta = np.take_along_axis(theta, order, axis=1)
+    rho = np.take_along_axis(rho, order, axis=1)
+    uniform = np.arange(_OUTLINE_TABLE) * (TWO_PI / _OUTLINE_TABLE)
+    return np.stack([np.interp(uniform, theta[index], rho[index], period=TWO_PI)
+                     for index in range(len(radii))]).astype(np.float32)
+
+
+def _blend(canvas, rgb, alpha):
+    """Source-over composite of a flat color with per-pixel alpha, in place."""
+    alpha = alpha[..., None]
+    canvas *= 1 - alpha
+    canvas += alpha * np.asarray(rgb, dtype=np.float32)
+
+
+def _stroke_coverage(rho, edge, weight):
+    return np.clip(weight / 2 - np.abs(rho - edge) + 0.5, 0.0, 1.0)
+
+
+def _box_sdf(x, y, half_w, half_h, corner=0.0):
+    qx = np.abs(x) - half_w + corner
+    qy = np.abs(y) - half_h + corner
+    outside = np.hypot(np.maximum(qx, 0), np.maximum(qy, 0))
+    return outside + np.minimum(np.maximum(qx, qy), 0) - corner
+
+
+def _ellipse_sdf(x, y, radius_x, radius_y):
+    # First-order distance estimate; exact for circles
+    k = np.hypot(x / radius_x, y / radius_y)
+    return (k - 1) * min(radius_x, radius_y)
+
+
+def _draw_mic_icon(region, grid, geometry, index):
+    """Draw the scaling ring and the microphone glyph of ``drawMicrophoneIcon()``."""
+    base_radius = geometry["base_radius"]
+    level = max(0.0, float(geometry["level"][index]))
+    white = np.ones(3, dtype=np.float32)
+
+    min_ring = max(0.1, base_radius * 0.75)
+    max_ring = max(min_ring + 0.1, base_radius * 0.92)
+    ring = _lerp(min_ring, max_ring, min(1.0, level))
+    _blend(region, white, _stroke_coverage(grid["rho"], ring, 2.0))
+
+    scale = max(0.1, 1 + level * max(0.0, float(geometry["peak_multiplier"][index])) * 0.6)
+    size = max(0.1, base_radius * 0.28) * scale
+
+    # Only the icon's bounding box is shaded
+    x, y = grid["x"], grid["y"]
+    cols = (x[0] >= -size * 0.35 - 2) & (x[0] <= size * 0.35 + 2)
+    rows = (y[:, 0] >= -size * 0.7 - 2) & (y[:, 0] <= size * 1.09 + 2)
+    rows, cols = np.flatnonzero(rows), np.flatnonzero(cols)
+    if not len(rows) or not len(cols):
+        return
+    box = (slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1))
+    icon, px, py = region[box], x[box], y[box]
+
+    shape = np.minimum.reduce([
+        _box_sdf(px, py + size * 0.3, size * 0.275, size * 0.4, max(0.001, size * 0.2)),
+        _box_sdf(px, py - size * 0.5, max(0.001, size * 0.06), max(0.001, size * 0.5)),
+        _ellipse_sdf(px, py - size * 1.0, max(0.001, size * 0.35), max(0.001, size * 0.09)),
+    ])
+    _blend(icon, white, np.clip(0.5 - shape, 0.0, 1.0))
+
+    if size > 0.1:
+        grille_radius = max(0.0005, size * 0.06)
+        grille = np.minimum.reduce([
+            np.hypot(px - dx * size, py - dy * size) - grille_radius
+            for dx in (-0.15, 0.0, 0.15) for dy in (-0.4, -0.2)
+        ])
+        _blend(icon, np.zeros(3, dtype=np.float32), np.clip(0.5 - grille, 0.0, 1.0) * 0.3)
+
+
+def _layer_plan(level, edge_sharpness, center, edge):
+    """Scale, color and alpha of every fill layer of ``drawBlob()`` for one frame."""
+    reactivity = float(_map(level, 0.1, 0.8, 0, 1, True))
+    sharpness = _lerp(edge_sharpness, 1.0, reactivity * 0.8)
+    pulse = float(_map(level, 0, 0.8, 0, 10 * 1.5, True))
+    layers = max(4, int(np.floor(_lerp(8, 8 + pulse, sharpness))))
+    alpha_step = _lerp(2, 2 + 6 * (1 + reactivity), sharpness)
+    radius_step = _lerp(0.04, 0.01 * (1 + reactivity), sharpness)
+
+    layer = np.arange(layers)
+    mix = layer / float(layers - 1)
+    mix = np.where(layer < 2, _lerp(mix, 1.0, reactivity * 0.7), mix)
+    hsb = center[None, :3] + (edge[None, :3] - center[None, :3]) * mix[:, None]
+    scales = 1.0 - layer * radius_step
+    alphas = np.maximum(0.0, edge[3] - layer * alpha_step) / 100
+    return scales, hsb_to_rgb(hsb[:, 0], hsb[:, 1], hsb[:, 2]), alphas
+
+
+def _composite_layers(region, rho, outline, scales, colors, alphas):
+    """Composite nested, concentric fill layers in a few whole-region passes.
+
+    Layers shrink from the outermost inwards, so the layers fully covering a
+    pixel are always a prefix of the stack. Painting a flat layer is an
+    affine map of the pixel color, and the prefix compositions are tabulated
+    once per frame. Each pixel then takes its full-coverage prefix in one
+    step, and the (at most two) partially covering layers at the edge are
+    blended on top.
+    """
+    count = len(scales)
+    factor = np.ones(count + 1)
+    offset = np.zeros((count + 1, 3))
+    for layer in range(count):
+        factor[layer + 1] = factor[layer] * (1 - alphas[layer])
+        offset[layer + 1] = offset[layer] * (1 - alphas[layer]) + alphas[layer] * colors[layer]
+
+    # Number of layers with s * outline - rho >= 0.5 (full coverage)
+    full = np.searchsorted(-scales, -(rho + 0.5) / outline, side="right")
+    region *= factor.astype(np.float32)[full][..., None]
+    region += offset.astype(np.float32)[full]
+
+    for extra in (0, 1):
+        layer = full + extra
+        valid = layer < count
+        layer = np.minimum(layer, count - 1)
+        coverage = np.clip(scales[layer] * outline - rho + 0.5, 0.0, 1.0) * valid
+        _blend(region, colors[layer], (alphas[layer] * coverage).astype(np.float32))
+
+
+def render_frames(geometry):
+    """Rasterize every frame of ``geometry``.
+
+    Returns
+    -------
+    numpy.ndarray
+        uint8 array of shape ``(frames, height, width, 3)``.
+    """
+    width, height = geometry["width"], geometry["height"]
+    frames = frame_count(geometry)
+    grid = _pixel_grid(width, height)
+    background = np.clip(np.rint(hsb_to_rgb(*BACKGROUND_HSB) * 255), 0, 255).astype(np.uint8)
+    outlines = _outline_table(geometry["radii"])
+    cx, cy = width // 2, height // 2
+    output = np.empty((frames, height, width, 3), dtype=np.uint8)
+    output[:] = background
+
+    for index in range(frames):
+        level = float(geometry["level"][index])
+        center, edge = geometry["center_hsba"][index], geometry["edge_hsba"][index]
+        hue = edge[0]
+        glow_alpha = 5 + float(_map(level, 0.1, 0.7, 0, 15, True))
+        glow_weight = 1.2 + float(_map(level, 0.1, 0.7, 0, 1.0, True))
+        glow_size = 1.01 + level * 0.03
+
+        # Everything is drawn inside the glow's bounding square
+        reach = int(np.ceil(outlines[index].max() * glow_size + glow_weight)) + 2
+        rows = slice(max(0, cy - reach), min(height, cy + reach))
+        cols = slice(max(0, cx - reach), min(width, cx + reach))
+        local = _crop(grid, rows, cols)
+        rho = local["rho"]
+        region = np.empty(rho.shape + (3,), dtype=np.float32)
+        region[:] = background / np.float32(255)
+
+        # drawInternalTexture(): 0.75 px rings, merged into one blend
+        texture_alpha = float(geometry["texture_alpha"][index]) / 100
+        if texture_alpha > 0.01:
+            transparency = np.ones(rho.shape, dtype=np.float32)
+            for ring in geometry["texture_radii"][index]:
+                ring_rho = _sample(ring.astype(np.float32), local["ring"])
+                transparency *= 1 - _stroke_coverage(rho, ring_rho, 0.75) * texture_alpha
+            _blend(region, hsb_to_rgb(hue, 30, 104.5), 1 - transparency)
+
+        outline = _sample(outlines[index], local["outline"])
+
+        # Glow stroke around the slightly enlarged outline
+        _blend(region, hsb_to_rgb(hue, 50, 98),
+               _stroke_coverage(rho, outline * glow_size, glow_weight) * (glow_alpha / 100))
+
+        scales, colors, alphas = _layer_plan(
+            level, float(geometry["edge_sharpness"][index]), center, edge)
+        _composite_layers(region, rho, outline, scales, colors, alphas)
+
+        if geometry["show_mic_icon"]:
+            _draw_mic_icon(region, local, geometry, index)
+
+        output[index, rows, cols] = np.clip(np.rint(region * 255), 0, 255).astype(np.uint8)
+    return output
+
+
+# --- Output ---
+
+def write_png(path, image):
+    """Write an RGB uint8 image as a PNG using only the standard library."""
+    height, width = image.shape[:2]
+    rows = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 0] = 0
+    rows[:, 1:] = image.reshape(height, width * 3)
+
+    def chunk(kind, data):
+        return (struct.pack(">I", len(data)) + kind + data
+                + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    with open(path, "wb") as handle:
+        handle.write(b"\x89PNG\r\n\x1a\n")
+        handle.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        handle.write(chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)))
+        handle.write(chunk(b"IEND", b""))
+
+
+def render_still(features, at_s, width=480, height=480, style=None, seed=0, fps=30):
+    """Render the blob as it looked ``at_s`` seconds into a session.
+
+    The sketch state is replayed from the start, so easing is the same as in
+    the browser. Only the last frame's geometry is computed.
+
+    Raises
+    ------
+    ValueError
+        If ``at_s`` is more than one frame past the end of the session.
+    """
+    times = np.asarray(features["time"], dtype=np.float64)
+    if not len(times) or at_s > times[-1] + 1.0 / fps:
+        raise ValueError("Session is shorter than %.2f s" % at_s)
+    last = None
+    for sketch in replay_sketch(features, fps=fps, width=width, height=height, style=style,
+                                seed=seed, duration_s=at_s + 1.0 / fps):
+        if frame_count(sketch):
+            last = sketch
+    if last is None:
+        raise ValueError("Session is shorter than %.2f s" % at_s)
+    return render_frames(chunk_geometry(slice_geometry(last, -1, None)))[0]
+
+
+def _render_chunk(task):
+    sketch, directory = task
+    frames = render_frames(chunk_geometry(sketch))
+    if directory is None:
+        return frames
+    for offset, image in enumerate(frames):
+        write_png(os.path.join(directory, "frame_%06d.png" % (sketch["first_frame"] + offset)), image)
+    return len(frames)
+
+
+def render_session(features, output, fps=30, width=480, height=480, style=None, seed=0,
+                   workers=None, chunk_frames=32, start_s=0.0, duration_s=None):
+    """Render a recorded session to PNG frames or a video.
+
+    The parent process only replays the sketch's per-frame state; vertex
+    geometry and rasterization run in the workers, a few chunks at a time,
+    so memory use does not grow with the session's length.
+
+    Parameters
+    ----------
+    features: dict of array-like
+        Feature streams with ``time``.
+    output: str
+        A directory for ``frame_NNNNNN.png`` files, or a file name with a
+        video extension (``.mp4``, ``.webm``, ``.mov``, ``.mkv``), which
+        needs ``ffmpeg`` on the PATH.
+    fps, width, height, style, seed, start_s, duration_s
+        See :func:`blob_geometry`.
+    workers: int or None
+        Rasterization processes; defaults to the CPU count.
+    chunk_frames: int
+        Frames handed to a worker at a time.
+
+    Returns
+    -------
+    int
+        Number of frames rendered.
+    """
+    video = os.path.splitext(output)[1].lower() in (".mp4", ".webm", ".mov", ".mkv")
+    if video:
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("Rendering video requires ffmpeg on the PATH; "
+                               "render to a directory of PNG frames instead.")
+        # yuv420p needs even dimensions
+        width, height = width - width % 2, height - height % 2
+    else:
+        os.makedirs(output, exist_ok=True)
+
+    sketches = replay_sketch(features, fps=fps, width=width, height=height, style=style,
+                             seed=seed, start_s=start_s, duration_s=duration_s,
+                             chunk_frames=chunk_frames)
+    workers = workers or os.cpu_count() or 1
+    frames = 0
+
+    encoder = None
+    if video:
+        encoder = subprocess.Popen(
+            [ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24",
+             "-s", "%dx%d" % (width, height), "-r", str(fps), "-i", "-",
+             "-pix_fmt", "yuv420p", output],
+            stdin=subprocess.PIPE)
+
+    def collect(future):
+        result = future.result()
+        if encoder is not None:
+            encoder.stdin.write(result.tobytes())
+
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            # Chunks are submitted as the replay produces them, with a bounded
+            # number in flight, and collected in order so video frames stay in
+            # sequence
+            pending = collections.deque()
+            for sketch in sketches:
+                if not frame_count(sketch):
+                    continue
+                frames += frame_count(sketch)
+                pending.append(pool.submit(_render_chunk, (sketch, None if video else output)))
+                if len(pending) >= 2 * workers:
+                    collect(pending.popleft())
+            while pending:
+                collect(pending.popleft())
+    finally:
+        if encoder is not None:
+            encoder.stdin.close()
+            if encoder.wait() != 0:
+                raise RuntimeError("ffmpeg failed to encode %s" % output)
+    return frames
@@ -0,0 +1,466 @@
+"""Session state that outlives one Streamlit process.
+
+A live session's feature frames and metadata go through a
+:class:`SessionStore`, so any app process that shares the store can serve
+the session and a restarted process picks it up where it stopped.
+
+Backends, chosen with :func:`open_store`:
+
+``memory://``
+    In-process only. This is the default and behaves like keeping the state
+    in ``st.session_state``.
+``sqlite:///sessions.sqlite``
+    A SQLite database in WAL mode, for several processes on one node or on
+    nodes sharing a volume that supports SQLite locking. Use four slashes
+    for an absolute path.
+``redis://host:port/db``
+    Any server speaking the Redis protocol, for processes on several nodes.
+    Requires the ``redis`` package.
+
+Frames are kept in a ring buffer of ``capacity`` frames per session.
+
+Batching is opt-in. By default every append is written through, together
+with the metadata passed along with it. A session can move to another
+process on any rerun, and that process must see every frame and metadata
+that matches them; frames still waiting in another process's batch would
+be missing or, once flushed late, arrive behind newer ones. With
+``flush_frames`` above 1, writes are batched: they are written once
+``flush_frames`` frames are pending, by a background thread every
+``flush_interval_s``, on :meth:`SessionStore.close` and at interpreter
+exit. Use this only when sessions stay with one process, e.g. behind a
+load balancer with sticky sessions. Reads flush first, so a process always
+sees its own writes.
+"""
+
+import abc
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+import weakref
+
+import numpy as np
+
+# One hour of frames at the blob's 20 Hz
+DEFAULT_CAPACITY = 20 * 3600
+# Write-through; batching is opt-in, see the module docstring
+DEFAULT_FLUSH_FRAMES = 1
+DEFAULT_FLUSH_INTERVAL_S = 0.5
+# Idle sessions are removed from Redis after this long
+DEFAULT_REDIS_TTL_S = 24 * 3600
+
+logger = logging.getLogger(__name__)
+
+
+def _exit_flusher(store):
+    # atexit.unregister() drops every registration of a callable, so each
+    # store gets its own; the weak reference lets unclosed stores be freed
+    store_ref = weakref.ref(store)
+
+    def flush():
+        store = store_ref()
+        if store is not None:
+            store.flush()
+    return flush
+
+
+class SessionStore(abc.ABC):
+    """Base class: buffers writes and hands them to the backend in batches.
+
+    Subclasses implement :meth:`_write_batch`, :meth:`_read_frames`,
+    :meth:`_frame_count`, :meth:`_get_meta`, :meth:`delete` and
+    :meth:`sessions`.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, flush_frames=DEFAULT_FLUSH_FRAMES,
+                 flush_interval_s=DEFAULT_FLUSH_INTERVAL_S):
+        self.capacity = int(capacity)
+        self.flush_frames = int(flush_frames)
+        self.flush_interval_s = float(flush_interval_s)
+        self._buffer_lock = threading.Lock()
+        # Held from taking a batch until it is written, so batches reach the
+        # backend in order
+        self._flush_lock = threading.Lock()
+        self._pending_frames = {}
+        self._pending_meta = {}
+        self._pending_count = 0
+        self._last_flush = time.monotonic()
+        self._closed = threading.Event()
+        self._flusher = None
+        self._exit_hook = None
+        if self.flush_frames > 1:
+            self._exit_hook = atexit.register(_exit_flusher(self))
+            if self.flush_interval_s > 0:
+                self._flusher = threading.Thread(target=self._flush_periodically,
+                                                 name="session-store-flush", daemon=True)
+                self._flusher.start()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval_s):
+            try:
+                self.flush()
+            except Exception:
+                # Pending writes stay lost for this batch; later ones still go
+                logger.exception("Session store flush failed")
+
+    def append(self, session_id, times, values, meta=None):
+        """Append frames to a session's ring buffer.
+
+        Parameters
+        ----------
+        times: sequence of float
+            Receipt time of each frame.
+        values: array-like
+            ``(frames, columns)`` frame values; the column count must stay
+            the same for a session.
+        meta: dict or None
+            Metadata fields written in the same batch as the frames.
+        """
+        times = np.asarray(times, dtype=np.float64).reshape(-1)
+        values = np.asarray(values, dtype=np.float32).reshape(len(times), -1)
+        with self._buffer_lock:
+            self._pending_frames.setdefault(session_id, []).append((times, values))
+            self._pending_count += len(times)
+            if meta:
+                self._pending_meta.setdefault(session_id, {}).update(meta)
+        self._maybe_flush()
+
+    def update_meta(self, session_id, fields):
+        """Merge ``fields`` (JSON-serializable values) into a session's metadata."""
+        with self._buffer_lock:
+            self._pending_meta.setdefault(session_id, {}).update(fields)
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if (self.flush_frames <= 1 or self._pending_count >= self.flush_frames
+                or time.monotonic() - self._last_flush >= self.flush_interval_s):
+            self.flush()
+
+    def flush(self):
+        """Write all buffered frames and metadata in one batch."""
+        with self._flush_lock:
+            with self._buffer_lock:
+                frames, meta = self._pending_frames, self._pending_meta
+                self._pending_frames, self._pending_meta = {}, {}
+                self._pending_count = 0
+                self._last_flush = time.monotonic()
+            if not frames and not meta:
+                return
+            frames = {session_id: (np.concatenate([times for times, _ in batches]),
+                                   np.concatenate([values for _, values in batches]))
+                      for session_id, batches in frames.items()}
+            self._write_batch(frames, meta)
+
+    def read_frames(self, session_id):
+        """Return ``(times, values)`` of the frames still in the ring buffer."""
+        self.flush()
+        times, values = self._read_frames(session_id)
+        return times[-self.capacity:], values[-self.capacity:]
+
+    def frame_count(self, session_id):
+        self.flush()
+        return min(self._frame_count(session_id), self.capacity)
+
+    def get_meta(self, session_id):
+        """Return a session's metadata dict, or None for an unknown session."""
+        self.flush()
+        return self._get_meta(session_id)
+
+    def close(self):
+        """Stop the background flush and write what is still buffered."""
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        if self._exit_hook is not None:
+            atexit.unregister(self._exit_hook)
+            self._exit_hook = None
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @abc.abstractmethod
+    def _write_batch(self, frames, meta):
+        pass
+
+    @abc.abstractmethod
+    def _read_frames(self, session_id):
+        pass
+
+    @abc.abstractmethod
+    def _frame_count(self, session_id):
+        pass
+
+    @abc.abstractmethod
+    def _get_meta(self, session_id):
+        pass
+
+    @abc.abstractmethod
+    def delete(self, session_id):
+        """Remove a session's frames and metadata."""
+
+    @abc.abstractmethod
+    def sessions(self):
+        """Return the ids of all stored sessions."""
+
+
+class MemoryStore(SessionStore):
+    """Session state in this process only."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        super().__init__(capacity, flush_frames=1, flush_interval_s=0.0)
+        self._lock = threading.Lock()
+        # session id -> list of (times, values) chunks, joined lazily
+        self._chunks = {}
+        self._counts = {}
+        self._meta = {}
+
+    def _compact(self, session_id):
+        chunks = self._chunks[session_id]
+        if len(chunks) > 1:
+            chunks[:] = [(np.concatenate([times for times, _ in chunks])[-self.capacity:],
+                          np.concatenate([values for _, values in chunks])[-self.capacity:])]
+            self._counts[session_id] = len(chunks[0][0])
+        return chunks[0]
+
+    def _write_batch(self, frames, meta):
+        with self._lock:
+            for session_id, (times, values) in frames.items():
+                self._chunks.setdefault(session_id, []).append((times, values))
+                self._counts[session_id] = self._counts.get(session_id, 0) + len(times)
+                self._meta.setdefault(session_id, {})
+                if self._counts[session_id] > 2 * self.capacity:
+                    self._compact(session_id)
+            for session_id, fields in meta.items():
+                self._meta.setdefault(session_id, {}).update(fields)
+
+    def _read_frames(self, session_id):
+        with self._lock:
+            if session_id not in self._chunks:
+                return np.zeros(0), np.zeros((0, 0), dtype=np.float32)
+            times, values = self._compact(session_id)
+            return times.copy(), values.copy()
+
+    def _frame_count(self, session_id):
+        with self._lock:
+            return self._counts.get(session_id, 0)
+
+    def _get_meta(self, session_id):
+        with self._lock:
+            meta = self._meta.get(session_id)
+            return None if meta is None else dict(meta)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._chunks.pop(session_id, None)
+            self._counts.pop(session_id, None)
+            self._meta.pop(session_id, None)
+
+    def sessions(self):
+        with self._lock:
+            return sorted(self._meta)
+
+
+class SQLiteStore(SessionStore):
+    """Session state in a SQLite database shared by several processes.
+
+    Each flush is one transaction. Frames are stored as one row per flushed
+    chunk, numbered by the sequence of their first frame, and chunks that
+    fall entirely out of the ring buffer are deleted in the same
+    transaction.
+    """
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY, flush_frames=DEFAULT_FLUSH_FRAMES,
+                 flush_interval_s=DEFAULT_FLUSH_INTERVAL_S):
+        super().__init__(capacity, flush_frames, flush_interval_s)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS session_meta (
+                session_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                next_seq INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS session_frames (
+                session_id TEXT NOT NULL,
+                first_seq INTEGER NOT NULL,
+                frame_count INTEGER NOT NULL,
+                times BLOB NOT NULL,
+                frames BLOB NOT NULL,
+                PRIMARY KEY (session_id, first_seq)
+            );
+        """)
+
+    def close(self):
+        super().close()
+        with self._lock:
+            self._db.close()
+
+    def _write_batch(self, frames, meta):
+        now = time.time()
+        with self._lock:
+            # Take the write lock up front so sequence numbers read here are
+            # not handed out by another process as well
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                for session_id in set(frames) | set(meta):
+                    row = self._db.execute(
+                        "SELECT data, next_seq FROM session_meta WHERE session_id = ?",
+                        (session_id,)).fetchone()
+                    data, next_seq = (json.loads(row[0]), row[1]) if row else ({}, 0)
+                    data.update(meta.get(session_id, {}))
+                    if session_id in frames:
+                        times, values = frames[session_id]
+                        self._db.execute(
+                            "INSERT INTO session_frames VALUES (?, ?, ?, ?, ?)",
+                            (session_id, next_seq, len(times), times.astype("<f8").tobytes(),
+                             values.astype("<f4").tobytes()))
+                        next_seq += len(times)
+                        self._db.execute(
+                            "DELETE FROM session_frames WHERE session_id = ? AND first_seq + frame_count <= ?",
+                            (session_id, next_seq - self.capacity))
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO session_meta VALUES (?, ?, ?, ?)",
+                        (session_id, json.dumps(data), next_seq, now))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _read_frames(self, session_id):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT frame_count, times, frames FROM session_frames WHERE session_id = ? ORDER BY first_seq",
+                (session_id,)).fetchall()
+        if not rows:
+            return np.zeros(0), np.zeros((0, 0), dtype=np.float32)
+        times = np.concatenate([np.frombuffer(row[1], dtype="<f8") for row in rows])
+        values = np.concatenate([np.frombuffer(row[2], dtype="<f4").reshape(row[0], -1) for row in rows])
+        return times, values
+
+    def _frame_count(self, session_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT COALESCE(SUM(frame_count), 0) FROM session_frames WHERE session_id = ?",
+                (session_id,)).fetchone()
+        return row[0]
+
+    def _get_meta(self, session_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM session_meta WHERE session_id = ?", (session_id,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def delete(self, session_id):
+        self.flush()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.execute("DELETE FROM session_frames WHERE session_id = ?", (session_id,))
+            self._db.execute("DELETE FROM session_meta WHERE session_id = ?", (session_id,))
+            self._db.execute("COMMIT")
+
+    def sessions(self):
+        self.flush()
+        with self._lock:
+            return [row[0] for row in self._db.execute(
+                "SELECT session_id FROM session_meta ORDER BY session_id")]
+
+
+class RedisStore(SessionStore):
+    """Session state in a Redis-compatible server.
+
+    Each session is a list of packed frames trimmed to ``capacity`` and a
+    hash of JSON-encoded metadata fields. A flush is one pipelined round
+    trip. Keys expire ``ttl_s`` after the session's last write.
+    """
+
+    def __init__(self, url, capacity=DEFAULT_CAPACITY, flush_frames=DEFAULT_FLUSH_FRAMES,
+                 flush_interval_s=DEFAULT_FLUSH_INTERVAL_S, ttl_s=DEFAULT_REDIS_TTL_S, prefix="alzai"):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("The Redis session store requires the redis package: pip install redis")
+        super().__init__(capacity, flush_frames, flush_interval_s)
+        self._client = redis.Redis.from_url(url)
+        self.ttl_s = int(ttl_s)
+        self.prefix = prefix
+
+    def _key(self, session_id, kind):
+        return "%s:session:%s:%s" % (self.prefix, session_id, kind)
+
+    def _write_batch(self, frames, meta):
+        pipe = self._client.pipeline(transaction=True)
+        for session_id in set(frames) | set(meta):
+            meta_key = self._key(session_id, "meta")
+            fields = {name: json.dumps(value) for name, value in meta.get(session_id, {}).items()}
+            # A hash needs at least one field to exist
+            fields["_updated_at"] = json.dumps(time.time())
+            pipe.hset(meta_key, mapping=fields)
+            pipe.expire(meta_key, self.ttl_s)
+            if session_id in frames:
+                frames_key = self._key(session_id, "frames")
+                times, values = frames[session_id]
+                pipe.rpush(frames_key, *[
+                    np.float64(t).astype("<f8").tobytes() + row.astype("<f4").tobytes()
+                    for t, row in zip(times, values)])
+                pipe.ltrim(frames_key, -self.capacity, -1)
+                pipe.expire(frames_key, self.ttl_s)
+        pipe.execute()
+
+    def _read_frames(self, session_id):
+        items = self._client.lrange(self._key(session_id, "frames"), 0, -1)
+        if not items:
+            return np.zeros(0), np.zeros((0, 0), dtype=np.float32)
+        columns = (len(items[0]) - 8) // 4
+        packed = np.frombuffer(b"".join(items), dtype=np.dtype([("time", "<f8"), ("values", "<f4", columns)]))
+        return packed["time"].copy(), packed["values"].reshape(len(items), columns).copy()
+
+    def _frame_count(self, session_id):
+        return self._client.llen(self._key(session_id, "frames"))
+
+    def _get_meta(self, session_id):
+        fields = self._client.hgetall(self._key(session_id, "meta"))
+        if not fields:
+            return None
+        meta = {name.decode(): json.loads(value) for name, value in fields.items()}
+        meta.pop("_updated_at", None)
+        return meta
+
+    def delete(self, session_id):
+        self.flush()
+        self._client.delete(self._key(session_id, "meta"), self._key(session_id, "frames"))
+
+    def sessions(self):
+        self.flush()
+        pattern = self._key("*", "meta")
+        return sorted(key.decode()[len(self.prefix) + len(":session:"):-len(":meta")]
+                      for key in self._client.scan_iter(match=pattern))
+
+
+def open_store(url, **options):
+    """Open the session store described by ``url``; see the module docstring.
+
+    ``options`` are passed to the store, e.g. ``capacity``.
+    """
+    scheme = urllib.parse.urlsplit(url).scheme
+    if scheme == "memory":
+        return MemoryStore(**options)
+    if scheme == "sqlite":
+        # sqlite:///relative/path or sqlite:////absolute/path
+        return SQLiteStore(os.path.expanduser(url[len("sqlite:///"):]), **options)
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisStore(url, **options)
+    raise ValueError("Unsupported session store URL: %s" % url)
@@ -0,0 +1,399 @@
+"""Nearest-neighbour search over session feature trajectories.
+
+Sessions are resampled to a fixed rate and cut into overlapping windows of
+the ``overallLevel``, ``pitchProxy`` and ``frequencySpread`` streams. Each
+window is z-normalized per stream and stored together with its Sakoe-Chiba
+envelope, so a search only has to build the query's envelope.
+
+A query window is compared to every stored window with banded dynamic time
+warping, pruned in three steps:
+
+1. LB_Keogh in both directions (query envelope against each window, and each
+   window's stored envelope against the query), computed for all windows at
+   once. Windows are visited in order of this bound and the scan stops once
+   the bound exceeds the k-th best session distance found so far.
+2. A window is skipped if its bound cannot beat either that k-th distance or
+   the best distance already found for its own session.
+3. DTW itself runs row by row over a batch of windows and abandons each
+   window as soon as its best partial path plus the LB_Keogh tail of the
+   remaining rows exceeds its cutoff.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from screening.cohort_index import STREAM_NAMES
+
+DEFAULT_RATE_HZ = 20.0
+DEFAULT_WINDOW_S = 10.0
+DEFAULT_STEP_S = 2.0
+DEFAULT_BAND_RATIO = 0.1
+
+# Windows whose full DTW runs together; larger batches amortize the per-row
+# NumPy overhead, smaller ones tighten the cutoff sooner
+_DTW_BATCH = 64
+# Windows per chunk when computing lower bounds, bounds peak memory
+_LB_CHUNK = 4096
+
+
+def resample_trajectory(features, rate_hz=DEFAULT_RATE_HZ):
+    """Resample the feature streams onto a uniform time grid.
+
+    Returns
+    -------
+    numpy.ndarray
+        float32 array of shape ``(frames, len(STREAM_NAMES))``.
+    """
+    times = np.asarray(features["time"], dtype=np.float64)
+    if len(times) < 2:
+        return np.zeros((0, len(STREAM_NAMES)), dtype=np.float32)
+    grid = np.arange(times[0], times[-1], 1.0 / rate_hz)
+    return np.stack([np.interp(grid, times, np.asarray(features[stream], dtype=np.float64))
+                     for stream in STREAM_NAMES], axis=1).astype(np.float32)
+
+
+def z_normalize(windows):
+    """Z-normalize each window per stream along its time axis.
+
+    Streams that are constant within a window (a flat line) become zeros.
+    """
+    mean = windows.mean(axis=-2, keepdims=True)
+    std = windows.std(axis=-2, keepdims=True)
+    return np.where(std > 1e-8, (windows - mean) / np.maximum(std, 1e-8), 0.0).astype(np.float32)
+
+
+def envelope(windows, band):
+    """Return the (upper, lower) Sakoe-Chiba envelope of each window."""
+    length = windows.shape[-2]
+    pad = [(0, 0)] * windows.ndim
+    pad[-2] = (band, band)
+    upper = np.pad(windows, pad, mode="constant", constant_values=-np.inf)
+    lower = np.pad(windows, pad, mode="constant", constant_values=np.inf)
+    upper = np.lib.stride_tricks.sliding_window_view(upper, 2 * band + 1, axis=-2)
+    lower = np.lib.stride_tricks.sliding_window_view(lower, 2 * band + 1, axis=-2)
+    return (upper.max(axis=-1)[..., :length, :].astype(np.float32),
+            lower.min(axis=-1)[..., :length, :].astype(np.float32))
+
+
+def _keogh(values, upper, lower):
+    """Per-position LB_Keogh contributions of ``values`` against an envelope."""
+    above = np.maximum(values - upper, 0.0)
+    below = np.maximum(lower - values, 0.0)
+    return (above * above + below * below).sum(axis=-1)
+
+
+def _dtw_batch(query, candidates, band, cutoffs, tails):
+    """Banded DTW of one query against a batch of candidates, with early abandoning.
+
+    Parameters
+    ----------
+    query: numpy.ndarray
+        ``(length, streams)``.
+    candidates: numpy.ndarray
+        ``(batch, length, streams)``.
+    band: int
+        Sakoe-Chiba radius in frames.
+    cutoffs: numpy.ndarray
+        Per-candidate distance above which the result no longer matters.
+    tails: numpy.ndarray
+        ``(batch, length + 1)`` lower bound on the cost of rows ``i`` onwards.
+
+    Returns
+    -------
+    numpy.ndarray
+        Squared DTW distances, ``inf`` for abandoned candidates.
+    """
+    batch, length = candidates.shape[:2]
+    result = np.full(batch, np.inf)
+    active = np.arange(batch)
+    previous = None
+
+    for i in range(length):
+        lo, hi = max(0, i - band), min(length, i + band + 1)
+        diff = candidates[:, lo:hi, :] - query[i]
+        cost = (diff * diff).sum(axis=2)
+
+        # Best cost entering each cell from the row above (up or diagonal)
+        if previous is None:
+            entry = np.full(cost.shape, np.inf)
+            entry[:, 0] = 0.0
+        else:
+            up = previous[:, lo:hi]
+            diagonal = np.full(up.shape, np.inf)
+            if lo > 0:
+                diagonal[:] = previous[:, lo - 1:hi - 1]
+            else:
+                diagonal[:, 1:] = previous[:, :hi - 1]
+            entry = np.minimum(up, diagonal)
+
+        # Moving left to right along the row is a min-plus prefix scan:
+        # row[j] = S[j] + min over k <= j of (entry[k] + cost[k] - S[k])
+        prefix = np.cumsum(cost, axis=1)
+        band_row = prefix + np.minimum.accumulate(entry + cost - prefix, axis=1)
+
+        row = np.full((len(active), length), np.inf)
+        row[:, lo:hi] = band_row
+
+        bound = band_row.min(axis=1) + tails[:, i + 1]
+        keep = bound < cutoffs
+        if not keep.all():
+            active, candidates, cutoffs, tails, row = (
+                active[keep], candidates[keep], cutoffs[keep], tails[keep], row[keep])
+            if not len(active):
+                return result
+        previous = row
+
+    result[active] = previous[:, length - 1]
+    return result
+
+
+class SimilarityIndex:
+    """Window index over session trajectories, stored in SQLite.
+
+    Parameters
+    ----------
+    path: str
+        Database file; may be the same file as the
+        :class:`~screening.cohort_index.CohortIndex`.
+    rate_hz: float
+        Rate trajectories are resampled to.
+    window_s, step_s: float
+        Length of the compared windows and the stride between stored windows.
+    band_ratio: float
+        Sakoe-Chiba band as a fraction of the window length.
+    """
+
+    def __init__(self, path, rate_hz=DEFAULT_RATE_HZ, window_s=DEFAULT_WINDOW_S,
+                 step_s=DEFAULT_STEP_S, band_ratio=DEFAULT_BAND_RATIO):
+        self.path = os.path.abspath(os.path.expanduser(path))
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.rate_hz = float(rate_hz)
+        self.window = max(2, int(round(window_s * rate_hz)))
+        self.step = max(1, int(round(step_s * rate_hz)))
+        self.band = max(1, int(round(band_ratio * self.window)))
+        self._params = json.dumps([self.rate_hz, self.window, self.step, self.band])
+        self.last_search = {}
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS trajectories (
+                session_id TEXT PRIMARY KEY,
+                rate_hz REAL NOT NULL,
+                frames INTEGER NOT NULL,
+                data BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS similarity_windows (
+                session_id TEXT NOT NULL,
+                params TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                windows BLOB NOT NULL,
+                upper BLOB NOT NULL,
+                lower BLOB NOT NULL,
+                PRIMARY KEY (session_id, params)
+            );
+        """)
+        self._db.commit()
+        self._loaded_version = None
+        self._index = None
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _windows(self, trajectory):
+        """Cut a trajectory into z-normalized windows with their envelopes."""
+        count = (len(trajectory) - self.window) // self.step + 1
+        if count <= 0:
+            empty = np.zeros((0, self.window, len(STREAM_NAMES)), dtype=np.float32)
+            return empty, empty, empty
+        starts = np.arange(count) * self.step
+        windows = np.lib.stride_tricks.sliding_window_view(trajectory, self.window, axis=0)
+        windows = z_normalize(np.swapaxes(windows[starts], 1, 2))
+        upper, lower = envelope(windows, self.band)
+        return windows, upper, lower
+
+    def _store_windows(self, session_id, trajectory):
+        windows, upper, lower = self._windows(trajectory)
+        self._db.execute(
+            "INSERT OR REPLACE INTO similarity_windows "
+            "(session_id, params, count, windows, upper, lower) VALUES (?, ?, ?, ?, ?, ?)",
+            (session_id, self._params, len(windows),
+             windows.tobytes(), upper.tobytes(), lower.tobytes()))
+
+    def add_session(self, session_id, features):
+        """Store a session's trajectory and its precomputed windows."""
+        trajectory = resample_trajectory(features, self.rate_hz)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO trajectories (session_id, rate_hz, frames, data) "
+                "VALUES (?, ?, ?, ?)",
+                (session_id, self.rate_hz, len(trajectory), trajectory.tobytes()))
+            self._store_windows(session_id, trajectory)
+            self._index = None
+
+    def remove_session(self, session_id):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM trajectories WHERE session_id = ?", (session_id,))
+            self._db.execute("DELETE FROM similarity_windows WHERE session_id = ?", (session_id,))
+            self._index = None
+
+    def _load(self):
+        """Load the window index into memory, building windows for new parameters.
+
+        Reloads when another connection has committed since the last load.
+        """
+        version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        if self._index is not None and version == self._loaded_version:
+            return self._index
+
+        # Sessions stored under different window parameters get windows
+        # built from their trajectory once
+        missing = self._db.execute(
+            "SELECT t.session_id, t.data FROM trajectories t LEFT JOIN similarity_windows w "
+            "ON w.session_id = t.session_id AND w.params = ? WHERE w.session_id IS NULL",
+            (self._params,)).fetchall()
+        if missing:
+            with self._db:
+                for session_id, blob in missing:
+                    trajectory = np.frombuffer(blob, dtype=np.float32).reshape(-1, len(STREAM_NAMES))
+                    self._store_windows(session_id, trajectory)
+
+        shape = (-1, self.window, len(STREAM_NAMES))
+        session_ids, owners, offsets, windows, uppers, lowers = [], [], [], [], [], []
+        rows = self._db.execute(
+            "SELECT session_id, count, windows, upper, lower FROM similarity_windows "
+            "WHERE params = ? AND count > 0", (self._params,))
+        for number, (session_id, count, window_blob, upper_blob, lower_blob) in enumerate(rows):
+            session_ids.append(session_id)
+            owners.append(np.full(count, number, dtype=np.int32))
+            offsets.append(np.arange(count, dtype=np.float32) * (self.step / self.rate_hz))
+            windows.append(np.frombuffer(window_blob, dtype=np.float32).reshape(shape))
+            uppers.append(np.frombuffer(upper_blob, dtype=np.float32).reshape(shape))
+            lowers.append(np.frombuffer(lower_blob, dtype=np.float32).reshape(shape))
+
+        if session_ids:
+            self._index = {
+                "session_ids": session_ids,
+                "owners": np.concatenate(owners),
+                "offsets": np.concatenate(offsets),
+                "windows": np.concatenate(windows),
+                "upper": np.concatenate(uppers),
+                "lower": np.concatenate(lowers),
+            }
+        else:
+            self._index = {"session_ids": []}
+        self._loaded_version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        return self._index
+
+    def search(self, features, k=5, exclude=()):
+        """Return the ``k`` sessions whose dynamics best match the query.
+
+        The most recent window of ``features`` is compared to every stored
+        window; a session's distance is that of its best-matching window.
+
+        Parameters
+        ----------
+        features: dict of array-like
+            Feature streams with ``time``, e.g. from a
+            :class:`~screening.cohort_index.SessionRecorder`.
+        k: int
+            Number of sessions to return.
+        exclude: iterable of str
+            Session ids to leave out, such as the query session itself.
+
+        Returns
+        -------
+        list of dict
+            ``session_id``, ``distance`` and ``offset_s`` of the matching
+            window, nearest first. Empty if the query is shorter than one
+            window.
+        """
+        started = time.perf_counter()
+        trajectory = resample_trajectory(features, self.rate_hz)
+        if len(trajectory) < self.window:
+            return []
+        query = z_normalize(trajectory[-self.window:])
+        query_upper, query_lower = envelope(query, self.band)
+
+        with self._lock:
+            index = self._load()
+        if not index["session_ids"]:
+            return []
+
+        excluded = {index["session_ids"].index(session_id) for session_id in exclude
+                    if session_id in index["session_ids"]}
+        owners = index["owners"]
+        total = len(owners)
+
+        # Lower bounds for every window: the query envelope against the
+        # window, and the window's stored envelope against the query. The
+        # per-row contributions of the latter also bound the DTW tail.
+        bounds = np.empty(total, dtype=np.float64)
+        contributions = np.empty((total, self.window), dtype=np.float32)
+        for begin in range(0, total, _LB_CHUNK):
+            end = begin + _LB_CHUNK
+            eq = _keogh(index["windows"][begin:end], query_upper, query_lower).sum(axis=1)
+            contributions[begin:end] = _keogh(query, index["upper"][begin:end],
+                                              index["lower"][begin:end])
+            bounds[begin:end] = np.maximum(eq, contributions[begin:end].sum(axis=1))
+        if excluded:
+            bounds[np.isin(owners, list(excluded))] = np.inf
+
+        best = np.full(len(index["session_ids"]), np.inf)
+        best_window = np.full(len(index["session_ids"]), -1)
+        stats = {"windows": total, "pruned": 0, "abandoned": 0, "computed": 0}
+
+        order = np.argsort(bounds, kind="stable")
+        for begin in range(0, total, _DTW_BATCH):
+            batch = order[begin:begin + _DTW_BATCH]
+            finite = np.sort(best[np.isfinite(best)])
+            threshold = finite[k - 1] if len(finite) >= k else np.inf
+            if bounds[batch[0]] >= threshold:
+                stats["pruned"] += total - begin
+                break
+
+            cutoffs = np.minimum(threshold, best[owners[batch]])
+            viable = bounds[batch] < cutoffs
+            stats["pruned"] += int((~viable).sum())
+            batch, cutoffs = batch[viable], cutoffs[viable]
+            if not len(batch):
+                continue
+
+            tails = np.zeros((len(batch), self.window + 1), dtype=np.float64)
+            tails[:, :-1] = np.cumsum(contributions[batch][:, ::-1], axis=1)[:, ::-1]
+            distances = _dtw_batch(query, index["windows"][batch], self.band, cutoffs, tails)
+
+            finished = np.isfinite(distances)
+            stats["abandoned"] += int((~finished).sum())
+            stats["computed"] += int(finished.sum())
+            for window, distance in zip(batch[finished], distances[finished]):
+                owner = owners[window]
+                if distance < best[owner]:
+                    best[owner] = distance
+                    best_window[owner] = window
+
+        ranked = [owner for owner in np.argsort(best, kind="stable")[:k] if np.isfinite(best[owner])]
+        stats["elapsed_ms"] = (time.perf_counter() - started) * 1000
+        self.last_search = stats
+        return [
+            {
+                "session_id": index["session_ids"][owner],
+                "distance": float(np.sqrt(best[owner])),
+                "offset_s": float(index["offsets"][best_window[owner]]),
+            }
+            for owner in ranked
+        ]
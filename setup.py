@@ -23,5 +23,6 @@ setup(
     python_requires=">=3.7",
     install_requires=[
         "streamlit >= 1.0.0",
+        "numpy >= 1.20",
     ],
 )
@@ -2,22 +2,42 @@ import os
 import streamlit as st
 import streamlit.components.v1 as components
 
+from streamlit_audio_blob.upload import AudioUploadReceiver
+
 # Define the component's local development path
 _RELEASE = True
 
-if not _RELEASE:
-    _component_func = components.declare_component(
-        "audio_reactive_blob",
-        url="http://localhost:3001",  # Local dev server URL
-    )
-else:
-    # When releasing to PyPI, use the build directory
-    parent_dir = os.path.dirname(os.path.abspath(__file__))
-    build_dir = os.path.join(parent_dir, "frontend/build")
-    _component_func = components.declare_component("audio_reactive_blob", path=build_dir)
+_component_func = None
+
+
+def _get_component_func():
+    """Declare the component on first use.
+
+    A missing frontend build is reported here rather than at import time, so
+    ``streamlit_audio_blob.upload`` works without an npm build.
+    """
+    global _component_func
+    if _component_func is not None:
+        return _component_func
+    if not _RELEASE:
+        _component_func = components.declare_component(
+            "audio_reactive_blob",
+            url="http://localhost:3001",  # Local dev server URL
+        )
+    else:
+        # When releasing to PyPI, use the build directory
+        parent_dir = os.path.dirname(os.path.abspath(__file__))
+        build_dir = os.path.join(parent_dir, "frontend/build")
+        if not os.path.isdir(build_dir):
+            raise FileNotFoundError(
+                "Component build not found at %s. Run `npm install && npm run build` in "
+                "streamlit_audio_blob/frontend first." % build_dir
+            )
+        _component_func = components.declare_component("audio_reactive_blob", path=build_dir)
+    return _component_func
 
 # Define the public API for the component
-def audio_reactive_blob(key=None):
+def audio_reactive_blob(key=None, views=None, upload=None):
     """Create an audio-reactive blob visualization that responds to microphone input.
     
     Parameters
@@ -26,11 +46,48 @@ def audio_reactive_blob(key=None):
         An optional key that uniquely identifies this component. If this is
         None, and the component's arguments are changed, the component will
         be re-mounted in the Streamlit frontend and lose its current state.
+    views: list of dict or None
+        Style parameters for each canvas to draw, e.g.
+        ``[{"baseHue": 210}, {"baseHue": 160, "showMicIcon": False}]`` for a
+        clinician view next to a patient view. Supported keys are ``baseHue``,
+        ``sizeRatio`` and ``showMicIcon``. All canvases share one microphone
+        graph and one animation loop. If None, a single default view is drawn.
+    upload: AudioUploadReceiver or None
+        If given, the microphone audio is uploaded as compressed 16-bit
+        chunks at ``upload.sample_rate`` and decoded into ``upload``. Keep
+        the receiver in ``st.session_state`` so it lasts across reruns. The
+        key defaults to ``"audio_reactive_blob"``, because the component must
+        not re-mount when the acknowledgement arguments change.
     
     Returns
     -------
     bool
         True if the microphone is active, False otherwise.
+    
+    Raises
+    ------
+    FileNotFoundError
+        If the frontend has not been built.
     """
-    component_value = _component_func(key=key, default=False)
-    return component_value
+    component_func = _get_component_func()
+    if upload is None:
+        return component_func(views=views, key=key, default=False)
+    
+    key = key or "audio_reactive_blob"
+    # Decode the value that triggered this rerun before building the
+    # acknowledgement, so the frontend hears about it now rather than one
+    # rerun later and does not resend it in the meantime
+    previous = st.session_state.get(key)
+    if isinstance(previous, (bytes, bytearray, memoryview)):
+        upload.receive(previous)
+    component_value = component_func(
+        views=views,
+        upload=upload.ack_args(),
+        key=key,
+        default=False
+    )
+    if isinstance(component_value, (bytes, bytearray, memoryview)):
+        if component_value == previous:
+            return upload.mic_active
+        return upload.receive(component_value)
+    return bool(component_value)
@@ -0,0 +1,42 @@
+// Fail the build when the gzipped bundle exceeds the budget in package.json.
+// "Initial" covers the entrypoint files loaded before first paint; lazy chunks
+// (p5, settings and help panels) only count towards the total.
+const fs = require('fs');
+const path = require('path');
+const zlib = require('zlib');
+
+const rootDir = path.join(__dirname, '..');
+const buildDir = path.join(rootDir, 'build');
+const budget = require(path.join(rootDir, 'package.json')).bundleBudget;
+const manifest = require(path.join(buildDir, 'asset-manifest.json'));
+
+const gzipKb = (relativePath) => zlib.gzipSync(fs.readFileSync(path.join(buildDir, relativePath))).length / 1024;
+
+const staticFiles = (subdir, extension) => {
+  const dir = path.join(buildDir, 'static', subdir);
+  if (!fs.existsSync(dir)) return [];
+  return fs.readdirSync(dir)
+    .filter((name) => name.endsWith(extension))
+    .map((name) => path.join('static', subdir, name));
+};
+
+const sum = (files) => files.reduce((total, file) => total + gzipKb(file), 0);
+
+const results = [
+  ['initialJsGzipKb', sum(manifest.entrypoints.filter((file) => file.endsWith('.js')))],
+  ['totalJsGzipKb', sum(staticFiles('js', '.js'))],
+  ['cssGzipKb', sum(staticFiles('css', '.css'))],
+];
+
+let failed = false;
+results.forEach(([name, actual]) => {
+  const limit = budget[name];
+  const status = actual <= limit ? 'ok' : 'OVER BUDGET';
+  console.log(`${name}: ${actual.toFixed(1)} kB (budget ${limit} kB) ${status}`);
+  if (actual > limit) failed = true;
+});
+
+if (failed) {
+  console.error('Bundle size budget exceeded.');
+  process.exit(1);
+}
@@ -1,95 +1,35 @@
-import React, { useRef, useEffect, useState, useCallback } from 'react';
-import { Box, Paper, ThemeProvider, createTheme, CssBaseline, Typography, Slider, Button, IconButton } from '@mui/material';
-import { blue, grey } from '@mui/material/colors';
-import MicIcon from '@mui/icons-material/Mic';
-import VolumeUpIcon from '@mui/icons-material/VolumeUp';
-import SettingsIcon from '@mui/icons-material/Settings';
-import HelpOutlineIcon from '@mui/icons-material/HelpOutline';
+import React, { useRef, useEffect, useState, useCallback, lazy, Suspense } from 'react';
+import { frameLerp, getBlobRuntime } from './blobRuntime';
+import { HelpOutlineIcon, MicIcon, SettingsIcon } from './icons';
+import './AudioReactiveBlob.css';
 
-// --- Material-UI Theme with Accessibility Enhancements for Elderly Users ---
-const theme = createTheme({
-  palette: { 
-    mode: 'light', 
-    primary: blue,
-    background: { 
-      default: '#f8f8f8', 
-      paper: '#ffffff', 
-    }, 
-    text: { 
-      primary: grey[900], 
-      secondary: grey[700], 
-    }, 
-    error: { 
-      main: '#d32f2f', 
-    },
-  },
-  typography: {
-    // Larger font sizes for better readability
-    fontSize: 16,
-    h5: {
-      fontWeight: 600,
-      fontSize: '1.5rem',
-    },
-    body1: {
-      fontSize: '1.1rem',
-    },
-  },
-  components: { 
-    MuiPaper: { 
-      styleOverrides: { 
-        root: { 
-          borderRadius: '16px', 
-          boxShadow: '0 4px 12px rgba(0,0,0,0.08)', 
-          border: `1px solid ${grey[200]}`, 
-          position: 'relative', 
-          overflow: 'hidden',
-        } 
-      } 
-    },
-    MuiButton: {
-      styleOverrides: {
-        root: {
-          borderRadius: '8px',
-          padding: '10px 16px',
-          fontSize: '1rem',
-          textTransform: 'none',
-        }
-      }
-    },
-    MuiSlider: {
-      styleOverrides: {
-        root: {
-          height: 8,
-        },
-        thumb: {
-          height: 24,
-          width: 24,
-        },
-        track: {
-          height: 8,
-          borderRadius: 4,
-        },
-        rail: {
-          height: 8,
-          borderRadius: 4,
-        },
-      }
-    },
-  },
-});
+// Overlay panels are split into their own chunks, together with MUI, and
+// fetched on first open
+const SettingsPanel = lazy(() => import('./SettingsPanel'));
+const HelpPanel = lazy(() => import('./HelpPanel'));
+
+// Canvas background; the shell's CSS uses the same color
+const backgroundColorHex = '#f8f8f8';
+
+// --- Per-View Style Parameters ---
+// Each registered canvas may override these; audio analysis is shared.
+export const defaultBlobStyle = {
+  baseHue: 210, // Blue is calming
+  sizeRatio: 0.2, // Base radius as a fraction of the smaller canvas side
+  showMicIcon: true,
+};
 
 // --- p5.js Sketch Definition ---
-const sketch = (p) => {
-  // --- Audio Analysis Setup ---
-  let audioContext; let analyser; let microphone; let micStream; let frequencyData;
-  let audioReady = false; let sampleRate = 44100;
+// Sketches draw only when the shared runtime asks them to; audio features come
+// from `runtime.features`, which is computed once per tick for all views.
+const createSketch = (runtime, style, container) => (p) => {
   const audioThreshold = 0.09;
-  const fftSize = 512;
-  let nyquist;
 
   // --- State Management (within p5) ---
   let isP5StateActive = false;
   let activeStateIntensity = 0; const activeStateLerpFactor = 0.07;
+  let view = null;
+  let frameTimeDelta = 1; let lastRenderTime = null;
 
   // --- Blob Geometry & Core Properties ---
   let baseRadius = 100;
@@ -165,27 +105,19 @@ const sketch = (p) => {
   let melodyFactor = 0.0; const melodyFactorLerp = 0.025;
   let emphasisFactor = 0.0; const emphasisFactorLerp = 0.05;
 
-  // --- Audio Reactivity Parameters ---
+  // --- Audio Reactivity Parameters --- (mirrored from the shared runtime each frame)
   let smoothedOverallLevel = 0; let smoothedMidLevel = 0; let smoothedTrebleLevel = 0;
-  const audioLerpFactor = 0.1;
-  let frequencySpread = 0; const freqSpreadLerpFactor = 0.03;
-  const binActivationThreshold = 10;
-  let pitchProxy = 0.5; const pitchProxyLerpFactor = 0.06;
-  let lastPitchProxy = 0.5;
-  let pitchChangeRate = 0; const pitchChangeLerpFactor = 0.05;
-  const pitchMinFreq = 80; const pitchMaxFreq = 500;
-  let pitchMinIndex, pitchMaxIndex;
-  let midHistory = []; const midHistoryLength = 30;
-  let sustainedMidLevel = 0;
+  let frequencySpread = 0;
+  let pitchProxy = 0.5;
+  let pitchChangeRate = 0;
 
-  // --- Volume Dynamics (Aha! detection) ---
-  let volumeHistory = []; const volumeHistoryLength = 60;
-  let averageVolume = 0; const ahaThresholdMultiplier = 1.4;
-  const ahaMinimumLevel = 0.30; let isAhaMoment = false;
+  // --- Volume Dynamics (Aha! reaction) ---
+  let lastAhaCount = runtime.features.ahaCount;
+  let isAhaMoment = false;
   let ahaTimer = 0; const ahaDuration = 15;
 
   // --- Color Properties --- (calm, soothing colors for elderly audience)
-  const baseHue = 210; let hueShiftRange = 15; // Blue is calming, less shift for stability
+  const baseHue = style.baseHue; let hueShiftRange = 15; // Blue is calming, less shift for stability
   let targetHue = baseHue; let currentHue = baseHue; const hueLerpFactor = 0.01; // Slower color transitions
   const baseSaturation = 60; const baseBrightness = 95; // Slightly less saturated, gentle colors
   let saturationBoost = 0; const maxSaturationBoost = 10; // Limited saturation change
@@ -193,46 +125,40 @@ const sketch = (p) => {
   let currentCenterColor; let currentEdgeColor; // Assigned in updateColor
   let flashIntensity = 0; const flashDecay = 0.10; // Slower decay for gentler transitions
 
+  // --- Layer Cache ---
+  // Static elements are pre-rendered offscreen and blitted each frame; the mic icon
+  // is cached per quantized scale step. Rebuilt only on resize or theme change.
+  let backgroundColor;
+  const micScaleStep = 0.02; // Scale quantization for cached mic bitmaps
+  let micLayerCache = new Map();
+
   // --- p5.js Setup ---
   p.setup = () => {
-    const container = document.getElementById('canvas-container'); 
-    if (!container) {
-      console.error("Canvas container not found");
-      return;
-    }
-    
     // Create canvas with integer dimensions to avoid sub-pixel rendering issues
     const canvasWidth = Math.floor(container.offsetWidth);
     const canvasHeight = Math.floor(container.offsetHeight);
     
     // Create and position the canvas
     const canvas = p.createCanvas(canvasWidth, canvasHeight);
-    canvas.parent('canvas-container');
+    canvas.parent(container);
     
     // Remove any default margins/padding that might cause positioning issues
-    const canvasElement = document.querySelector('#canvas-container canvas');
-    if (canvasElement) {
-      canvasElement.style.display = 'block';
-      canvasElement.style.margin = '0';
-      canvasElement.style.padding = '0';
-    }
+    const canvasElement = canvas.elt;
+    canvasElement.style.display = 'block';
+    canvasElement.style.margin = '0';
+    canvasElement.style.padding = '0';
     
     p.colorMode(p.HSB, 360, 100, 100, 100); 
     p.angleMode(p.RADIANS); 
-    p.frameRate(60);
+    // The shared runtime's animation loop decides when this view is drawn
+    p.noLoop();
     
-    baseRadius = p.min(p.width, p.height) / 5.0;
-    nyquist = sampleRate / 2;
-    const binWidth = nyquist / (fftSize / 2);
-    pitchMinIndex = Math.max(1, Math.floor(pitchMinFreq / binWidth));
-    pitchMaxIndex = Math.min(fftSize / 2 - 1, Math.ceil(pitchMaxFreq / binWidth));
+    baseRadius = p.min(p.width, p.height) * style.sizeRatio;
     
-    // Initialize vertices and history arrays
+    // Initialize vertices
     for (let i = 0; i < numVertices; i++) { 
       vertices.push(p.createVector(0, 0)); 
     }
-    for(let i=0; i<volumeHistoryLength; i++) volumeHistory.push(0);
-    for(let i=0; i<midHistoryLength; i++) midHistory.push(0);
     
     // Initialize core variables to their base values
     currentActiveShapeNoiseScale = baseActiveShapeNoiseScale;
@@ -244,19 +170,26 @@ const sketch = (p) => {
     calculateBlobShape(); 
     
     // Force a complete redraw once on setup
-    p.clear();
-    p.background(p.color(theme.palette.background.default));
+    invalidateLayerCache();
+    p.background(backgroundColor);
+    
+    view = {
+      element: container,
+      render: renderFrame,
+      isSettled: () => pauseEffectTimer <= 0 && flashIntensity <= 0,
+      onActiveChange: handleActiveChange,
+    };
+    runtime.register(view);
     
-    console.log(`p5 Setup Complete. Canvas: ${p.width}x${p.height}, BaseRadius: ${baseRadius}, Pitch Range Indices: ${pitchMinIndex}-${pitchMaxIndex}`);
+    console.log(`p5 Setup Complete. Canvas: ${p.width}x${p.height}, BaseRadius: ${baseRadius}`);
   };
 
   // --- p5.js Draw Loop ---
   p.draw = () => {
-    let timeDelta = p.deltaTime / (1000 / 60);
+    let timeDelta = frameTimeDelta;
     
-    // Clear the entire canvas with background color to prevent artifacts
-    p.clear();
-    p.background(p.color(theme.palette.background.default));
+    // Repaint the entire canvas with the (opaque) background color to prevent artifacts
+    p.background(backgroundColor);
     
     // Ensure everything is perfectly centered
     p.push();
@@ -265,17 +198,60 @@ const sketch = (p) => {
     const centerY = Math.floor(p.height / 2);
     p.translate(centerX, centerY);
     
-    updateAudio();
+    syncAudioFeatures();
     updateStateAndMotion(timeDelta);
     updateColor();
     calculateBlobShape();
     drawInternalTexture();
     drawBlob();
-    drawMicrophoneIcon();
+    if (style.showMicIcon) drawMicrophoneIcon();
     if(pauseEffectTimer > 0) drawPauseEffect();
     
     p.pop();
   };
+
+  // --- Shared Runtime Hooks ---
+  // Called by the runtime's animation loop with the rAF timestamp
+  const renderFrame = (now) => {
+    // Clamp so the first frame after a pause does not jump the animation
+    frameTimeDelta = lastRenderTime === null ? 1 : Math.min((now - lastRenderTime) / (1000 / 60), 8);
+    lastRenderTime = now;
+    p.redraw();
+  };
+
+  const syncAudioFeatures = () => {
+    const features = runtime.features;
+    isP5StateActive = runtime.isActive();
+    smoothedOverallLevel = features.overallLevel;
+    smoothedMidLevel = features.midLevel;
+    smoothedTrebleLevel = features.trebleLevel;
+    frequencySpread = features.frequencySpread;
+    pitchProxy = features.pitchProxy;
+    pitchChangeRate = features.pitchChangeRate;
+    
+    if (features.ahaCount !== lastAhaCount) {
+      lastAhaCount = features.ahaCount;
+      if (!isAhaMoment) {
+        isAhaMoment = true;
+        ahaTimer = ahaDuration;
+        flashIntensity = 1.0;
+      }
+    }
+  };
+
+  const handleActiveChange = (active) => {
+    silenceFrames = 0;
+    isBreathing = false;
+    pauseEnded = false;
+    pauseEffectTimer = 0;
+    pauseEffectIntensity = 0;
+    inhaleAmount = 0;
+    if (!active) {
+      focusFactor = 0;
+      melodyFactor = 0;
+      emphasisFactor = 0;
+    }
+  };
   
   // --- Draw Microphone Icon ---
   const drawMicrophoneIcon = () => {
@@ -298,270 +274,89 @@ const sketch = (p) => {
     p.circle(0, 0, circleRadius * 2);
     p.pop();
     
-    // Draw a simple, iconic podcast microphone
-    p.push();
-    p.fill(255);
-    p.noStroke();
+    // Blit the cached microphone bitmap for the nearest scale step
+    // Ensure scaleFactor is always positive (at least 0.1) to prevent negative dimensions
+    const safeScaleFactor = Math.max(0.1, scaleFactor); 
+    const stepIndex = Math.round((safeScaleFactor - 1) / micScaleStep);
+    const micLayer = getMicLayer(stepIndex);
+    p.image(micLayer.graphics, -micLayer.originX, -micLayer.originY);
+  };
+
+  // Return the cached mic bitmap for a scale step, rendering it on first use
+  const getMicLayer = (stepIndex) => {
+    let micLayer = micLayerCache.get(stepIndex);
+    if (micLayer) return micLayer;
     
     // Base size for microphone that scales with audio
     const baseMicSize = Math.max(0.1, baseRadius * 0.28); // Ensure base size is never too small
-    // Ensure scaleFactor is always positive (at least 0.1) to prevent negative dimensions
-    const safeScaleFactor = Math.max(0.1, scaleFactor); 
-    const currentMicSize = baseMicSize * safeScaleFactor;
+    const micSize = baseMicSize * Math.max(0.1, 1 + stepIndex * micScaleStep);
+    
+    // Icon bounds: head top at -0.7 * size, base bottom at 1.09 * size
+    const padding = 2;
+    const originX = Math.ceil(micSize * 0.35) + padding;
+    const originY = Math.ceil(micSize * 0.7) + padding;
+    const graphics = p.createGraphics(originX * 2, originY + Math.ceil(micSize * 1.09) + padding);
+    graphics.colorMode(p.HSB, 360, 100, 100, 100);
+    graphics.translate(originX, originY);
+    renderMicrophoneIcon(graphics, micSize);
+    
+    micLayer = { graphics, originX, originY };
+    micLayerCache.set(stepIndex, micLayer);
+    return micLayer;
+  };
+
+  // Draw a simple, iconic podcast microphone centered on the origin of g
+  const renderMicrophoneIcon = (g, currentMicSize) => {
+    g.fill(255);
+    g.noStroke();
     
     // Simple classic microphone - just the essential elements
     
     // Main mic head - simple rounded rectangle
-    p.rectMode(p.CENTER);
+    g.rectMode(p.CENTER);
     // Ensure the corner radius is always positive
     const cornerRadius = Math.max(0.001, currentMicSize * 0.2);
-    p.rect(0, -currentMicSize * 0.3, currentMicSize * 0.55, currentMicSize * 0.8, cornerRadius);
+    g.rect(0, -currentMicSize * 0.3, currentMicSize * 0.55, currentMicSize * 0.8, cornerRadius);
     
     // Simple mic stand - no corner radius to avoid errors
-    p.rect(0, currentMicSize * 0.5, Math.max(0.001, currentMicSize * 0.12), Math.max(0.001, currentMicSize * 1.0));
+    g.rect(0, currentMicSize * 0.5, Math.max(0.001, currentMicSize * 0.12), Math.max(0.001, currentMicSize * 1.0));
     
     // Base - ellipse doesn't need radius protection as p5.js handles it
-    p.ellipse(0, currentMicSize * 1.0, Math.max(0.001, currentMicSize * 0.7), Math.max(0.001, currentMicSize * 0.18));
+    g.ellipse(0, currentMicSize * 1.0, Math.max(0.001, currentMicSize * 0.7), Math.max(0.001, currentMicSize * 0.18));
     
     // Mic grille pattern - subtle circles 
-    p.fill(0, 0, 0, 30); // Semitransparent dark
+    g.fill(0, 0, 0, 30); // Semitransparent dark
     
     // Three small circles to suggest mic grille
     const grilleDiameter = Math.max(0.001, currentMicSize * 0.12);
     
     // Only draw grille details if microphone is large enough to avoid artifacts
     if (currentMicSize > 0.1) {
-      p.ellipse(-currentMicSize * 0.15, -currentMicSize * 0.4, grilleDiameter);
-      p.ellipse(0, -currentMicSize * 0.4, grilleDiameter);
-      p.ellipse(currentMicSize * 0.15, -currentMicSize * 0.4, grilleDiameter);
+      g.ellipse(-currentMicSize * 0.15, -currentMicSize * 0.4, grilleDiameter);
+      g.ellipse(0, -currentMicSize * 0.4, grilleDiameter);
+      g.ellipse(currentMicSize * 0.15, -currentMicSize * 0.4, grilleDiameter);
       
-      p.ellipse(-currentMicSize * 0.15, -currentMicSize * 0.2, grilleDiameter);
-      p.ellipse(0, -currentMicSize * 0.2, grilleDiameter);
-      p.ellipse(currentMicSize * 0.15, -currentMicSize * 0.2, grilleDiameter);
+      g.ellipse(-currentMicSize * 0.15, -currentMicSize * 0.2, grilleDiameter);
+      g.ellipse(0, -currentMicSize * 0.2, grilleDiameter);
+      g.ellipse(currentMicSize * 0.15, -currentMicSize * 0.2, grilleDiameter);
     }
-    
-    p.pop();
   };
 
-  // --- Audio Setup Function ---
-  const setupAudio = async () => { 
-    if (audioContext && audioContext.state === 'running') { 
-      if (!micStream || !micStream.active) { 
-        try { 
-          micStream = await navigator.mediaDevices.getUserMedia({ 
-            audio: { 
-              echoCancellation: true, 
-              noiseSuppression: true 
-            } 
-          }); 
-          if (microphone) microphone.disconnect(); 
-          microphone = audioContext.createMediaStreamSource(micStream); 
-          microphone.connect(analyser); 
-          console.log("Reconnected mic stream."); 
-        } catch (err) { 
-          console.error("Error reconnecting mic:", err); 
-          audioReady = false; 
-          isP5StateActive = false; 
-          return false; 
-        } 
-      } 
-      audioReady = true; 
-      console.log("Audio already running or reconnected."); 
-      return true; 
-    } 
-    
-    if (audioContext && audioContext.state !== 'closed') { 
-      console.log("Closing existing audio context before creating new one."); 
-      await audioContext.close().catch(e => console.error("Error closing previous context:", e)); 
-      audioContext = null; 
-    } 
-    
-    try { 
-      audioContext = new (window.AudioContext || window.webkitAudioContext)(); 
-      sampleRate = audioContext.sampleRate; 
-      nyquist = sampleRate / 2; 
-      const binWidth = nyquist / (fftSize / 2); 
-      pitchMinIndex = Math.max(1, Math.floor(pitchMinFreq / binWidth)); 
-      pitchMaxIndex = Math.min(fftSize / 2 - 1, Math.ceil(pitchMaxFreq / binWidth)); 
-      
-      if (audioContext.state === 'suspended') { 
-        await audioContext.resume(); 
-      } 
-      
-      micStream = await navigator.mediaDevices.getUserMedia({ 
-        audio: { 
-          echoCancellation: true, 
-          noiseSuppression: true 
-        } 
-      }); 
-      
-      microphone = audioContext.createMediaStreamSource(micStream); 
-      analyser = audioContext.createAnalyser(); 
-      analyser.fftSize = fftSize; 
-      analyser.smoothingTimeConstant = 0.75; 
-      frequencyData = new Uint8Array(analyser.frequencyBinCount); 
-      microphone.connect(analyser); 
-      
-      console.log('Audio setup successful. Context state:', audioContext.state); 
-      audioReady = true; 
-      return true; 
-    } catch (err) { 
-      console.error('Audio Setup Error:', err); 
-      audioReady = false; 
-      isP5StateActive = false; 
-      
-      if (micStream) micStream.getTracks().forEach(track => track.stop()); 
-      micStream = null; 
-      microphone = null; 
-      analyser = null; 
-      frequencyData = null; 
-      
-      if (audioContext && audioContext.state !== 'closed') { 
-        await audioContext.close().catch(e => console.error("Error closing context on failure:", e)); 
-      } 
-      
-      audioContext = null; 
-      return false; 
-    } 
-  };
-
-  // --- Stop Audio Processing ---
-  const stopAudioProcessing = () => { 
-    console.log("Stopping audio processing and mic tracks."); 
-    
-    if (micStream) { 
-      micStream.getTracks().forEach(track => track.stop()); 
-      micStream = null; 
-    } 
-    
-    if (microphone) { 
-      microphone.disconnect(); 
-      microphone = null; 
-    } 
-    
-    audioReady = false; 
-    
-    const stopLerpFactor = audioLerpFactor * 4; 
-    smoothedOverallLevel = p.lerp(smoothedOverallLevel, 0, stopLerpFactor); 
-    smoothedMidLevel = p.lerp(smoothedMidLevel, 0, stopLerpFactor); 
-    smoothedTrebleLevel = p.lerp(smoothedTrebleLevel, 0, stopLerpFactor); 
-    frequencySpread = p.lerp(frequencySpread, 0, stopLerpFactor); 
-    
-    averageVolume = 0; 
-    volumeHistory = volumeHistory.map(() => 0); 
-    midHistory = midHistory.map(() => 0); 
-    sustainedMidLevel = 0; 
-    pitchProxy = 0.5; 
-    lastPitchProxy = 0.5; 
-    pitchChangeRate = 0; 
-    focusFactor = 0; 
-    melodyFactor = 0; 
-    emphasisFactor = 0;
-  };
-
-  // --- Update Audio Analysis ---
-  const updateAudio = () => { 
-    lastPitchProxy = pitchProxy; 
-    
-    if (!isP5StateActive || !audioReady || !analyser || !frequencyData) { 
-      const idleLerpFactor = audioLerpFactor * 0.3; 
-      smoothedOverallLevel = p.lerp(smoothedOverallLevel, 0, idleLerpFactor); 
-      smoothedMidLevel = p.lerp(smoothedMidLevel, 0, idleLerpFactor); 
-      smoothedTrebleLevel = p.lerp(smoothedTrebleLevel, 0, idleLerpFactor); 
-      frequencySpread = p.lerp(frequencySpread, 0, freqSpreadLerpFactor); 
-      
-      volumeHistory.push(0); 
-      if(volumeHistory.length > volumeHistoryLength) volumeHistory.shift(); 
-      averageVolume = volumeHistory.reduce((a, b) => a + b, 0) / volumeHistory.length; 
-      
-      midHistory.push(0); 
-      if(midHistory.length > midHistoryLength) midHistory.shift(); 
-      sustainedMidLevel = midHistory.reduce((a,b) => a+b, 0) / midHistory.length; 
-      
-      pitchProxy = p.lerp(pitchProxy, 0.5, pitchProxyLerpFactor); 
-      pitchChangeRate = p.lerp(pitchChangeRate, 0, pitchChangeLerpFactor); 
-      return; 
-    } 
-    
-    analyser.getByteFrequencyData(frequencyData); 
-    
-    let oSum = 0, mSum = 0, tSum = 0, activeBinCount = 0; 
-    const fbc = frequencyData.length; 
-    const midEndFreq = 4000, trebleStartFreq = 4000; 
-    const midEndIndex = Math.min(fbc-1, Math.ceil(midEndFreq/(nyquist/fbc))); 
-    const trebleStartIndex = Math.min(fbc-1, Math.floor(trebleStartFreq/(nyquist/fbc))); 
-    
-    let maxAmp = 0; 
-    let peakIndex = -1; 
-    
-    for (let i = pitchMinIndex; i <= pitchMaxIndex; i++) { 
-      if (frequencyData[i] > maxAmp) { 
-        maxAmp = frequencyData[i]; 
-        peakIndex = i; 
-      } 
-    } 
-    
-    let targetPitchProxy = 0.5; 
-    if (peakIndex !== -1 && maxAmp > binActivationThreshold * 1.5) { 
-      targetPitchProxy = p.map(peakIndex, pitchMinIndex, pitchMaxIndex, 0, 1, true); 
-    } 
-    pitchProxy = p.lerp(pitchProxy, targetPitchProxy, pitchProxyLerpFactor); 
-    
-    for(let i = 0; i < fbc; i++) { 
-      let l = frequencyData[i]; 
-      oSum += l; 
-      
-      if(i <= midEndIndex) mSum += l; 
-      else if(i >= trebleStartIndex) tSum += l; 
-      
-      if(l > binActivationThreshold) activeBinCount++; 
-    } 
-    
-    let nO = fbc > 0 ? oSum / fbc : 0; 
-    let numMidBins = midEndIndex + 1; 
-    let numTrebleBins = fbc - trebleStartIndex; 
-    let nM = numMidBins > 0 ? mSum / numMidBins : 0; 
-    let nT = numTrebleBins > 0 ? tSum / numTrebleBins : 0; 
-    
-    let normO = p.map(nO, 0, 160, 0, 1, true); 
-    let normM = p.map(nM, 0, 160, 0, 1, true); 
-    let normT = p.map(nT, 0, 160, 0, 1, true); 
-    
-    smoothedOverallLevel = p.lerp(smoothedOverallLevel, normO, audioLerpFactor); 
-    smoothedMidLevel = p.lerp(smoothedMidLevel, normM, audioLerpFactor); 
-    smoothedTrebleLevel = p.lerp(smoothedTrebleLevel, normT, audioLerpFactor); 
-    
-    let targetSpread = fbc > 0 ? activeBinCount / fbc : 0; 
-    frequencySpread = p.lerp(frequencySpread, targetSpread, freqSpreadLerpFactor); 
-    
-    volumeHistory.push(smoothedOverallLevel); 
-    if(volumeHistory.length > volumeHistoryLength) volumeHistory.shift(); 
-    averageVolume = volumeHistory.reduce((a, b) => a + b, 0) / volumeHistory.length; 
-    
-    midHistory.push(smoothedMidLevel); 
-    if(midHistory.length > midHistoryLength) midHistory.shift(); 
-    sustainedMidLevel = midHistory.reduce((a,b) => a+b, 0) / midHistory.length; 
-    
-    let currentPitchChange = Math.abs(pitchProxy - lastPitchProxy); 
-    pitchChangeRate = p.lerp(pitchChangeRate, currentPitchChange, pitchChangeLerpFactor); 
-    
-    if (!isAhaMoment && smoothedOverallLevel > ahaMinimumLevel && 
-        averageVolume > 0.01 && smoothedOverallLevel > averageVolume * ahaThresholdMultiplier) { 
-      isAhaMoment = true; 
-      ahaTimer = ahaDuration; 
-      flashIntensity = 1.0; 
-      console.log("Aha! Detected"); 
-    } 
+  // Drop cached layers; called on setup, resize, and theme change
+  const invalidateLayerCache = () => {
+    backgroundColor = p.color(backgroundColorHex);
+    micLayerCache.forEach(micLayer => micLayer.graphics.remove());
+    micLayerCache.clear();
   };
 
   // --- Update State & Motion ---
   const updateStateAndMotion = (timeDelta) => {
     let targetActiveStateIntensity = isP5StateActive ? 1.0 : 0.0; 
-    activeStateIntensity = p.lerp(activeStateIntensity, targetActiveStateIntensity, activeStateLerpFactor * timeDelta);
+    activeStateIntensity = p.lerp(activeStateIntensity, targetActiveStateIntensity, frameLerp(activeStateLerpFactor, timeDelta));
     
     pauseEnded = false; 
     if (isP5StateActive && smoothedOverallLevel < silenceThreshold) { 
-      silenceFrames++; 
+      silenceFrames += timeDelta; 
     } else { 
       if (silenceFrames >= framesForPause) { 
         pauseEnded = true; 
@@ -578,11 +373,11 @@ const sketch = (p) => {
       breathingTime += breathingSpeed * timeDelta; 
     }
     
-    if (pauseEffectTimer > 0) pauseEffectTimer--; 
-    pauseEffectIntensity = p.lerp(pauseEffectIntensity, 0, pauseEffectDecay); 
+    if (pauseEffectTimer > 0) pauseEffectTimer = Math.max(0, pauseEffectTimer - timeDelta); 
+    pauseEffectIntensity = p.lerp(pauseEffectIntensity, 0, frameLerp(pauseEffectDecay, timeDelta)); 
     
     if (pauseEnded || inhaleAmount !== 0) { 
-      inhaleAmount = p.lerp(inhaleAmount, 1.0, inhaleSpeed);
+      inhaleAmount = p.lerp(inhaleAmount, 1.0, frameLerp(inhaleSpeed, timeDelta));
     } 
     
     if (Math.abs(inhaleAmount - 1.0) < 0.01) inhaleAmount = 0;
@@ -607,9 +402,9 @@ const sketch = (p) => {
       if (isAhaMoment) targetEmphasisFactor = 1.0; 
     } 
     
-    focusFactor = p.lerp(focusFactor, targetFocusFactor, focusFactorLerp); 
-    melodyFactor = p.lerp(melodyFactor, targetMelodyFactor, melodyFactorLerp); 
-    emphasisFactor = p.lerp(emphasisFactor, targetEmphasisFactor, emphasisFactorLerp);
+    focusFactor = p.lerp(focusFactor, targetFocusFactor, frameLerp(focusFactorLerp, timeDelta)); 
+    melodyFactor = p.lerp(melodyFactor, targetMelodyFactor, frameLerp(melodyFactorLerp, timeDelta)); 
+    emphasisFactor = p.lerp(emphasisFactor, targetEmphasisFactor, frameLerp(emphasisFactorLerp, timeDelta));
     
     let rotationSpeedModifier = p.lerp(1.0, 0.8, focusFactor) * p.lerp(1.0, 1.2, melodyFactor); 
     let finalSlowMultiplier = currentSlowSpeedMultiplier * p.lerp(1.0, 1.1, emphasisFactor); 
@@ -628,7 +423,7 @@ const sketch = (p) => {
     
     // Aha moment handling
     if (isAhaMoment) {
-      ahaTimer--;
+      ahaTimer -= timeDelta;
       if (ahaTimer <= 0) {
         isAhaMoment = false;
       }
@@ -653,20 +448,20 @@ const sketch = (p) => {
     } else {
       // Return to base color when not active
       targetHue = baseHue;
-      saturationBoost = p.lerp(saturationBoost, 0, 0.05);
-      brightnessBoost = p.lerp(brightnessBoost, 0, 0.05);
+      saturationBoost = p.lerp(saturationBoost, 0, frameLerp(0.05, timeDelta));
+      brightnessBoost = p.lerp(brightnessBoost, 0, frameLerp(0.05, timeDelta));
     }
     
     // Smooth hue transitions
-    currentHue = p.lerp(currentHue, targetHue, hueLerpFactor);
+    currentHue = p.lerp(currentHue, targetHue, frameLerp(hueLerpFactor, timeDelta));
     
     // Update edge sharpness based on focus factor
     let targetEdgeSharpness = p.map(focusFactor, 0, 1, 0.7, 1.0, true);
-    edgeSharpness = p.lerp(edgeSharpness, targetEdgeSharpness, edgeSharpnessLerpFactor);
+    edgeSharpness = p.lerp(edgeSharpness, targetEdgeSharpness, frameLerp(edgeSharpnessLerpFactor, timeDelta));
     
     // Update internal texture alpha based on frequency spread
     let targetInternalAlpha = p.map(frequencySpread, 0.1, 0.5, 0, maxInternalTextureAlpha, true);
-    internalTextureAlpha = p.lerp(internalTextureAlpha, targetInternalAlpha, internalAlphaLerpFactor);
+    internalTextureAlpha = p.lerp(internalTextureAlpha, targetInternalAlpha, frameLerp(internalAlphaLerpFactor, timeDelta));
     
     // Update active peak multiplier based on volume and emphasis
     let targetPeakMultiplier = 1.0;
@@ -674,7 +469,7 @@ const sketch = (p) => {
       targetPeakMultiplier = p.map(smoothedOverallLevel, audioThreshold, 0.8, 1.0, maxPeakExtensionFactor, true);
       targetPeakMultiplier = p.lerp(targetPeakMultiplier, maxPeakExtensionFactor, emphasisFactor * 0.5);
     }
-    activePeakMultiplier = p.lerp(activePeakMultiplier, targetPeakMultiplier, activeMultiplierLerpFactor);
+    activePeakMultiplier = p.lerp(activePeakMultiplier, targetPeakMultiplier, frameLerp(activeMultiplierLerpFactor, timeDelta));
     
     // Update passive deformation amount based on volume
     let targetPassiveDeformation = basePassiveDeformationAmount;
@@ -682,7 +477,7 @@ const sketch = (p) => {
       let volumeBoost = p.map(smoothedOverallLevel, audioThreshold, 0.8, 0, maxPassiveDeformationBoost, true);
       targetPassiveDeformation = basePassiveDeformationAmount + volumeBoost;
     }
-    currentPassiveDeformationAmount = p.lerp(currentPassiveDeformationAmount, targetPassiveDeformation, passiveDeformationLerpFactor);
+    currentPassiveDeformationAmount = p.lerp(currentPassiveDeformationAmount, targetPassiveDeformation, frameLerp(passiveDeformationLerpFactor, timeDelta));
     
     // Update active shape noise scale based on frequency spread
     let targetShapeNoiseScale = baseActiveShapeNoiseScale;
@@ -690,26 +485,26 @@ const sketch = (p) => {
       let spreadFactor = p.map(frequencySpread, 0.1, 0.6, 0, shapeScaleSpreadFactor, true);
       targetShapeNoiseScale = baseActiveShapeNoiseScale * (1.0 + spreadFactor);
     }
-    currentActiveShapeNoiseScale = p.lerp(currentActiveShapeNoiseScale, targetShapeNoiseScale, shapeScaleLerpFactor);
+    currentActiveShapeNoiseScale = p.lerp(currentActiveShapeNoiseScale, targetShapeNoiseScale, frameLerp(shapeScaleLerpFactor, timeDelta));
     
     // Update active texture intensity based on treble level
     let targetTextureIntensity = baseTextureIntensity;
     if (isP5StateActive && smoothedTrebleLevel > 0.1) {
       targetTextureIntensity = p.map(smoothedTrebleLevel, 0.1, 0.8, baseTextureIntensity, maxTextureIntensity, true);
     }
-    currentActiveTextureIntensity = p.lerp(currentActiveTextureIntensity, targetTextureIntensity, textureIntensityLerpFactor);
+    currentActiveTextureIntensity = p.lerp(currentActiveTextureIntensity, targetTextureIntensity, frameLerp(textureIntensityLerpFactor, timeDelta));
     
     // Update waviness influence based on mid level
     let targetWavinessInfluence = 0;
     if (isP5StateActive && smoothedMidLevel > 0.1) {
       targetWavinessInfluence = p.map(smoothedMidLevel, 0.1, 0.8, 0, maxWavinessInfluence, true);
     }
-    currentWavinessInfluence = p.lerp(currentWavinessInfluence, targetWavinessInfluence, wavinessInfluenceLerpFactor);
+    currentWavinessInfluence = p.lerp(currentWavinessInfluence, targetWavinessInfluence, frameLerp(wavinessInfluenceLerpFactor, timeDelta));
     
     // Update waviness noise scale based on pitch
     let pitchScaleFactor = p.map(pitchProxy, 0, 1, -wavinessScalePitchFactor, wavinessScalePitchFactor, true);
     let targetWavinessScale = baseWavinessNoiseScale * (1.0 + pitchScaleFactor);
-    currentWavinessNoiseScale = p.lerp(currentWavinessNoiseScale, targetWavinessScale, wavinessScaleLerpFactor);
+    currentWavinessNoiseScale = p.lerp(currentWavinessNoiseScale, targetWavinessScale, frameLerp(wavinessScaleLerpFactor, timeDelta));
   };
 
   // --- Update Color ---
@@ -909,8 +704,33 @@ const sketch = (p) => {
     p.pop();
   };
 
+  // --- Blob Outline ---
+  // Closed Catmull-Rom spline through all vertices, identical to p5's curveVertex
+  // with default tightness, built once per frame as a Path2D
+  const buildBlobOutline = () => {
+    const outline = new Path2D();
+    outline.moveTo(vertices[0].x, vertices[0].y);
+    for (let i = 0; i < numVertices; i++) {
+      const v0 = vertices[(i - 1 + numVertices) % numVertices];
+      const v1 = vertices[i];
+      const v2 = vertices[(i + 1) % numVertices];
+      const v3 = vertices[(i + 2) % numVertices];
+      outline.bezierCurveTo(
+        v1.x + (v2.x - v0.x) / 6, v1.y + (v2.y - v0.y) / 6,
+        v2.x - (v3.x - v1.x) / 6, v2.y - (v3.y - v1.y) / 6,
+        v2.x, v2.y
+      );
+    }
+    outline.closePath();
+    return outline;
+  };
+
   // --- Blob Rendering ---
   const drawBlob = () => {
+    // Smoothed outline, shared by the glow and every layer via a scale transform
+    const outline = buildBlobOutline();
+    const ctx = p.drawingContext;
+    
     // Base parameters for blob layers
     const baseLayers = 8;
     const maxLayersBoost = 10;
@@ -957,18 +777,15 @@ const sketch = (p) => {
       // Consistent, thin stroke for elegant appearance
       const baseStrokeWeight = 1.2;
       const maxAdditionalWeight = 1.0;
-      p.strokeWeight(baseStrokeWeight + p.map(smoothedOverallLevel, 0.1, 0.7, 0, maxAdditionalWeight, true));
+      const glowWeight = baseStrokeWeight + p.map(smoothedOverallLevel, 0.1, 0.7, 0, maxAdditionalWeight, true);
       
       // Very subtle size variation - barely noticeable but provides gentle feedback
       const glowSize = 1.01 + (smoothedOverallLevel * 0.03);
-      p.beginShape();
-      p.curveVertex(vertices[numVertices - 1].x * glowSize, vertices[numVertices - 1].y * glowSize);
-      for (let i = 0; i < numVertices; i++) {
-        p.curveVertex(vertices[i].x * glowSize, vertices[i].y * glowSize);
-      }
-      p.curveVertex(vertices[0].x * glowSize, vertices[0].y * glowSize);
-      p.curveVertex(vertices[1].x * glowSize, vertices[1].y * glowSize);
-      p.endShape(p.CLOSE);
+      p.strokeWeight(glowWeight / glowSize); // The path scale also scales the line width
+      ctx.save();
+      ctx.scale(glowSize, glowSize);
+      ctx.stroke(outline);
+      ctx.restore();
     }
     
     // Draw standard blob layers
@@ -990,14 +807,10 @@ const sketch = (p) => {
       
       p.noStroke();
       p.fill(layerColor);
-      p.beginShape();
-      p.curveVertex(vertices[numVertices - 1].x * layerRadiusRatio, vertices[numVertices - 1].y * layerRadiusRatio);
-      for (let i = 0; i < numVertices; i++) {
-        p.curveVertex(vertices[i].x * layerRadiusRatio, vertices[i].y * layerRadiusRatio);
-      }
-      p.curveVertex(vertices[0].x * layerRadiusRatio, vertices[0].y * layerRadiusRatio);
-      p.curveVertex(vertices[1].x * layerRadiusRatio, vertices[1].y * layerRadiusRatio);
-      p.endShape(p.CLOSE);
+      ctx.save();
+      ctx.scale(layerRadiusRatio, layerRadiusRatio);
+      ctx.fill(outline);
+      ctx.restore();
     }
   };
 
@@ -1021,45 +834,12 @@ const sketch = (p) => {
     p.pop();
   };
 
-  // --- External Control & Cleanup ---
-  p.activate = async () => {
-    console.log("p5: Received activation request.");
-    silenceFrames = 0;
-    isBreathing = false;
-    pauseEnded = false;
-    pauseEffectTimer = 0;
-    pauseEffectIntensity = 0;
-    inhaleAmount = 0;
-    
-    const success = await setupAudio();
-    if (success) {
-      isP5StateActive = true;
-    } else {
-      isP5StateActive = false;
-    }
-    return success;
-  };
-  
-  p.deactivate = () => {
-    console.log("p5: Received deactivation request.");
-    isP5StateActive = false;
-    isBreathing = false;
-    pauseEnded = false;
-    pauseEffectTimer = 0;
-    pauseEffectIntensity = 0;
-    inhaleAmount = 0;
-    stopAudioProcessing();
-  };
-  
+  // --- Cleanup ---
   p.cleanup = () => {
-    console.log("p5: Cleaning up sketch and audio.");
-    stopAudioProcessing();
-    
-    if (audioContext && audioContext.state !=='closed') {
-      audioContext.close()
-        .then(() => console.log("AudioContext closed."))
-        .catch(e => console.error("Error closing context on cleanup:", e));
-      audioContext = null;
+    console.log("p5: Cleaning up sketch.");
+    if (view) {
+      runtime.unregister(view);
+      view = null;
     }
     
     p.remove();
@@ -1067,30 +847,26 @@ const sketch = (p) => {
   };
   
   p.windowResized = () => {
-    const container = document.getElementById('canvas-container');
-    if (!container) return;
-    
     p.resizeCanvas(container.offsetWidth, container.offsetHeight);
-    baseRadius = p.min(p.width, p.height) / 5.0;
+    baseRadius = p.min(p.width, p.height) * style.sizeRatio;
+    invalidateLayerCache();
     console.log(`Resized, new baseRadius: ${baseRadius}`);
   };
 };
 
-// --- React Component Definition ---
-const AudioReactiveBlob = () => {
+// --- Blob Canvas Component ---
+// One p5 instance per canvas, registered with the shared page-level runtime
+const BlobCanvas = ({ blobStyle, onClick, children }) => {
   const canvasContainerRef = useRef(null);
   const p5InstanceRef = useRef(null);
-  const [isUserActiveState, setIsUserActiveState] = useState(false);
-  const [errorMessage, setErrorMessage] = useState('');
   const [isLoading, setIsLoading] = useState(true);
-  const [showSettings, setShowSettings] = useState(false);
-  const [showHelp, setShowHelp] = useState(false);
-  const [sensitivity, setSensitivity] = useState(50);
-  const [size, setSize] = useState(50);
+  const [loadError, setLoadError] = useState('');
+  // Re-create the sketch only when the style values change, not on every render
+  const styleKey = JSON.stringify(blobStyle || {});
 
   useEffect(() => {
-    let p5instance;
     let mounted = true;
+    const style = { ...defaultBlobStyle, ...JSON.parse(styleKey) };
     
     // Initialize p5.js with a slight delay to ensure DOM is fully ready
     const timer = setTimeout(() => {
@@ -1101,29 +877,23 @@ const AudioReactiveBlob = () => {
         
         if (canvasContainerRef.current && !p5InstanceRef.current) {
           try {
-            p5instance = new p5.default(sketch, canvasContainerRef.current);
-            p5InstanceRef.current = p5instance;
+            const container = canvasContainerRef.current;
+            p5InstanceRef.current = new p5.default(createSketch(getBlobRuntime(), style, container), container);
             console.log("React: p5 instance created successfully");
             
-            // Force a redraw after a short delay to ensure everything renders properly
+            // Give the first frame a moment to render before hiding the loading indicator
             setTimeout(() => {
-              if (mounted) {
-                setIsLoading(false); // Hide loading indicator
-                if (p5InstanceRef.current && p5InstanceRef.current.redraw) {
-                  p5InstanceRef.current.redraw();
-                  console.log("Forced redraw after initialization");
-                }
-              }
+              if (mounted) setIsLoading(false);
             }, 200);
           } catch (err) {
             console.error("Error creating p5 instance:", err);
-            setErrorMessage("Failed to initialize visualization");
+            setLoadError("Failed to initialize visualization");
           }
         }
       }).catch(error => {
         console.error("Failed to load p5.js:", error);
         if (mounted) {
-          setErrorMessage("Failed to load visualization component.");
+          setLoadError("Failed to load visualization component.");
         }
       });
     }, 50); // Short delay to ensure DOM is ready
@@ -1141,21 +911,47 @@ const AudioReactiveBlob = () => {
         p5InstanceRef.current = null;
       }
     };
-  }, []);
+  }, [styleKey]);
+
+  return (
+    <div ref={canvasContainerRef} className="arb-canvas" onClick={onClick}>
+      {isLoading && (
+        <div className="arb-overlay is-loading">
+          {loadError || "Loading Visualizer..."}
+        </div>
+      )}
+      
+      {!isLoading && children}
+    </div>
+  );
+};
+
+// --- React Component Definition ---
+const AudioReactiveBlob = ({ views = [defaultBlobStyle], onMicStateChange }) => {
+  const [isUserActiveState, setIsUserActiveState] = useState(false);
+  const [errorMessage, setErrorMessage] = useState('');
+  const [showSettings, setShowSettings] = useState(false);
+  const [showHelp, setShowHelp] = useState(false);
+  const [sensitivity, setSensitivity] = useState(50);
+  const [size, setSize] = useState(50);
+
+  useEffect(() => {
+    if (onMicStateChange) onMicStateChange(isUserActiveState);
+  }, [isUserActiveState, onMicStateChange]);
 
   const handleCanvasClick = useCallback(async () => {
-    if (!p5InstanceRef.current) return;
+    const runtime = getBlobRuntime();
     
     setErrorMessage('');
     
     if (isUserActiveState) {
       console.log("React: User clicked to Deactivate.");
-      p5InstanceRef.current.deactivate();
+      runtime.deactivate();
       setIsUserActiveState(false);
     } else {
       console.log("React: User clicked to Activate.");
       try {
-        const success = await p5InstanceRef.current.activate();
+        const success = await runtime.activate();
         if (success) {
           console.log("React: Activation successful.");
           setIsUserActiveState(true);
@@ -1185,243 +981,69 @@ const AudioReactiveBlob = () => {
   };
 
   return (
-    <ThemeProvider theme={theme}>
-      <CssBaseline />
-      <Box sx={{
-        display: 'flex',
-        flexDirection: 'column',
-        alignItems: 'center',
-        justifyContent: 'center',
-        minHeight: '100vh',
-        bgcolor: 'background.default',
-        p: 2,
-      }}>
-        <Typography variant="h5" component="h1" gutterBottom sx={{ color: 'text.primary', textAlign: 'center' }}>
-          Voice Visualization
-        </Typography>
-        
-        <Paper
-          elevation={3}
-          sx={{
-            width: 'clamp(300px, 90vw, 800px)',
-            p: 3,
-            mb: 2,
-            display: 'flex',
-            flexDirection: 'column',
-            alignItems: 'center',
-          }}
-        >
-          <Box sx={{ 
-            display: 'flex', 
-            width: '100%', 
-            justifyContent: 'space-between', 
-            mb: 2,
-            alignItems: 'center'
-          }}>
-            <Button
-              variant={isUserActiveState ? "contained" : "outlined"}
-              color={isUserActiveState ? "primary" : "primary"}
-              startIcon={<MicIcon />}
-              onClick={handleCanvasClick}
-              size="large"
-              sx={{ 
-                fontSize: '1.1rem',
-                py: 1.5,
-                px: 3,
-                borderRadius: 2
-              }}
-            >
-              {isUserActiveState ? "Microphone On" : "Start Microphone"}
-            </Button>
-            
-            <Box>
-              <IconButton 
-                onClick={toggleSettings}
-                color="primary"
-                size="large"
-                aria-label="Settings"
-                sx={{ ml: 1 }}
-              >
-                <SettingsIcon fontSize="large" />
-              </IconButton>
-              
-              <IconButton 
-                onClick={toggleHelp}
-                color="primary"
-                size="large"
-                aria-label="Help"
-                sx={{ ml: 1 }}
-              >
-                <HelpOutlineIcon fontSize="large" />
-              </IconButton>
-            </Box>
-          </Box>
+    <div className="arb-page">
+      <h1 className="arb-title">
+        Voice Visualization
+      </h1>
+      
+      <div className="arb-card">
+        <div className="arb-toolbar">
+          <button
+            type="button"
+            className={isUserActiveState ? "arb-button is-active" : "arb-button"}
+            onClick={handleCanvasClick}
+          >
+            <MicIcon />
+            {isUserActiveState ? "Microphone On" : "Start Microphone"}
+          </button>
           
+          <div>
+            <button type="button" className="arb-icon-button" onClick={toggleSettings} aria-label="Settings">
+              <SettingsIcon size={35} />
+            </button>
+            
+            <button type="button" className="arb-icon-button" onClick={toggleHelp} aria-label="Help">
+              <HelpOutlineIcon size={35} />
+            </button>
+          </div>
+        </div>
+        
+        <Suspense fallback={null}>
           {showSettings && (
-            <Paper 
-              elevation={2}
-              sx={{ 
-                width: '100%', 
-                p: 2, 
-                mb: 2,
-                borderRadius: 2
-              }}
-            >
-              <Typography variant="h6" gutterBottom>
-                Settings
-              </Typography>
-              
-              <Box sx={{ mb: 3 }}>
-                <Box sx={{ display: 'flex', alignItems: 'center', mb: 1 }}>
-                  <VolumeUpIcon sx={{ mr: 2 }} />
-                  <Typography id="sensitivity-slider" gutterBottom>
-                    Audio Sensitivity
-                  </Typography>
-                </Box>
-                <Slider
-                  value={sensitivity}
-                  onChange={(e, newValue) => setSensitivity(newValue)}
-                  aria-labelledby="sensitivity-slider"
-                  valueLabelDisplay="auto"
-                  step={10}
-                  marks
-                  min={0}
-                  max={100}
-                />
-              </Box>
-              
-              <Box>
-                <Typography id="size-slider" gutterBottom>
-                  Visualization Size
-                </Typography>
-                <Slider
-                  value={size}
-                  onChange={(e, newValue) => setSize(newValue)}
-                  aria-labelledby="size-slider"
-                  valueLabelDisplay="auto"
-                  step={10}
-                  marks
-                  min={0}
-                  max={100}
-                />
-              </Box>
-            </Paper>
-          )}
-          
-          {showHelp && (
-            <Paper 
-              elevation={2}
-              sx={{ 
-                width: '100%', 
-                p: 2, 
-                mb: 2,
-                borderRadius: 2
-              }}
-            >
-              <Typography variant="h6" gutterBottom>
-                How to Use
-              </Typography>
-              
-              <Typography paragraph>
-                1. Click the "Start Microphone" button to begin voice visualization.
-              </Typography>
-              
-              <Typography paragraph>
-                2. Speak into your microphone and watch the blob react to your voice.
-              </Typography>
-              
-              <Typography paragraph>
-                3. Use the Settings panel to adjust sensitivity and size if needed.
-              </Typography>
-              
-              <Typography paragraph>
-                4. Click the microphone button again to stop recording.
-              </Typography>
-            </Paper>
+            <SettingsPanel
+              sensitivity={sensitivity}
+              onSensitivityChange={setSensitivity}
+              size={size}
+              onSizeChange={setSize}
+            />
           )}
           
-          <Paper
-            id="canvas-container"
-            ref={canvasContainerRef}
-            elevation={2}
-            onClick={handleCanvasClick}
-            sx={{
-              width: '100%',
-              height: 'clamp(300px, 50vh, 500px)',
-              display: 'flex',
-              alignItems: 'center',
-              justifyContent: 'center',
-              cursor: 'pointer',
-              position: 'relative',
-              overflow: 'hidden',
-              borderRadius: 4,
-              bgcolor: theme.palette.background.default
-            }}
-          >
-            {isLoading && (
-              <Box sx={{
-                position: 'absolute',
-                top: 0,
-                left: 0,
-                right: 0,
-                bottom: 0,
-                display: 'flex',
-                alignItems: 'center',
-                justifyContent: 'center',
-                zIndex: 5,
-                bgcolor: theme.palette.background.default
-              }}>
-                <Typography variant="body1" sx={{ color: grey[500] }}>
-                  Loading Visualizer...
-                </Typography>
-              </Box>
-            )}
-            
-            {!isUserActiveState && !isLoading && (
-              <Box sx={{
-                position: 'absolute',
-                top: 0,
-                left: 0,
-                right: 0,
-                bottom: 0,
-                display: 'flex',
-                alignItems: 'center',
-                justifyContent: 'center',
-                zIndex: 4,
-                bgcolor: 'rgba(0,0,0,0.05)',
-                borderRadius: 4,
-              }}>
-                <Typography variant="body1" sx={{ color: theme.palette.primary.main, fontWeight: 500 }}>
+          {showHelp && <HelpPanel />}
+        </Suspense>
+        
+        <div className="arb-canvas-row">
+          {views.map((blobStyle, index) => (
+            <BlobCanvas key={index} blobStyle={blobStyle} onClick={handleCanvasClick}>
+              {!isUserActiveState && (
+                <div className="arb-overlay is-idle">
                   Click to start microphone
-                </Typography>
-              </Box>
-            )}
-            
-            {errorMessage && (
-              <Box sx={{
-                position: 'absolute',
-                bottom: 16,
-                left: 16,
-                right: 16,
-                color: 'error.main',
-                textAlign: 'center',
-                backgroundColor: 'rgba(255, 235, 238, 0.9)',
-                p: 2,
-                borderRadius: 2,
-                fontSize: '1rem',
-                zIndex: 10
-              }}>
-                {errorMessage}
-              </Box>
-            )}
-          </Paper>
-          
-          <Typography variant="body2" sx={{ mt: 2, color: grey[600], textAlign: 'center' }}>
-            This visualization responds to your voice. Speak clearly for best results.
-          </Typography>
-        </Paper>
-      </Box>
-    </ThemeProvider>
+                </div>
+              )}
+              
+              {errorMessage && (
+                <div className="arb-error">
+                  {errorMessage}
+                </div>
+              )}
+            </BlobCanvas>
+          ))}
+        </div>
+        
+        <p className="arb-caption">
+          This visualization responds to your voice. Speak clearly for best results.
+        </p>
+      </div>
+    </div>
   );
 };
 
@@ -0,0 +1,41 @@
+import React from 'react';
+import { ThemeProvider, Paper, Typography } from '@mui/material';
+import panelTheme from './panelTheme';
+
+// --- Help Panel ---
+// Loaded on demand so it and MUI stay out of the initial bundle
+const HelpPanel = () => (
+  <ThemeProvider theme={panelTheme}>
+    <Paper 
+      elevation={2}
+      sx={{ 
+        width: '100%', 
+        p: 2, 
+        mb: 2,
+        borderRadius: 2
+      }}
+    >
+      <Typography variant="h6" gutterBottom>
+        How to Use
+      </Typography>
+      
+      <Typography paragraph>
+        1. Click the "Start Microphone" button to begin voice visualization.
+      </Typography>
+      
+      <Typography paragraph>
+        2. Speak into your microphone and watch the blob react to your voice.
+      </Typography>
+      
+      <Typography paragraph>
+        3. Use the Settings panel to adjust sensitivity and size if needed.
+      </Typography>
+      
+      <Typography paragraph>
+        4. Click the microphone button again to stop recording.
+      </Typography>
+    </Paper>
+  </ThemeProvider>
+);
+
+export default HelpPanel;
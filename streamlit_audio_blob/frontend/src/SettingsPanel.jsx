@@ -0,0 +1,61 @@
+import React from 'react';
+import { ThemeProvider, Box, Paper, Typography, Slider } from '@mui/material';
+import VolumeUpIcon from '@mui/icons-material/VolumeUp';
+import panelTheme from './panelTheme';
+
+// --- Settings Panel ---
+// Loaded on demand so MUI and the slider code stay out of the initial bundle
+const SettingsPanel = ({ sensitivity, onSensitivityChange, size, onSizeChange }) => (
+  <ThemeProvider theme={panelTheme}>
+    <Paper 
+      elevation={2}
+      sx={{ 
+        width: '100%', 
+        p: 2, 
+        mb: 2,
+        borderRadius: 2
+      }}
+    >
+      <Typography variant="h6" gutterBottom>
+        Settings
+      </Typography>
+      
+      <Box sx={{ mb: 3 }}>
+        <Box sx={{ display: 'flex', alignItems: 'center', mb: 1 }}>
+          <VolumeUpIcon sx={{ mr: 2 }} />
+          <Typography id="sensitivity-slider" gutterBottom>
+            Audio Sensitivity
+          </Typography>
+        </Box>
+        <Slider
+          value={sensitivity}
+          onChange={(e, newValue) => onSensitivityChange(newValue)}
+          aria-labelledby="sensitivity-slider"
+          valueLabelDisplay="auto"
+          step={10}
+          marks
+          min={0}
+          max={100}
+        />
+      </Box>
+      
+      <Box>
+        <Typography id="size-slider" gutterBottom>
+          Visualization Size
+        </Typography>
+        <Slider
+          value={size}
+          onChange={(e, newValue) => onSizeChange(newValue)}
+          aria-labelledby="size-slider"
+          valueLabelDisplay="auto"
+          step={10}
+          marks
+          min={0}
+          max={100}
+        />
+      </Box>
+    </Paper>
+  </ThemeProvider>
+);
+
+export default SettingsPanel;
@@ -1,14 +1,48 @@
-import React, { useEffect, useState } from "react";
+import React, { useCallback, useEffect, useRef, useState } from "react";
 import { Streamlit, withStreamlitConnection } from "streamlit-component-lib";
 import AudioReactiveBlob from "./AudioReactiveBlob";
+import { createAudioUploader } from "./audioUpload";
+import { getBlobRuntime } from "./blobRuntime";
 
 const StreamlitAudioReactiveBlob = ({ args }) => {
   const [micActive, setMicActive] = useState(false);
+  const uploaderRef = useRef(null);
+  const upload = args.upload || null;
+  const uploadRate = upload ? upload.rate : null;
+  const uploadChunkMs = upload ? upload.chunkMs : null;
 
-  // Update Streamlit when microphone state changes
+  // With audio upload enabled, the uploader's binary messages carry the
+  // microphone state; otherwise the component value is the state itself
   useEffect(() => {
-    Streamlit.setComponentValue(micActive);
-  }, [micActive]);
+    if (!uploadRate) Streamlit.setComponentValue(micActive);
+  }, [micActive, uploadRate]);
+
+  // Create the uploader once per configuration and tap it into the mic graph
+  useEffect(() => {
+    if (!uploadRate) return undefined;
+    const runtime = getBlobRuntime();
+    const uploader = createAudioUploader({
+      rate: uploadRate,
+      chunkMs: uploadChunkMs,
+      send: (message) => Streamlit.setComponentValue(message),
+    });
+    uploaderRef.current = uploader;
+    runtime.addAudioTap(uploader);
+    return () => {
+      runtime.removeAudioTap(uploader);
+      uploader.close();
+      uploaderRef.current = null;
+    };
+  }, [uploadRate, uploadChunkMs]);
+
+  // Python acknowledges received chunks through the component arguments
+  const ackStream = upload ? upload.stream : null;
+  const ackSeq = upload ? upload.ack : -1;
+  useEffect(() => {
+    if (uploaderRef.current && ackStream !== null) {
+      uploaderRef.current.acknowledge(ackStream, ackSeq);
+    }
+  }, [ackStream, ackSeq]);
 
   // Resize the iframe to fit the content
   useEffect(() => {
@@ -16,13 +50,13 @@ const StreamlitAudioReactiveBlob = ({ args }) => {
   }, []);
 
   // Handle microphone state changes from the AudioReactiveBlob component
-  const handleMicStateChange = (isActive) => {
+  const handleMicStateChange = useCallback((isActive) => {
     setMicActive(isActive);
-  };
+  }, []);
 
   return (
     <div style={{ width: "100%", height: "500px" }}>
-      <AudioReactiveBlob onMicStateChange={handleMicStateChange} />
+      <AudioReactiveBlob views={args.views || undefined} onMicStateChange={handleMicStateChange} />
     </div>
   );
 };
@@ -0,0 +1,156 @@
+// --- Audio Upload ---
+// An audio tap for the blob runtime that streams the microphone to Python as
+// compressed 16-bit chunks. An AudioWorklet copies raw blocks to a Web
+// Worker over a MessagePort, so neither capture nor encoding runs on the
+// main thread. Encoded chunks wait in an outbox until Python acknowledges
+// their sequence number, so a dropped connection resends only what never
+// arrived. When the outbox overflows the oldest chunks are dropped, and
+// every message tells Python where the dropped range ends so its
+// acknowledgement can move past the gap.
+import { packMessage } from './audioUploadCodec';
+
+// Frames per block posted by the worklet (16 render quanta)
+const captureBlockFrames = 2048;
+// Chunks per component message, and how many unacknowledged chunks to keep
+const maxChunksPerMessage = 10;
+const maxOutboxChunks = 600;
+// Resend unacknowledged chunks after this long without progress
+const resendMs = 2000;
+
+const captureProcessorSource = `
+class UploadCaptureProcessor extends AudioWorkletProcessor {
+  constructor() {
+    super();
+    this.block = new Float32Array(${captureBlockFrames});
+    this.filled = 0;
+    this.target = null;
+    this.port.onmessage = (event) => { this.target = event.data.port; };
+  }
+
+  process(inputs) {
+    const channels = inputs[0];
+    if (!channels || channels.length === 0 || !this.target) return true;
+    const frames = channels[0].length;
+    for (let i = 0; i < frames; i++) {
+      let sum = 0;
+      for (let c = 0; c < channels.length; c++) sum += channels[c][i];
+      this.block[this.filled++] = sum / channels.length;
+      if (this.filled === this.block.length) {
+        this.target.postMessage(this.block, [this.block.buffer]);
+        this.block = new Float32Array(${captureBlockFrames});
+        this.filled = 0;
+      }
+    }
+    return true;
+  }
+}
+registerProcessor('upload-capture', UploadCaptureProcessor);
+`;
+
+const moduleContexts = new WeakSet();
+
+const loadCaptureModule = async (audioContext) => {
+  if (moduleContexts.has(audioContext)) return;
+  const url = URL.createObjectURL(new Blob([captureProcessorSource], { type: 'application/javascript' }));
+  try {
+    await audioContext.audioWorklet.addModule(url);
+  } finally {
+    URL.revokeObjectURL(url);
+  }
+  moduleContexts.add(audioContext);
+};
+
+// `send(message)` delivers a packed Uint8Array message to Python
+export const createAudioUploader = ({ rate, chunkMs, send }) => {
+  // Identifies this page load, so Python can tell a restarted numbering
+  // from resent chunks
+  const streamId = Math.floor(Math.random() * 0xffffffff) >>> 0;
+  const outbox = new Map();
+  // Chunks numbered below this were dropped unless already acknowledged
+  let droppedBefore = 0;
+  let micActive = false;
+  let captureNode = null;
+  let lastProgress = Date.now();
+
+  const worker = new Worker(new URL('./uploadWorker.js', import.meta.url));
+  worker.postMessage({ type: 'configure', rate, chunkMs });
+
+  const flushOutbox = () => {
+    const chunks = Array.from(outbox.values()).slice(0, maxChunksPerMessage);
+    chunks.forEach((chunk) => { chunk.sent = true; });
+    send(packMessage({ micActive, streamId, sampleRate: rate, chunks, droppedBefore }));
+  };
+
+  worker.onmessage = (event) => {
+    if (event.data.type === 'error') {
+      console.error('Audio upload encoding failed:', event.data.message);
+      return;
+    }
+    const { chunk } = event.data;
+    outbox.set(chunk.seq, chunk);
+    if (outbox.size > maxOutboxChunks) {
+      // The server has been unreachable for minutes; drop the oldest audio
+      // rather than grow without bound
+      const oldest = outbox.keys().next().value;
+      outbox.delete(oldest);
+      droppedBefore = oldest + 1;
+    }
+    flushOutbox();
+  };
+
+  const resendTimer = setInterval(() => {
+    if (outbox.size > 0 && Date.now() - lastProgress >= resendMs) {
+      lastProgress = Date.now();
+      flushOutbox();
+    }
+  }, resendMs);
+
+  // Tap interface used by the blob runtime
+  const connect = async (audioContext, source) => {
+    disconnect();
+    await loadCaptureModule(audioContext);
+    const channel = new MessageChannel();
+    captureNode = new AudioWorkletNode(audioContext, 'upload-capture', { numberOfOutputs: 0 });
+    captureNode.port.postMessage({ port: channel.port1 }, [channel.port1]);
+    worker.postMessage({ type: 'start', inputRate: audioContext.sampleRate, port: channel.port2 }, [channel.port2]);
+    source.connect(captureNode);
+    micActive = true;
+    flushOutbox();
+  };
+
+  const disconnect = () => {
+    if (!captureNode) return;
+    captureNode.disconnect();
+    captureNode.port.close();
+    captureNode = null;
+    worker.postMessage({ type: 'stop' });
+    micActive = false;
+    flushOutbox();
+  };
+
+  // Drop chunks Python has received, up to and including `seq`
+  const acknowledge = (ackStreamId, seq) => {
+    if (ackStreamId !== streamId) return;
+    let progressed = false;
+    Array.from(outbox.keys()).forEach((key) => {
+      if (key <= seq) {
+        outbox.delete(key);
+        progressed = true;
+      }
+    });
+    if (progressed) {
+      lastProgress = Date.now();
+      // Chunks already sent and still unacknowledged are left to the
+      // resend timer; only a backlog that never went out is sent here
+      if (Array.from(outbox.values()).some((chunk) => !chunk.sent)) flushOutbox();
+    }
+  };
+
+  const close = () => {
+    disconnect();
+    clearInterval(resendTimer);
+    worker.terminate();
+  };
+
+  return { connect, disconnect, acknowledge, close };
+};
@@ -0,0 +1,173 @@
+// --- Audio Upload Codec ---
+// Pure functions shared by the upload worker: streaming resampling to the
+// analysis rate, 16-bit quantization, lossless chunk encoding and the binary
+// message layout read by streamlit_audio_blob/upload.py.
+//
+// A chunk is encoded as the second difference of its samples (a fixed
+// order-2 predictor, as in FLAC), zigzag-mapped so small negative residuals
+// become small unsigned values, split into a low-byte plane followed by a
+// high-byte plane, and deflated. Each chunk starts from zero history, so
+// chunks decode independently and in any order.
+
+export const CODEC_PLANES = 0;
+export const CODEC_DEFLATE = 1;
+
+export const MESSAGE_MAGIC = 0x32554241; // "ABU2" little-endian
+export const MESSAGE_HEADER_BYTES = 24;
+export const CHUNK_HEADER_BYTES = 24;
+
+// Windowed-sinc resampler that keeps its state between blocks, so a stream
+// split into arbitrary blocks resamples exactly like one long block.
+export const createResampler = (inputRate, outputRate, { phases = 256, zeroCrossings = 8 } = {}) => {
+  const ratio = inputRate / outputRate;
+  // Cutoff in cycles per input sample, a little under the output Nyquist
+  const cutoff = 0.5 * Math.min(1, outputRate / inputRate) * 0.9;
+  const halfWidth = Math.ceil(zeroCrossings / (2 * cutoff));
+  const taps = 2 * halfWidth;
+
+  // table[phase * taps + k] weights input sample base - halfWidth + 1 + k
+  const table = new Float32Array((phases + 1) * taps);
+  for (let phase = 0; phase <= phases; phase++) {
+    const frac = phase / phases;
+    let sum = 0;
+    for (let k = 0; k < taps; k++) {
+      const t = k - halfWidth + 1 - frac;
+      const x = 2 * cutoff * t;
+      const sinc = x === 0 ? 1 : Math.sin(Math.PI * x) / (Math.PI * x);
+      const w = 0.42 + 0.5 * Math.cos(Math.PI * t / halfWidth) + 0.08 * Math.cos(2 * Math.PI * t / halfWidth);
+      const value = Math.abs(t) < halfWidth ? sinc * w : 0;
+      table[phase * taps + k] = value;
+      sum += value;
+    }
+    // Unity gain at DC for every phase
+    for (let k = 0; k < taps; k++) table[phase * taps + k] /= sum;
+  }
+
+  // Input not yet consumed, starting at absolute sample index bufferStart.
+  // Samples before the stream are zeros.
+  let buffer = new Float32Array(halfWidth);
+  let bufferStart = -halfWidth;
+  let outputIndex = 0;
+  let inputTotal = 0;
+
+  const process = (input) => {
+    inputTotal += input.length;
+    const joined = new Float32Array(buffer.length + input.length);
+    joined.set(buffer);
+    joined.set(input, buffer.length);
+    buffer = joined;
+    const bufferEnd = bufferStart + buffer.length;
+
+    const output = new Float32Array(Math.max(0, Math.ceil((bufferEnd - halfWidth) / ratio) - outputIndex + 1));
+    let count = 0;
+    for (;;) {
+      const position = outputIndex * ratio;
+      const base = Math.floor(position);
+      const phase = Math.round((position - base) * phases);
+      if (base + halfWidth >= bufferEnd) break;
+      const row = phase * taps;
+      const first = base - halfWidth + 1 - bufferStart;
+      let value = 0;
+      for (let k = 0; k < taps; k++) value += buffer[first + k] * table[row + k];
+      output[count++] = value;
+      outputIndex++;
+    }
+
+    // Keep what the next output still needs
+    const keepFrom = Math.floor(outputIndex * ratio) - halfWidth + 1;
+    if (keepFrom > bufferStart) {
+      buffer = buffer.slice(keepFrom - bufferStart);
+      bufferStart = keepFrom;
+    }
+    return output.subarray(0, count);
+  };
+
+  // Emit the outputs still waiting for look-ahead input at the end of a
+  // stream, then start over
+  const flush = () => {
+    const expected = Math.ceil(inputTotal / ratio);
+    const tail = process(new Float32Array(halfWidth + Math.ceil(ratio)));
+    const output = tail.subarray(0, Math.max(0, tail.length - (outputIndex - expected)));
+    buffer = new Float32Array(halfWidth);
+    bufferStart = -halfWidth;
+    outputIndex = 0;
+    inputTotal = 0;
+    return output;
+  };
+
+  return { process, flush, ratio };
+};
+
+// Float samples in [-1, 1] to 16-bit integers
+export const quantize = (samples, out = new Int16Array(samples.length)) => {
+  for (let i = 0; i < samples.length; i++) {
+    const value = Math.max(-1, Math.min(1, samples[i]));
+    out[i] = Math.round(value * 32767);
+  }
+  return out;
+};
+
+// Order-2 residuals as zigzag-coded byte planes
+export const residualPlanes = (samples) => {
+  const count = samples.length;
+  const planes = new Uint8Array(2 * count);
+  let previous = 0; let beforePrevious = 0;
+  for (let i = 0; i < count; i++) {
+    const sample = samples[i];
+    // Wrap to 16 bits; the decoder undoes this with wrapping sums
+    const residual = ((sample - 2 * previous + beforePrevious) << 16) >> 16;
+    const zigzag = ((residual << 1) ^ (residual >> 15)) & 0xffff;
+    planes[i] = zigzag & 0xff;
+    planes[count + i] = zigzag >> 8;
+    beforePrevious = previous;
+    previous = sample;
+  }
+  return planes;
+};
+
+const deflate = async (bytes) => {
+  const stream = new Blob([bytes]).stream().pipeThrough(new CompressionStream('deflate-raw'));
+  return new Uint8Array(await new Response(stream).arrayBuffer());
+};
+
+// Encode one chunk; falls back to uncompressed planes where the browser has
+// no CompressionStream
+export const encodeChunk = async (samples) => {
+  const planes = residualPlanes(samples);
+  if (typeof CompressionStream === 'undefined') {
+    return { codec: CODEC_PLANES, bytes: planes };
+  }
+  const compressed = await deflate(planes);
+  return compressed.length < planes.length
+    ? { codec: CODEC_DEFLATE, bytes: compressed }
+    : { codec: CODEC_PLANES, bytes: planes };
+};
+
+// Pack chunks ({ seq, start, count, codec, bytes }) into one message:
+//   header: magic u32, flags u32 (bit 0: mic active), stream u32,
+//           sample rate u32, chunk count u32, dropped before u32
+//   chunk:  seq u32, count u32, start f64, codec u32, byte length u32, bytes
+// Chunks numbered below `droppedBefore` that are not in this message were
+// dropped by the sender and will never be sent.
+export const packMessage = ({ micActive, streamId, sampleRate, chunks, droppedBefore = 0 }) => {
+  const size = chunks.reduce((total, chunk) => total + CHUNK_HEADER_BYTES + chunk.bytes.length, MESSAGE_HEADER_BYTES);
+  const message = new Uint8Array(size);
+  const view = new DataView(message.buffer);
+  view.setUint32(0, MESSAGE_MAGIC, true);
+  view.setUint32(4, micActive ? 1 : 0, true);
+  view.setUint32(8, streamId, true);
+  view.setUint32(12, sampleRate, true);
+  view.setUint32(16, chunks.length, true);
+  view.setUint32(20, droppedBefore, true);
+  let offset = MESSAGE_HEADER_BYTES;
+  chunks.forEach((chunk) => {
+    view.setUint32(offset, chunk.seq, true);
+    view.setUint32(offset + 4, chunk.count, true);
+    view.setFloat64(offset + 8, chunk.start, true);
+    view.setUint32(offset + 16, chunk.codec, true);
+    view.setUint32(offset + 20, chunk.bytes.length, true);
+    message.set(chunk.bytes, offset + CHUNK_HEADER_BYTES);
+    offset += CHUNK_HEADER_BYTES + chunk.bytes.length;
+  });
+  return message;
+};
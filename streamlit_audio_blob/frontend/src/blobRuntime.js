@@ -0,0 +1,468 @@
+// --- Shared Blob Runtime ---
+// A single page-level runtime drives every blob canvas on the page: one
+// microphone graph, one audio feature computation per tick, and one
+// requestAnimationFrame loop. Sketches register a view and read
+// `runtime.features` while drawing, so cost scales with canvases drawn
+// rather than with duplicated audio pipelines.
+
+// Convert a per-frame lerp factor tuned at 60 fps into the factor for a frame
+// of length timeDelta (in 60 fps frames), so easing is frame-rate independent
+export const frameLerp = (factor, timeDelta) => 1 - Math.pow(1 - factor, timeDelta);
+
+const lerp = (start, stop, amount) => start + (stop - start) * amount;
+
+const mapClamped = (value, inMin, inMax, outMin, outMax) => {
+  const mapped = outMin + (value - inMin) * (outMax - outMin) / (inMax - inMin);
+  return outMin < outMax ? Math.min(outMax, Math.max(outMin, mapped)) : Math.min(outMin, Math.max(outMax, mapped));
+};
+
+const createBlobRuntime = () => {
+  // --- Audio Analysis Setup ---
+  let audioContext; let analyser; let microphone; let micStream; let frequencyData;
+  let audioReady = false; let sampleRate = 44100;
+  const fftSize = 512;
+  let nyquist = sampleRate / 2;
+  let isActive = false;
+
+  // --- Audio Reactivity Parameters ---
+  const audioLerpFactor = 0.1;
+  const freqSpreadLerpFactor = 0.03;
+  const binActivationThreshold = 10;
+  const pitchProxyLerpFactor = 0.06;
+  let lastPitchProxy = 0.5;
+  const pitchChangeLerpFactor = 0.05;
+  const pitchMinFreq = 80; const pitchMaxFreq = 500;
+  let pitchMinIndex, pitchMaxIndex;
+  let midHistory = []; const midHistoryLength = 30;
+
+  // --- Volume Dynamics (Aha! detection) ---
+  let volumeHistory = []; const volumeHistoryLength = 60;
+  const ahaThresholdMultiplier = 1.4;
+  const ahaMinimumLevel = 0.30;
+  let ahaTimer = 0; const ahaDuration = 15;
+
+  // Smoothed features, computed once per tick and shared by every view.
+  // `ahaCount` increments on each detected "Aha!" so views can react once.
+  const features = {
+    overallLevel: 0,
+    midLevel: 0,
+    trebleLevel: 0,
+    frequencySpread: 0,
+    pitchProxy: 0.5,
+    pitchChangeRate: 0,
+    averageVolume: 0,
+    sustainedMidLevel: 0,
+    ahaCount: 0,
+  };
+
+  // --- Power Policy ---
+  // Full frame rate while the mic is live, a reduced rate once every idle view
+  // has settled, and no rendering at all while the page is hidden or every
+  // view is off-screen.
+  const activeFrameRate = 60; const idleFrameRate = 15;
+  const idleSettleMs = 1500; const idleLevelEpsilon = 0.001;
+  let targetFrameRate = activeFrameRate;
+  let idleSince = null;
+
+  // --- Views & Animation Loop ---
+  // A view is { element, isOnScreen, render(now), isSettled(), onActiveChange(active) }
+  const views = new Set();
+  let frameHandle = null;
+  let lastFrameTime = null;
+  let visibilityObserver = null;
+
+  // --- Audio Taps ---
+  // A tap is { connect(audioContext, source), disconnect() } and receives the
+  // microphone source node while the mic is live (e.g. the audio upload)
+  const taps = new Set();
+
+  const connectTap = async (tap) => {
+    try {
+      await tap.connect(audioContext, microphone);
+    } catch (err) {
+      console.error("Error connecting audio tap:", err);
+    }
+  };
+
+  const updatePitchRange = () => {
+    nyquist = sampleRate / 2;
+    const binWidth = nyquist / (fftSize / 2);
+    pitchMinIndex = Math.max(1, Math.floor(pitchMinFreq / binWidth));
+    pitchMaxIndex = Math.min(fftSize / 2 - 1, Math.ceil(pitchMaxFreq / binWidth));
+  };
+
+  const resetHistories = () => {
+    volumeHistory = new Array(volumeHistoryLength).fill(0);
+    midHistory = new Array(midHistoryLength).fill(0);
+  };
+
+  updatePitchRange();
+  resetHistories();
+
+  // --- Audio Setup Function ---
+  const setupAudio = async () => {
+    if (audioContext && audioContext.state === 'running') {
+      if (!micStream || !micStream.active) {
+        try {
+          micStream = await navigator.mediaDevices.getUserMedia({
+            audio: {
+              echoCancellation: true,
+              noiseSuppression: true
+            }
+          });
+          if (microphone) microphone.disconnect();
+          microphone = audioContext.createMediaStreamSource(micStream);
+          microphone.connect(analyser);
+          console.log("Reconnected mic stream.");
+        } catch (err) {
+          console.error("Error reconnecting mic:", err);
+          audioReady = false;
+          return false;
+        }
+      }
+      audioReady = true;
+      console.log("Audio already running or reconnected.");
+      return true;
+    }
+
+    if (audioContext && audioContext.state !== 'closed') {
+      console.log("Closing existing audio context before creating new one.");
+      await audioContext.close().catch(e => console.error("Error closing previous context:", e));
+      audioContext = null;
+    }
+
+    try {
+      audioContext = new (window.AudioContext || window.webkitAudioContext)();
+      sampleRate = audioContext.sampleRate;
+      updatePitchRange();
+
+      if (audioContext.state === 'suspended') {
+        await audioContext.resume();
+      }
+
+      micStream = await navigator.mediaDevices.getUserMedia({
+        audio: {
+          echoCancellation: true,
+          noiseSuppression: true
+        }
+      });
+
+      microphone = audioContext.createMediaStreamSource(micStream);
+      analyser = audioContext.createAnalyser();
+      analyser.fftSize = fftSize;
+      analyser.smoothingTimeConstant = 0.75;
+      frequencyData = new Uint8Array(analyser.frequencyBinCount);
+      microphone.connect(analyser);
+
+      console.log('Audio setup successful. Context state:', audioContext.state);
+      audioReady = true;
+      return true;
+    } catch (err) {
+      console.error('Audio Setup Error:', err);
+      audioReady = false;
+
+      if (micStream) micStream.getTracks().forEach(track => track.stop());
+      micStream = null;
+      microphone = null;
+      analyser = null;
+      frequencyData = null;
+
+      if (audioContext && audioContext.state !== 'closed') {
+        await audioContext.close().catch(e => console.error("Error closing context on failure:", e));
+      }
+
+      audioContext = null;
+      return false;
+    }
+  };
+
+  // --- Stop Audio Processing ---
+  const stopAudioProcessing = () => {
+    console.log("Stopping audio processing and mic tracks.");
+
+    taps.forEach(tap => tap.disconnect());
+
+    if (micStream) {
+      micStream.getTracks().forEach(track => track.stop());
+      micStream = null;
+    }
+
+    if (microphone) {
+      microphone.disconnect();
+      microphone = null;
+    }
+
+    audioReady = false;
+
+    const stopLerpFactor = audioLerpFactor * 4;
+    features.overallLevel = lerp(features.overallLevel, 0, stopLerpFactor);
+    features.midLevel = lerp(features.midLevel, 0, stopLerpFactor);
+    features.trebleLevel = lerp(features.trebleLevel, 0, stopLerpFactor);
+    features.frequencySpread = lerp(features.frequencySpread, 0, stopLerpFactor);
+
+    resetHistories();
+    features.averageVolume = 0;
+    features.sustainedMidLevel = 0;
+    features.pitchProxy = 0.5;
+    lastPitchProxy = 0.5;
+    features.pitchChangeRate = 0;
+  };
+
+  const pushHistory = (history, value, maxLength) => {
+    history.push(value);
+    if (history.length > maxLength) history.shift();
+    return history.reduce((a, b) => a + b, 0) / history.length;
+  };
+
+  // --- Update Audio Analysis ---
+  // Runs once per tick regardless of how many views are drawn
+  const updateFeatures = (timeDelta) => {
+    lastPitchProxy = features.pitchProxy;
+    if (ahaTimer > 0) ahaTimer = Math.max(0, ahaTimer - timeDelta);
+
+    if (!isActive || !audioReady || !analyser || !frequencyData) {
+      const idleLerp = frameLerp(audioLerpFactor * 0.3, timeDelta);
+      features.overallLevel = lerp(features.overallLevel, 0, idleLerp);
+      features.midLevel = lerp(features.midLevel, 0, idleLerp);
+      features.trebleLevel = lerp(features.trebleLevel, 0, idleLerp);
+      features.frequencySpread = lerp(features.frequencySpread, 0, frameLerp(freqSpreadLerpFactor, timeDelta));
+
+      features.averageVolume = pushHistory(volumeHistory, 0, volumeHistoryLength);
+      features.sustainedMidLevel = pushHistory(midHistory, 0, midHistoryLength);
+
+      features.pitchProxy = lerp(features.pitchProxy, 0.5, frameLerp(pitchProxyLerpFactor, timeDelta));
+      features.pitchChangeRate = lerp(features.pitchChangeRate, 0, frameLerp(pitchChangeLerpFactor, timeDelta));
+      return;
+    }
+
+    analyser.getByteFrequencyData(frequencyData);
+
+    let oSum = 0, mSum = 0, tSum = 0, activeBinCount = 0;
+    const fbc = frequencyData.length;
+    const midEndFreq = 4000, trebleStartFreq = 4000;
+    const midEndIndex = Math.min(fbc-1, Math.ceil(midEndFreq/(nyquist/fbc)));
+    const trebleStartIndex = Math.min(fbc-1, Math.floor(trebleStartFreq/(nyquist/fbc)));
+
+    let maxAmp = 0;
+    let peakIndex = -1;
+
+    for (let i = pitchMinIndex; i <= pitchMaxIndex; i++) {
+      if (frequencyData[i] > maxAmp) {
+        maxAmp = frequencyData[i];
+        peakIndex = i;
+      }
+    }
+
+    let targetPitchProxy = 0.5;
+    if (peakIndex !== -1 && maxAmp > binActivationThreshold * 1.5) {
+      targetPitchProxy = mapClamped(peakIndex, pitchMinIndex, pitchMaxIndex, 0, 1);
+    }
+    features.pitchProxy = lerp(features.pitchProxy, targetPitchProxy, frameLerp(pitchProxyLerpFactor, timeDelta));
+
+    for(let i = 0; i < fbc; i++) {
+      let l = frequencyData[i];
+      oSum += l;
+
+      if(i <= midEndIndex) mSum += l;
+      else if(i >= trebleStartIndex) tSum += l;
+
+      if(l > binActivationThreshold) activeBinCount++;
+    }
+
+    let nO = fbc > 0 ? oSum / fbc : 0;
+    let numMidBins = midEndIndex + 1;
+    let numTrebleBins = fbc - trebleStartIndex;
+    let nM = numMidBins > 0 ? mSum / numMidBins : 0;
+    let nT = numTrebleBins > 0 ? tSum / numTrebleBins : 0;
+
+    let normO = mapClamped(nO, 0, 160, 0, 1);
+    let normM = mapClamped(nM, 0, 160, 0, 1);
+    let normT = mapClamped(nT, 0, 160, 0, 1);
+
+    const levelLerp = frameLerp(audioLerpFactor, timeDelta);
+    features.overallLevel = lerp(features.overallLevel, normO, levelLerp);
+    features.midLevel = lerp(features.midLevel, normM, levelLerp);
+    features.trebleLevel = lerp(features.trebleLevel, normT, levelLerp);
+
+    let targetSpread = fbc > 0 ? activeBinCount / fbc : 0;
+    features.frequencySpread = lerp(features.frequencySpread, targetSpread, frameLerp(freqSpreadLerpFactor, timeDelta));
+
+    features.averageVolume = pushHistory(volumeHistory, features.overallLevel, volumeHistoryLength);
+    features.sustainedMidLevel = pushHistory(midHistory, features.midLevel, midHistoryLength);
+
+    let currentPitchChange = Math.abs(features.pitchProxy - lastPitchProxy);
+    features.pitchChangeRate = lerp(features.pitchChangeRate, currentPitchChange, frameLerp(pitchChangeLerpFactor, timeDelta));
+
+    if (ahaTimer <= 0 && features.overallLevel > ahaMinimumLevel &&
+        features.averageVolume > 0.01 && features.overallLevel > features.averageVolume * ahaThresholdMultiplier) {
+      ahaTimer = ahaDuration;
+      features.ahaCount++;
+      console.log("Aha! Detected");
+    }
+  };
+
+  // --- Power Policy Helpers ---
+  const hasVisibleViews = () => {
+    for (const view of views) {
+      if (view.isOnScreen) return true;
+    }
+    return false;
+  };
+
+  const updatePowerState = (now) => {
+    let settled = !isActive &&
+      features.overallLevel < idleLevelEpsilon && features.midLevel < idleLevelEpsilon &&
+      features.trebleLevel < idleLevelEpsilon && features.frequencySpread < idleLevelEpsilon;
+    views.forEach(view => { settled = settled && view.isSettled(); });
+
+    if (!settled) {
+      idleSince = null;
+    } else if (idleSince === null) {
+      idleSince = now;
+    }
+
+    const isIdle = idleSince !== null && now - idleSince >= idleSettleMs;
+    targetFrameRate = isIdle ? idleFrameRate : activeFrameRate;
+  };
+
+  const tick = (now) => {
+    frameHandle = null;
+    // Visibility and intersection changes restart the loop
+    if (document.hidden || !hasVisibleViews()) {
+      lastFrameTime = null;
+      return;
+    }
+    frameHandle = requestAnimationFrame(tick);
+
+    // Throttle to the current target frame rate (1 ms slack for rAF jitter)
+    if (lastFrameTime !== null && now - lastFrameTime < 1000 / targetFrameRate - 1) return;
+    // Clamp so the first frame after a pause does not jump the animation
+    const timeDelta = lastFrameTime === null ? 1 : Math.min((now - lastFrameTime) / (1000 / 60), 8);
+    lastFrameTime = now;
+
+    updateFeatures(timeDelta);
+    views.forEach(view => {
+      if (view.isOnScreen) view.render(now);
+    });
+    updatePowerState(now);
+  };
+
+  const startLoop = () => {
+    if (frameHandle === null && views.size > 0) {
+      frameHandle = requestAnimationFrame(tick);
+    }
+  };
+
+  const stopLoop = () => {
+    if (frameHandle !== null) {
+      cancelAnimationFrame(frameHandle);
+      frameHandle = null;
+    }
+    lastFrameTime = null;
+  };
+
+  // Return to full frame rate immediately (audio started or view shown)
+  const wake = () => {
+    idleSince = null;
+    targetFrameRate = activeFrameRate;
+    startLoop();
+  };
+
+  const handleVisibilityChange = () => {
+    if (document.hidden) {
+      stopLoop();
+    } else {
+      wake();
+    }
+  };
+
+  // --- Public API ---
+  const register = (view) => {
+    view.isOnScreen = true;
+    if (views.size === 0) {
+      document.addEventListener('visibilitychange', handleVisibilityChange);
+      if (window.IntersectionObserver) {
+        visibilityObserver = new IntersectionObserver((entries) => {
+          entries.forEach(entry => {
+            views.forEach(v => {
+              if (v.element === entry.target) v.isOnScreen = entry.isIntersecting;
+            });
+          });
+          if (hasVisibleViews()) wake();
+        });
+      }
+    }
+    views.add(view);
+    if (visibilityObserver) visibilityObserver.observe(view.element);
+    wake();
+  };
+
+  const unregister = (view) => {
+    if (!views.delete(view)) return;
+    if (visibilityObserver) visibilityObserver.unobserve(view.element);
+    if (views.size > 0) return;
+
+    // Last view gone: release the loop and the microphone graph
+    stopLoop();
+    document.removeEventListener('visibilitychange', handleVisibilityChange);
+    if (visibilityObserver) {
+      visibilityObserver.disconnect();
+      visibilityObserver = null;
+    }
+    isActive = false;
+    stopAudioProcessing();
+    if (audioContext && audioContext.state !== 'closed') {
+      audioContext.close()
+        .then(() => console.log("AudioContext closed."))
+        .catch(e => console.error("Error closing context on cleanup:", e));
+    }
+    audioContext = null;
+    analyser = null;
+    frequencyData = null;
+  };
+
+  const activate = async () => {
+    console.log("Runtime: Received activation request.");
+    const success = await setupAudio();
+    isActive = success;
+    if (success) await Promise.all(Array.from(taps, connectTap));
+    views.forEach(view => view.onActiveChange(success));
+    if (success) wake();
+    return success;
+  };
+
+  const deactivate = () => {
+    console.log("Runtime: Received deactivation request.");
+    isActive = false;
+    views.forEach(view => view.onActiveChange(false));
+    stopAudioProcessing();
+  };
+
+  const addAudioTap = (tap) => {
+    taps.add(tap);
+    if (isActive && audioReady) connectTap(tap);
+  };
+
+  const removeAudioTap = (tap) => {
+    if (taps.delete(tap)) tap.disconnect();
+  };
+
+  return {
+    features,
+    register,
+    unregister,
+    activate,
+    deactivate,
+    addAudioTap,
+    removeAudioTap,
+    isActive: () => isActive,
+  };
+};
+
+let sharedRuntime = null;
+
+// Return the page-level runtime, creating it on first use
+export const getBlobRuntime = () => {
+  if (!sharedRuntime) sharedRuntime = createBlobRuntime();
+  return sharedRuntime;
+};
@@ -2,6 +2,22 @@ import React from 'react';
 import ReactDOM from 'react-dom/client';
 import StreamlitAudioReactiveBlob from './StreamlitAudioReactiveBlob';
 
+// Warn when the first contentful paint misses the budget set at build time
+const firstPaintBudgetMs = Number(process.env.REACT_APP_FIRST_PAINT_BUDGET_MS || 0);
+if (firstPaintBudgetMs > 0 && window.PerformanceObserver) {
+  const paintObserver = new PerformanceObserver((list) => {
+    list.getEntries()
+      .filter(entry => entry.name === 'first-contentful-paint')
+      .forEach(entry => {
+        const status = entry.startTime <= firstPaintBudgetMs ? 'within' : 'OVER';
+        const log = entry.startTime <= firstPaintBudgetMs ? console.log : console.warn;
+        log(`First contentful paint ${entry.startTime.toFixed(0)} ms (${status} budget of ${firstPaintBudgetMs} ms)`);
+        paintObserver.disconnect();
+      });
+  });
+  paintObserver.observe({ type: 'paint', buffered: true });
+}
+
 const root = ReactDOM.createRoot(document.getElementById('root'));
 root.render(
   <React.StrictMode>
@@ -0,0 +1,68 @@
+import { createTheme } from '@mui/material';
+import { blue, grey } from '@mui/material/colors';
+
+// --- Material-UI Theme for the Lazy Panels ---
+// Only the settings and help panels use MUI; the always-visible shell is
+// plain DOM styled by AudioReactiveBlob.css with the same colors.
+const panelTheme = createTheme({
+  palette: { 
+    mode: 'light', 
+    primary: blue,
+    background: { 
+      default: '#f8f8f8', 
+      paper: '#ffffff', 
+    }, 
+    text: { 
+      primary: grey[900], 
+      secondary: grey[700], 
+    }, 
+    error: { 
+      main: '#d32f2f', 
+    },
+  },
+  typography: {
+    // Larger font sizes for better readability
+    fontSize: 16,
+    h5: {
+      fontWeight: 600,
+      fontSize: '1.5rem',
+    },
+    body1: {
+      fontSize: '1.1rem',
+    },
+  },
+  components: { 
+    MuiPaper: { 
+      styleOverrides: { 
+        root: { 
+          borderRadius: '16px', 
+          boxShadow: '0 4px 12px rgba(0,0,0,0.08)', 
+          border: `1px solid ${grey[200]}`, 
+          position: 'relative', 
+          overflow: 'hidden',
+        } 
+      } 
+    },
+    MuiSlider: {
+      styleOverrides: {
+        root: {
+          height: 8,
+        },
+        thumb: {
+          height: 24,
+          width: 24,
+        },
+        track: {
+          height: 8,
+          borderRadius: 4,
+        },
+        rail: {
+          height: 8,
+          borderRadius: 4,
+        },
+      }
+    },
+  },
+});
+
+export default panelTheme;
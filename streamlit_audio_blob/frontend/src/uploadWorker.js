@@ -0,0 +1,67 @@
+/* eslint-disable no-restricted-globals */
+// --- Audio Upload Worker ---
+// Receives raw microphone blocks straight from the capture worklet over a
+// MessagePort, resamples and quantizes them, and posts encoded chunks of
+// `chunkMs` back to the page. Sequence numbers and sample positions run on
+// across microphone restarts, so the server can place every chunk.
+import { createResampler, encodeChunk, quantize } from './audioUploadCodec';
+
+let outputRate = 16000;
+let chunkSamples = 16000;
+let resampler = null;
+let capturePort = null;
+let pending = new Int16Array(chunkSamples);
+let pendingCount = 0;
+let seq = 0;
+let position = 0;
+// Encoding is asynchronous; chaining keeps chunks in order
+let encoding = Promise.resolve();
+
+const emit = () => {
+  if (pendingCount === 0) return;
+  const samples = pending.slice(0, pendingCount);
+  const chunk = { seq, start: position, count: pendingCount };
+  seq += 1;
+  position += pendingCount;
+  pendingCount = 0;
+  encoding = encoding
+    .then(() => encodeChunk(samples))
+    .then(({ codec, bytes }) => {
+      self.postMessage({ type: 'chunk', chunk: { ...chunk, codec, bytes } }, [bytes.buffer]);
+    })
+    .catch((error) => self.postMessage({ type: 'error', message: String(error) }));
+};
+
+const append = (samples) => {
+  const quantized = quantize(samples);
+  let offset = 0;
+  while (offset < quantized.length) {
+    const take = Math.min(chunkSamples - pendingCount, quantized.length - offset);
+    pending.set(quantized.subarray(offset, offset + take), pendingCount);
+    pendingCount += take;
+    offset += take;
+    if (pendingCount === chunkSamples) emit();
+  }
+};
+
+self.onmessage = (event) => {
+  const message = event.data;
+  if (message.type === 'configure') {
+    outputRate = message.rate;
+    chunkSamples = Math.max(1, Math.round(outputRate * message.chunkMs / 1000));
+    pending = new Int16Array(chunkSamples);
+    pendingCount = 0;
+  } else if (message.type === 'start') {
+    resampler = createResampler(message.inputRate, outputRate);
+    capturePort = message.port;
+    capturePort.onmessage = (blockEvent) => {
+      if (resampler) append(resampler.process(blockEvent.data));
+    };
+  } else if (message.type === 'stop') {
+    if (capturePort) capturePort.close();
+    capturePort = null;
+    if (resampler) append(resampler.flush());
+    resampler = null;
+    emit();
+  }
+};
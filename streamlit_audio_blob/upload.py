@@ -0,0 +1,169 @@
+"""Receiver for the component's compressed audio upload.
+
+With ``upload=`` set, the frontend resamples the microphone to
+``sample_rate``, quantizes it to 16 bits and losslessly compresses
+sequence-numbered chunks in a Web Worker (see
+``frontend/src/audioUploadCodec.js`` for the encoding). Chunks stay in the
+browser's outbox until Python acknowledges them through the component
+arguments, so after a dropped connection only unacknowledged chunks are
+sent again. If the outbox overflows during a long outage, the browser drops
+its oldest chunks and reports where the dropped range ends; the receiver
+acknowledges past it, leaves silence in its place and counts the chunks in
+``dropped_chunks``.
+"""
+
+import struct
+import zlib
+
+import numpy as np
+
+MESSAGE_MAGIC = 0x32554241
+_MESSAGE_HEADER = struct.Struct("<6I")
+_CHUNK_HEADER = struct.Struct("<2Id2I")
+
+CODEC_PLANES = 0
+CODEC_DEFLATE = 1
+
+
+class AudioUploadReceiver:
+    """Decodes uploaded chunks into a preallocated int16 buffer.
+
+    Parameters
+    ----------
+    sample_rate: int
+        Rate the browser resamples to before upload.
+    chunk_ms: int
+        Duration of one uploaded chunk.
+    capacity_s: float
+        Seconds of audio to preallocate. The buffer doubles when a session
+        runs longer.
+    max_gap_s: float
+        How far past the audio received so far a chunk may start, e.g.
+        after an outage. Chunks further ahead are rejected rather than
+        grow the buffer to match.
+    """
+
+    def __init__(self, sample_rate=16000, chunk_ms=1000, capacity_s=600, max_gap_s=1800):
+        self.sample_rate = int(sample_rate)
+        self.chunk_ms = int(chunk_ms)
+        # Same rounding as the upload worker
+        self.chunk_samples = max(1, round(self.sample_rate * self.chunk_ms / 1000))
+        self.max_gap_s = max_gap_s
+        self._buffer = np.zeros(int(capacity_s * self.sample_rate), dtype=np.int16)
+        self.length = 0
+        self.stream_id = None
+        self.acked_seq = -1
+        self.mic_active = False
+        self._offset = 0
+        self._received = set()
+        self.chunks_received = 0
+        self.duplicate_chunks = 0
+        self.dropped_chunks = 0
+        self.bytes_received = 0
+
+    def _reserve(self, end):
+        if end <= len(self._buffer):
+            return
+        grown = np.zeros(max(end, 2 * len(self._buffer)), dtype=np.int16)
+        grown[:self.length] = self._buffer[:self.length]
+        self._buffer = grown
+
+    def receive(self, message):
+        """Decode a component message and return whether the microphone is on.
+
+        Chunks already received are skipped without decompressing them, so
+        feeding the same message again (Streamlit repeats the last component
+        value on every rerun) is cheap.
+        """
+        message = memoryview(message)
+        (magic, flags, stream_id, sample_rate, chunk_count,
+         dropped_before) = _MESSAGE_HEADER.unpack_from(message, 0)
+        if magic != MESSAGE_MAGIC:
+            raise ValueError("Not an audio upload message")
+        if sample_rate != self.sample_rate:
+            raise ValueError("Upload is at %d Hz, receiver expects %d Hz" % (sample_rate, self.sample_rate))
+        self.mic_active = bool(flags & 1)
+
+        if stream_id != self.stream_id:
+            # A new page load numbers its chunks from zero; append its audio
+            # after what is already here
+            self.stream_id = stream_id
+            self._offset = self.length
+            self._received = set()
+            self.acked_seq = -1
+
+        offset = _MESSAGE_HEADER.size
+        for _ in range(chunk_count):
+            seq, count, start, codec, byte_length = _CHUNK_HEADER.unpack_from(message, offset)
+            payload = message[offset + _CHUNK_HEADER.size:offset + _CHUNK_HEADER.size + byte_length]
+            offset += _CHUNK_HEADER.size + byte_length
+            if seq in self._received or seq <= self.acked_seq:
+                self.duplicate_chunks += 1
+                continue
+            self._check_chunk(seq, start, count)
+            self._decode_into(int(start) + self._offset, count, codec, payload)
+            self._received.add(seq)
+            self.chunks_received += 1
+            self.bytes_received += byte_length
+
+        if dropped_before > self.acked_seq + 1:
+            # Whatever in the dropped range has not arrived by now never will
+            arrived = {seq for seq in self._received if seq < dropped_before}
+            self.dropped_chunks += dropped_before - (self.acked_seq + 1) - len(arrived)
+            self._received -= arrived
+            self.acked_seq = dropped_before - 1
+        while self.acked_seq + 1 in self._received:
+            self.acked_seq += 1
+            self._received.discard(self.acked_seq)
+        return self.mic_active
+
+    def _check_chunk(self, seq, start, count):
+        # Positions come from the client; bound them before allocating
+        limit = self.length - self._offset + int(self.max_gap_s * self.sample_rate)
+        if not 0 <= start <= limit - count or start != int(start) or count > self.chunk_samples:
+            raise ValueError("Chunk %d of %d samples at sample %r is out of range" % (seq, count, start))
+
+    def _decode_into(self, start, count, codec, payload):
+        if codec == CODEC_DEFLATE:
+            planes = zlib.decompress(payload, wbits=-15)
+        elif codec == CODEC_PLANES:
+            planes = payload
+        else:
+            raise ValueError("Unknown chunk codec %d" % codec)
+        planes = np.frombuffer(planes, dtype=np.uint8)
+        if len(planes) != 2 * count:
+            raise ValueError("Chunk holds %d bytes, expected %d" % (len(planes), 2 * count))
+
+        self._reserve(start + count)
+        # Undo zigzag and the order-2 predictor in place in the target
+        # slice; all arithmetic wraps at 16 bits like the encoder's
+        out = self._buffer[start:start + count].view(np.uint16)
+        np.left_shift(planes[count:], 8, out=out, dtype=np.uint16)
+        out |= planes[:count]
+        sign = np.negative(out & 1, dtype=np.uint16)
+        out >>= 1
+        out ^= sign
+        np.cumsum(out, dtype=np.uint16, out=out)
+        np.cumsum(out, dtype=np.uint16, out=out)
+        self.length = max(self.length, start + count)
+
+    def pending_gap_chunks(self):
+        """Number of chunks received beyond a gap that is not yet filled."""
+        return len(self._received)
+
+    def samples(self):
+        """Return the received audio as an int16 view (not a copy)."""
+        return self._buffer[:self.length]
+
+    def float_samples(self):
+        """Return the received audio as float32 in [-1, 1]."""
+        return self.samples().astype(np.float32) / 32768.0
+
+    def ack_args(self):
+        """Return the component arguments that configure the upload and acknowledge chunks."""
+        return {
+            "rate": self.sample_rate,
+            "chunkMs": self.chunk_ms,
+            "stream": self.stream_id,
+            "ack": self.acked_seq,
+        }
@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+
+from screening.archive import DAY_S, SessionArchive, _try_lock_file, _unlock_file
+from screening.cohort_index import STREAM_NAMES
+
+NOW = 1_700_000_000.0
+
+
+def features(duration_s=120.0, rate_hz=20, seed=0):
+    rng = np.random.default_rng(seed)
+    times = np.arange(0.0, duration_s, 1.0 / rate_hz)
+    result = {"time": times}
+    for stream in STREAM_NAMES:
+        result[stream] = rng.random(len(times))
+    return result
+
+
+def test_old_sessions_move_down_the_tiers(tmp_path):
+    with SessionArchive(str(tmp_path)) as archive:
+        archive.write_session("new", features(), recorded_at=NOW - DAY_S,
+                              pcm=np.zeros(16000), sample_rate=16000)
+        archive.write_session("old", features(), recorded_at=NOW - 365 * DAY_S,
+                              pcm=np.zeros(16000), sample_rate=16000)
+        archive.compact(now=NOW)
+
+        assert archive.read("new")["tier"] == "raw"
+        assert archive.read_pcm("new") is not None
+        old = archive.read("old")
+        assert old["tier"] == "10s"
+        assert len(old["time"]) == 12
+        assert archive.read_pcm("old") is None
+
+
+def test_max_bytes_compacts_oldest_sessions_first(tmp_path):
+    with SessionArchive(str(tmp_path)) as archive:
+        for index in range(3):
+            archive.write_session("s%d" % index, features(seed=index),
+                                  recorded_at=NOW - (3 - index) * 3600)
+        session_size = archive.session_bytes("s0")
+        archive.retention["max_bytes"] = int(2.5 * session_size)
+        result = archive.compact(now=NOW)
+
+        assert result["bytes_before"] > archive.retention["max_bytes"]
+        assert result["bytes_after"] <= archive.retention["max_bytes"]
+        assert result["bytes_after"] == archive.stats()["bytes"]
+        assert archive.read("s0")["tier"] != "raw"
+        assert archive.read("s1")["tier"] == "raw"
+        assert archive.read("s2")["tier"] == "raw"
+
+
+def test_compaction_is_skipped_while_another_process_holds_the_lock(tmp_path):
+    with SessionArchive(str(tmp_path)) as archive:
+        archive.write_session("old", features(), recorded_at=NOW - 365 * DAY_S)
+        lock = _try_lock_file(os.path.join(archive.directory, "compaction.lock"))
+        try:
+            assert archive.compact(now=NOW) is None
+        finally:
+            _unlock_file(lock)
+        assert archive.read("old")["tier"] == "raw"
+        assert archive.compact(now=NOW) is not None
+        assert archive.read("old")["tier"] == "10s"
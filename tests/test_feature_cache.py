@@ -0,0 +1,81 @@
+import os
+import wave
+
+import numpy as np
+import pytest
+
+from screening import features as features_module
+from screening.feature_cache import FeatureCache
+from screening.features import analyze_file
+
+
+def write_wav(path, seconds=1.0, rate=16000, frequency=220.0):
+    t = np.arange(int(seconds * rate)) / rate
+    samples = (0.3 * np.sin(2 * np.pi * frequency * t) * 32767).astype("<i2")
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.tobytes())
+
+
+@pytest.fixture
+def spectra_calls(monkeypatch):
+    calls = []
+    compute_spectra = features_module.compute_spectra
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return compute_spectra(*args, **kwargs)
+
+    monkeypatch.setattr(features_module, "compute_spectra", counting)
+    return calls
+
+
+def test_cache_hit_matches_uncached_analysis(tmp_path, spectra_calls):
+    recording = tmp_path / "a.wav"
+    write_wav(recording)
+    uncached = analyze_file(str(recording))
+    with FeatureCache(str(tmp_path / "cache")) as cache:
+        first = analyze_file(str(recording), cache=cache)
+        second = analyze_file(str(recording), cache=cache)
+    assert len(spectra_calls) == 2
+    for name in features_module.FEATURE_NAMES + ("time",):
+        np.testing.assert_array_equal(first[name], uncached[name])
+        np.testing.assert_array_equal(second[name], uncached[name])
+
+
+def test_late_stage_parameters_reuse_earlier_stages(tmp_path, spectra_calls):
+    recording = tmp_path / "a.wav"
+    write_wav(recording)
+    with FeatureCache(str(tmp_path / "cache")) as cache:
+        base = analyze_file(str(recording), cache=cache)
+        smoother = analyze_file(str(recording), params={"level_lerp": 0.5}, cache=cache)
+    assert len(spectra_calls) == 1
+    assert not np.array_equal(base["overallLevel"], smoother["overallLevel"])
+
+
+def test_changed_recording_invalidates_entries(tmp_path, spectra_calls):
+    recording = tmp_path / "a.wav"
+    write_wav(recording)
+    with FeatureCache(str(tmp_path / "cache")) as cache:
+        before = analyze_file(str(recording), cache=cache)
+        write_wav(recording, frequency=880.0)
+        # A rewrite within the same mtime tick must still change the hash
+        stat = os.stat(recording)
+        os.utime(recording, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        after = analyze_file(str(recording), cache=cache)
+    assert len(spectra_calls) == 2
+    assert not np.array_equal(before["pitchProxy"], after["pitchProxy"])
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    entry = {"values": np.zeros(1000)}
+    with FeatureCache(str(tmp_path / "cache"), max_bytes=20000) as cache:
+        cache.put("a" * 64, entry)
+        cache.put("b" * 64, entry)
+        assert cache.get("a" * 64) is not None
+        cache.put("c" * 64, entry)
+        assert cache.get("b" * 64) is None
+        assert cache.get("a" * 64) is not None
+        assert cache.stats()["entries"] == 2
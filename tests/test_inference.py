@@ -0,0 +1,49 @@
+import threading
+
+import numpy as np
+
+from screening.inference import InferenceScheduler
+
+
+class GatedModel:
+    """Sums each window, blocking every forward pass until released."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, batch):
+        self.started.set()
+        self.release.wait(5)
+        return batch.reshape(len(batch), -1).sum(axis=1, keepdims=True)
+
+
+def test_cancelled_future_does_not_stop_the_scheduler():
+    model = GatedModel()
+    model.release.set()
+    scheduler = InferenceScheduler(model, max_latency_ms=50)
+    try:
+        cancelled = scheduler.submit("a", np.ones(3))
+        assert cancelled.cancel()
+        assert scheduler.submit("b", np.ones(4)).result(timeout=5)[0] == 4
+        # A cancelled pending Future is replaced, not reused
+        assert scheduler.submit("a", np.ones(2)).result(timeout=5)[0] == 2
+    finally:
+        scheduler.close()
+
+
+def test_forget_during_batch_drops_its_result():
+    model = GatedModel()
+    scheduler = InferenceScheduler(model, max_latency_ms=0)
+    try:
+        forgotten = scheduler.submit("a", np.ones(3))
+        kept = scheduler.submit("b", np.ones(3))
+        assert model.started.wait(5)
+        scheduler.forget("a")
+        model.release.set()
+        forgotten.result(timeout=5)
+        kept.result(timeout=5)
+        assert scheduler.latest("a") is None
+        assert scheduler.latest("b") is not None
+    finally:
+        scheduler.close()
@@ -0,0 +1,36 @@
+import json
+
+from screening.latency import LatencyTracer
+
+
+def trace(frame_id, **fields):
+    base = {"id": frame_id, "capture": 1000.0, "features": 1030.0, "send": 1032.0,
+            "poll": 50.0, "analyserLag": 20.0, "levelLag": 10.0, "drawLag": 5.0,
+            "rendered": None}
+    base.update(fields)
+    return json.dumps({"overallLevel": 0.5, "trace": base})
+
+
+def test_receive_strips_trace_and_records_stages():
+    tracer = LatencyTracer()
+    stripped = tracer.receive(trace(1), received_at=1.1)
+    assert json.loads(stripped) == {"overallLevel": 0.5}
+    tracer.receive(trace(2, rendered={"id": 1, "at": 1050.0}), received_at=1.2)
+    # A repeated payload is not recorded again
+    tracer.receive(trace(2, rendered={"id": 1, "at": 1050.0}), received_at=1.3)
+    rows = {row["stage"]: row for row in tracer.summary()}
+    assert tracer.frames == 2
+    assert rows["capture_to_features"]["p50_ms"] == 30.0
+    assert rows["features_to_render"]["count"] == 1
+    assert rows["features_to_render"]["max_ms"] == 20.0
+
+
+def test_malformed_trace_leaves_no_partial_record():
+    tracer = LatencyTracer()
+    payload = json.loads(trace(1))
+    del payload["trace"]["drawLag"]
+    stripped = tracer.receive(json.dumps(payload), received_at=1.1)
+    assert json.loads(stripped) == {"overallLevel": 0.5}
+    tracer.receive(trace(2, rendered="not a dict"), received_at=1.2)
+    assert tracer.frames == 1
+    assert all(row["count"] == 1 for row in tracer.summary())
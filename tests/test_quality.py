@@ -0,0 +1,54 @@
+import json
+
+from screening.quality import QualityMonitor
+
+
+def codes(monitor, now=None):
+    return [warning["code"] for warning in monitor.warnings(now)]
+
+
+def feed(monitor, start_s, duration_s, rate_hz=20, seq_start=0, **fields):
+    frame = {"overallLevel": 0.1, "frequencySpread": 0.2, "micActive": True}
+    frame.update(fields)
+    count = int(duration_s * rate_hz)
+    for index in range(count):
+        monitor.update(json.dumps(dict(frame, seq=seq_start + index)), start_s + index / rate_hz)
+    return seq_start + count
+
+
+def test_flatline_on_new_frames():
+    monitor = QualityMonitor()
+    feed(monitor, 0.0, 12.0)
+    assert "flatline" in codes(monitor)
+
+
+def test_repeated_seq_is_ignored():
+    monitor = QualityMonitor()
+    payload = json.dumps({"seq": 1, "overallLevel": 0.1, "frequencySpread": 0.2, "micActive": True})
+    # Streamlit reruns keep returning the last value
+    for index in range(300):
+        monitor.update(payload, index * 0.05)
+    assert monitor.frames == 1
+    assert codes(monitor) == []
+
+
+def test_mic_off_frames_are_not_analysed():
+    monitor = QualityMonitor()
+    seq = feed(monitor, 0.0, 2.0, overallLevel=0.3)
+    seq = feed(monitor, 2.0, 20.0, seq_start=seq, micActive=False, overallLevel=0.0)
+    assert monitor.frames == 40
+    assert not monitor.metrics()["mic_active"]
+    assert codes(monitor, now=22.0) == []
+
+    # Back on: the flatline clock starts again instead of counting the pause
+    feed(monitor, 22.0, 2.0, seq_start=seq, overallLevel=0.3)
+    assert monitor.mic_active
+    assert "flatline" not in codes(monitor)
+
+
+def test_clipping():
+    monitor = QualityMonitor()
+    seq = feed(monitor, 0.0, 2.0, overallLevel=0.2)
+    assert "clipping" not in codes(monitor)
+    feed(monitor, 2.0, 2.0, seq_start=seq, overallLevel=1.0)
+    assert "clipping" in codes(monitor)
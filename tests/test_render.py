@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from screening.render import (blob_geometry, chunk_geometry, frame_count, render_still,
+                              replay_sketch, slice_geometry)
+
+
+def session(duration_s, rate_hz=20):
+    times = np.arange(0.0, duration_s, 1.0 / rate_hz)
+    return {"time": times, "overallLevel": 0.3 + 0.2 * np.sin(times)}
+
+
+def test_render_still_within_session():
+    image = render_still(session(2.0), 1.5, width=64, height=64)
+    assert image.shape[:2] == (64, 64)
+
+
+def test_render_still_past_end_raises():
+    features = session(2.0)
+    with pytest.raises(ValueError):
+        render_still(features, 10.0, width=64, height=64)
+    with pytest.raises(ValueError):
+        render_still({"time": np.array([])}, 0.5, width=64, height=64)
+
+
+def join_chunks(chunks):
+    return {key: np.concatenate([chunk[key] for chunk in chunks]) if isinstance(value, np.ndarray) else value
+            for key, value in chunks[0].items()}
+
+
+def assert_same_geometry(left, right):
+    assert left.keys() == right.keys()
+    for key, value in left.items():
+        if isinstance(value, np.ndarray):
+            np.testing.assert_allclose(value, right[key], rtol=1e-6, atol=1e-6, err_msg=key)
+        else:
+            assert value == right[key], key
+
+
+def test_chunked_replay_matches_one_chunk():
+    features = session(3.0)
+    whole = join_chunks([chunk_geometry(sketch) for sketch in replay_sketch(
+        features, width=64, height=64, chunk_frames=10000)])
+    chunked = join_chunks([chunk_geometry(sketch) for sketch in replay_sketch(
+        features, width=64, height=64, chunk_frames=7)])
+    assert frame_count(whole) == 88
+    assert_same_geometry(whole, chunked)
+
+
+def test_start_s_replays_easing_from_the_session_start():
+    features = session(3.0)
+    whole = blob_geometry(features, width=64, height=64)
+    later = blob_geometry(features, width=64, height=64, start_s=1.0, duration_s=1.0)
+    assert frame_count(later) == 30
+    assert_same_geometry(slice_geometry(whole, 30, 60), later)
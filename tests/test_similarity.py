@@ -0,0 +1,49 @@
+import numpy as np
+
+from screening.similarity import _dtw_batch
+
+
+def brute_force_dtw(query, candidate, band):
+    length = len(query)
+    table = np.full((length, length), np.inf)
+    for i in range(length):
+        for j in range(max(0, i - band), min(length, i + band + 1)):
+            cost = float(((query[i] - candidate[j]) ** 2).sum())
+            if i == 0 and j == 0:
+                table[i, j] = cost
+                continue
+            best = min(table[i - 1, j] if i else np.inf,
+                       table[i, j - 1] if j else np.inf,
+                       table[i - 1, j - 1] if i and j else np.inf)
+            table[i, j] = cost + best
+    return table[-1, -1]
+
+
+def test_dtw_batch_matches_brute_force():
+    rng = np.random.default_rng(0)
+    length, streams = 24, 3
+    query = rng.normal(size=(length, streams)).astype(np.float32)
+    candidates = rng.normal(size=(8, length, streams)).astype(np.float32)
+    for band in (0, 1, 3, length):
+        expected = [brute_force_dtw(query, candidate, band) for candidate in candidates]
+        actual = _dtw_batch(query, candidates, band, np.full(len(candidates), np.inf),
+                            np.zeros((len(candidates), length + 1)))
+        np.testing.assert_allclose(actual, expected, rtol=1e-5)
+
+
+def test_dtw_batch_keeps_candidates_under_their_cutoff():
+    rng = np.random.default_rng(1)
+    length, streams = 20, 3
+    query = rng.normal(size=(length, streams)).astype(np.float32)
+    candidates = rng.normal(size=(6, length, streams)).astype(np.float32)
+    band = 2
+    expected = np.array([brute_force_dtw(query, candidate, band) for candidate in candidates])
+    cutoffs = expected * np.array([0.5, 2.0, 0.9, 1.1, 0.1, 10.0])
+    actual = _dtw_batch(query, candidates, band, cutoffs, np.zeros((len(candidates), length + 1)))
+    kept = cutoffs > expected
+    np.testing.assert_allclose(actual[kept], expected[kept], rtol=1e-5)
+    # Candidates over their cutoff are abandoned or, if their band never
+    # crossed it before the last row, returned exactly
+    over = actual[~kept]
+    assert np.isinf(over).any()
+    assert (np.isinf(over) | np.isclose(over, expected[~kept], rtol=1e-5)).all()
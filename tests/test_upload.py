@@ -0,0 +1,91 @@
+import struct
+import zlib
+
+import numpy as np
+import pytest
+
+from streamlit_audio_blob.upload import CODEC_DEFLATE, MESSAGE_MAGIC, AudioUploadReceiver
+
+RATE = 16000
+CHUNK = 1600
+
+
+def encode(samples):
+    # Mirror of residualPlanes() and encodeChunk() in audioUploadCodec.js
+    samples = samples.astype(np.int64)
+    history = np.concatenate([[0, 0], samples])
+    residual = (history[2:] - 2 * history[1:-1] + history[:-2]).astype(np.int16).astype(np.int32)
+    zigzag = ((residual << 1) ^ (residual >> 15)) & 0xFFFF
+    planes = np.concatenate([zigzag & 0xFF, zigzag >> 8]).astype(np.uint8).tobytes()
+    compressor = zlib.compressobj(wbits=-15)
+    return compressor.compress(planes) + compressor.flush()
+
+
+def pack(seqs, dropped_before=0, stream_id=7):
+    # Mirror of packMessage(); chunk seq holds samples seq * CHUNK onwards
+    parts = [struct.pack("<6I", MESSAGE_MAGIC, 1, stream_id, RATE, len(seqs), dropped_before)]
+    for seq in seqs:
+        body = encode(chunk_samples(seq))
+        parts.append(struct.pack("<2Id2I", seq, CHUNK, seq * CHUNK, CODEC_DEFLATE, len(body)))
+        parts.append(body)
+    return b"".join(parts)
+
+
+def chunk_samples(seq):
+    t = np.arange(seq * CHUNK, (seq + 1) * CHUNK)
+    return (8000 * np.sin(t / 7.0)).astype(np.int16)
+
+
+def test_chunks_decode_in_any_order():
+    receiver = AudioUploadReceiver(sample_rate=RATE, capacity_s=1)
+    receiver.receive(pack([2, 0]))
+    assert receiver.acked_seq == 0
+    receiver.receive(pack([1, 2]))
+    assert receiver.acked_seq == 2
+    assert receiver.duplicate_chunks == 1
+    expected = np.concatenate([chunk_samples(seq) for seq in range(3)])
+    np.testing.assert_array_equal(receiver.samples(), expected)
+
+
+def test_dropped_chunks_are_acknowledged_past():
+    receiver = AudioUploadReceiver(sample_rate=RATE, capacity_s=1)
+    receiver.receive(pack([0, 1]))
+    # Chunk 3 arrived before the outage; the browser then dropped 2 to 4
+    receiver.receive(pack([3]))
+    assert receiver.acked_seq == 1
+    assert receiver.pending_gap_chunks() == 1
+
+    receiver.receive(pack([5, 6], dropped_before=5))
+    assert receiver.acked_seq == 6
+    assert receiver.pending_gap_chunks() == 0
+    assert receiver.dropped_chunks == 2
+    assert receiver.ack_args()["ack"] == 6
+
+    samples = receiver.samples()
+    assert len(samples) == 7 * CHUNK
+    np.testing.assert_array_equal(samples[3 * CHUNK:4 * CHUNK], chunk_samples(3))
+    assert not samples[2 * CHUNK:3 * CHUNK].any()
+    assert not samples[4 * CHUNK:5 * CHUNK].any()
+
+    # Repeating the last message changes nothing
+    receiver.receive(pack([5, 6], dropped_before=5))
+    assert receiver.acked_seq == 6
+    assert receiver.dropped_chunks == 2
+
+
+def test_out_of_range_chunks_are_rejected():
+    receiver = AudioUploadReceiver(sample_rate=RATE, chunk_ms=100, capacity_s=1, max_gap_s=10)
+    body = encode(chunk_samples(0))
+    header = struct.pack("<6I", MESSAGE_MAGIC, 1, 7, RATE, 1, 0)
+    for start, count in [(-1.0, CHUNK), (0.5, CHUNK), (float("nan"), CHUNK),
+                         (11.0 * RATE, CHUNK), (0.0, 2 * CHUNK)]:
+        chunk = struct.pack("<2Id2I", 0, count, start, CODEC_DEFLATE, len(body))
+        with pytest.raises(ValueError):
+            receiver.receive(header + chunk + body)
+    assert receiver.length == 0
+    assert len(receiver._buffer) == RATE
+
+    # Within the gap allowance, silence fills up to the chunk
+    chunk = struct.pack("<2Id2I", 0, CHUNK, 5.0 * RATE, CODEC_DEFLATE, len(body))
+    receiver.receive(header + chunk + body)
+    assert receiver.length == 5 * RATE + CHUNK